@@ -0,0 +1,125 @@
+"""
+Бенчмарк сопоставления вакансий с профилями: NumPy-матрица против цикла на Python.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_batch_matching --users 100000 --vacancies 5000
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+
+from src.services.batch_matcher import BatchMatcher  # noqa: E402
+from src.services.matching import MatchIndex, profile_matches  # noqa: E402
+
+AREAS = [str(i) for i in range(1, 120)]
+EXPERIENCE = ['noExperience', 'between1And3', 'between3And6', 'moreThan6']
+SCHEDULE = ['fullDay', 'remote', 'flexible', 'shift']
+EMPLOYMENT = ['full', 'part', 'project', 'probation']
+WORDS = ['python', 'java', 'go', 'backend', 'frontend', 'разработчик', 'developer', 'senior',
+         'junior', 'middle', 'аналитик', 'data', 'engineer', 'devops', 'qa', 'тестировщик',
+         'менеджер', 'продаж', 'дизайнер', 'инженер', 'lead', 'team', 'fullstack', 'ml']
+
+
+def maybe(rng, values, probability):
+    return rng.choice(values) if rng.random() < probability else None
+
+
+def make_profiles(rng, count):
+    profiles = []
+    for user_key in range(count):
+        params = {
+            'text': ' '.join(rng.sample(WORDS, rng.randint(1, 2))) if rng.random() < 0.9 else None,
+            'area': maybe(rng, AREAS, 0.8),
+            'experience': maybe(rng, EXPERIENCE, 0.5),
+            'schedule': maybe(rng, SCHEDULE, 0.3),
+            'employment': maybe(rng, EMPLOYMENT, 0.2),
+            'salary_min': rng.randrange(30000, 400000, 10000) if rng.random() < 0.4 else None,
+        }
+        profiles.append((user_key, {k: v for k, v in params.items() if v is not None}))
+    return profiles
+
+
+def make_vacancies(rng, count):
+    vacancies = []
+    for vacancy_id in range(count):
+        salary = None
+        if rng.random() < 0.5:
+            salary = {'from': rng.randrange(30000, 500000, 5000), 'to': None, 'currency': 'RUR'}
+        vacancies.append({
+            'id': str(vacancy_id),
+            'name': ' '.join(rng.sample(WORDS, rng.randint(2, 4))),
+            'area': {'id': rng.choice(AREAS)},
+            'experience': {'id': rng.choice(EXPERIENCE)},
+            'schedule': {'id': rng.choice(SCHEDULE)},
+            'employment': {'id': rng.choice(EMPLOYMENT)},
+            'salary': salary,
+        })
+    return vacancies
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<40} {elapsed:10.3f} s")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--vacancies', type=int, default=5_000)
+    parser.add_argument('--loop-sample', type=int, default=20,
+                        help='сколько вакансий прогнать циклом на Python (остальное экстраполируется)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profiles = make_profiles(rng, args.users)
+    vacancies = make_vacancies(rng, args.vacancies)
+    print(f"Профилей: {len(profiles)}, вакансий: {len(vacancies)}\n")
+
+    matcher, build_numpy = timed("numpy: построение колонок", lambda: BatchMatcher.build(profiles))
+    numpy_result, match_numpy = timed("numpy: сопоставление", lambda: matcher.match_all(vacancies))
+
+    index, build_index = timed("index: построение индексов", lambda: MatchIndex.build(profiles))
+    index_result, match_index = timed("index: сопоставление", lambda: index.match_all(vacancies))
+
+    sample = vacancies[:args.loop_sample]
+
+    def python_loop():
+        per_user = {}
+        for vacancy in sample:
+            for user_key, params in profiles:
+                if profile_matches(params, vacancy):
+                    per_user.setdefault(user_key, []).append(vacancy)
+        return per_user
+
+    loop_result, loop_sample_time = timed(f"python: цикл на {len(sample)} вакансиях", python_loop)
+    loop_time = loop_sample_time * len(vacancies) / max(len(sample), 1)
+    print(f"{'python: экстраполяция на все вакансии':<40} {loop_time:10.3f} s")
+
+    # Проверка, что все реализации дают одинаковый результат на выборке
+    sample_ids = {v['id'] for v in sample}
+
+    def restrict(result):
+        return {
+            user_key: [v['id'] for v in items if v['id'] in sample_ids]
+            for user_key, items in result.items()
+            if any(v['id'] in sample_ids for v in items)
+        }
+
+    assert restrict(numpy_result) == restrict(loop_result), "numpy расходится с эталоном"
+    assert restrict(index_result) == restrict(loop_result), "index расходится с эталоном"
+
+    pairs = sum(len(items) for items in numpy_result.values())
+    print(f"\nСовпадений (вакансия, пользователь): {pairs}")
+    print(f"Ускорение numpy относительно цикла: x{loop_time / match_numpy:.1f}")
+    print(f"Ускорение index относительно цикла: x{loop_time / match_index:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Прогон смеси запросов к HH из кассеты через HHAPIClient: пропускная способность и аллокации.
+
+Кассета записывается ботом в режиме HH_TRANSPORT_MODE=record. Без --cassette
+бенчмарк генерирует синтетическую кассету с ответами поиска. Результаты разных
+сборок сравнимы при одной кассете и одинаковых параметрах.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_hh_replay --cassette data/hh_cassette.jsonl.gz --passes 20
+    python -m benchmarks.bench_hh_replay --queries 200 --passes 20
+"""
+import argparse
+import asyncio
+import base64
+import gzip
+import json
+import os
+import random
+import time
+import tracemalloc
+
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+
+from src.services.hh_client import HHAPIClient  # noqa: E402
+from src.services.hh_transport import ReplayTransport, load_cassette  # noqa: E402
+
+WORDS = ['python', 'java', 'go', 'backend', 'frontend', 'разработчик', 'developer', 'аналитик',
+         'data', 'engineer', 'devops', 'тестировщик', 'менеджер', 'дизайнер', 'инженер']
+
+
+def synthetic_records(rng, queries, per_page=20):
+    """Ответы поиска в формате кассеты: сжатые gzip, с ETag"""
+    records = []
+    for query in range(queries):
+        params = {'text': ' '.join(rng.sample(WORDS, 2)), 'area': str(rng.randint(1, 120)),
+                  'per_page': str(per_page), 'page': '0'}
+        items = [{
+            'id': str(rng.randrange(80_000_000, 130_000_000)),
+            'name': f"{params['text']} #{i}",
+            'area': {'id': params['area'], 'name': 'Город'},
+            'salary': {'from': rng.randrange(50_000, 300_000, 10_000), 'to': None, 'currency': 'RUR'},
+            'employer': {'id': str(rng.randint(1, 10_000)), 'name': f"Компания {rng.randint(1, 10_000)}"},
+            'snippet': {'requirement': 'Опыт коммерческой разработки ' * 3, 'responsibility': 'Разработка ' * 5},
+            'published_at': '2026-01-01T10:00:00+0300',
+        } for i in range(per_page)]
+        body = gzip.compress(json.dumps({'items': items, 'found': per_page, 'pages': 1},
+                                        ensure_ascii=False).encode('utf-8'))
+        records.append({
+            'at': query * 0.5, 'path': '/vacancies', 'params': params, 'conditional': False, 'status': 200,
+            'headers': {'Content-Type': 'application/json', 'Content-Encoding': 'gzip', 'ETag': f'"{query}"'},
+            'body': base64.b64encode(body).decode('ascii'), 'elapsed': 0.15,
+        })
+    return records
+
+
+async def replay(records, passes, speed):
+    transport = ReplayTransport(records=records, speed=speed)
+    client = HHAPIClient(transport=transport)
+    mix = [(path, params) for path, params in transport.requests() if path == '/vacancies']
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    found = 0
+    for _ in range(passes):
+        for _, params in mix:
+            found += len(await client.search_vacancies(**params))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await client.close()
+    return len(mix) * passes, found, elapsed, peak, client.transfer_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cassette', help='кассета gzip JSONL; без нее - синтетическая')
+    parser.add_argument('--queries', type=int, default=200, help='запросов в синтетической кассете')
+    parser.add_argument('--passes', type=int, default=20)
+    parser.add_argument('--speed', type=float, default=0, help='ускорение задержек ответа, 0 - без задержек')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    records = load_cassette(args.cassette) if args.cassette else synthetic_records(random.Random(args.seed), args.queries)
+    requests, found, elapsed, peak, stats = asyncio.run(replay(records, args.passes, args.speed))
+
+    print(f"записей в кассете: {len(records)}, проходов: {args.passes}, скорость: x{args.speed:g}")
+    print(f"запросов: {requests}, вакансий: {found}")
+    print(f"время: {elapsed:.2f} с, {requests / elapsed:.0f} запросов/с, {elapsed / requests * 1e6:.0f} мкс/запрос")
+    print(f"пик аллокаций: {peak / 1024:.0f} КБ")
+    print(f"трафик: по сети {stats['bytes_received'] / 1024:.0f} КБ, "
+          f"после распаковки {stats['bytes_decoded'] / 1024:.0f} КБ, 304: {stats['not_modified']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Бенчмарк памяти множеств просмотренных вакансий: set[str] против set[int] и IdSet.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_id_sets --ids 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from src.services.id_sets import IdSet
+
+
+def measure(build):
+    """Память, занятая построенным объектом, и время построения"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, elapsed
+
+
+def lookup_time(container, probes):
+    started = time.perf_counter()
+    hits = sum(1 for probe in probes if probe in container)
+    return time.perf_counter() - started, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ids', type=int, default=100000)
+    parser.add_argument('--probes', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # id вакансий HH - девятизначные числа
+    ids = rng.sample(range(80_000_000, 130_000_000), args.ids)
+    int_probes = [rng.randrange(80_000_000, 130_000_000) for _ in range(args.probes // 2)] + ids[:args.probes // 2]
+    str_probes = [str(probe) for probe in int_probes]
+
+    # Строки создаются внутри замера: в боте каждая строка id живет вместе с множеством
+    variants = [
+        ('set[str]', lambda: {str(vacancy_id) for vacancy_id in ids}, str_probes),
+        ('set[int]', lambda: set(ids), int_probes),
+        ('IdSet', lambda: IdSet(ids), int_probes),
+    ]
+
+    print(f"id в множестве: {args.ids}, проверок: {len(int_probes)}")
+    print(f"{'вариант':<10} {'память':>12} {'байт/id':>9} {'построение':>12} {'проверки':>10}")
+    baseline = None
+    for name, build, probes in variants:
+        container, memory, build_time = measure(build)
+        lookups, hits = lookup_time(container, probes)
+        baseline = baseline or memory
+        print(f"{name:<10} {memory / 1024:>9.0f} КБ {memory / args.ids:>9.1f} "
+              f"{build_time * 1000:>9.1f} мс {lookups * 1000:>7.1f} мс  (x{baseline / memory:.1f}, найдено {hits})")
+
+    # Пошаговое добавление, как при рассылке уведомлений
+    incremental, memory, build_time = measure(lambda: _incremental(ids))
+    print(f"{'IdSet.add':<10} {memory / 1024:>9.0f} КБ {memory / args.ids:>9.1f} {build_time * 1000:>9.1f} мс")
+    assert set(incremental) == set(ids)
+
+
+def _incremental(ids):
+    id_set = IdSet()
+    for vacancy_id in ids:
+        id_set.add(vacancy_id)
+    return id_set
+
+
+if __name__ == '__main__':
+    main()
@@ -12,17 +12,83 @@ class Config:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/jobs.db")
     DB_TYPE: str = os.getenv("DB_TYPE", "sqlite").lower()
+    # Логирование SQL-запросов SQLAlchemy (только для отладки)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
 
     # HH API
     HH_API_URL: str = "https://api.hh.ru/vacancies"
     HH_USER_AGENT: str = "JobBot/1.0"
+    DICTIONARIES_CACHE_PATH: str = os.getenv("DICTIONARIES_CACHE_PATH", "./data/hh_dictionaries.json")
+    DICTIONARIES_REFRESH_HOURS: float = float(os.getenv("DICTIONARIES_REFRESH_HOURS", "24"))
+    AREAS_SNAPSHOT_PATH: str = os.getenv("AREAS_SNAPSHOT_PATH", "./data/areas.json.gz")
+    # Сколько минут повторный поиск обслуживается из локального хранилища
+    LOCAL_SEARCH_MAX_AGE: int = int(os.getenv("LOCAL_SEARCH_MAX_AGE", "15"))
 
     # DeepSeek
     DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
+    # Любой OpenAI-совместимый сервер, например локальная заглушка для проверки
+    DEEPSEEK_API_URL: str = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com")
+    DEEPSEEK_MODEL: str = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+    # Сопроводительные письма: одновременных запросов к LLM и максимум ожидающих в очереди
+    COVER_LETTER_CONCURRENCY: int = int(os.getenv("COVER_LETTER_CONCURRENCY", "3"))
+    COVER_LETTER_QUEUE: int = int(os.getenv("COVER_LETTER_QUEUE", "20"))
 
     # Scheduler
     CHECK_INTERVAL: int = int(os.getenv("CHECK_INTERVAL", "60"))
     SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    # query - один запрос к HH на группу одинаковых фильтров,
+    # firehose - общая выборка свежих вакансий и локальное сопоставление,
+    # adaptive - частота опроса каждого запроса зависит от его отдачи и активности пользователей
+    # staggered - каждая группа запросов проверяется раз в интервал со своим стабильным смещением
+    SCHEDULER_MODE: str = os.getenv("SCHEDULER_MODE", "query").lower()
+    FIREHOSE_PAGES: int = int(os.getenv("FIREHOSE_PAGES", "5"))
+    FIREHOSE_PER_PAGE: int = int(os.getenv("FIREHOSE_PER_PAGE", "100"))
+    # Через сколько секунд после последней правки фильтров проверять вакансии пользователя
+    FILTER_CHECK_DELAY: int = int(os.getenv("FILTER_CHECK_DELAY", "10"))
+    # Границы интервала опроса запроса в режиме adaptive (минуты) и общий бюджет запросов к HH в час
+    ADAPTIVE_MIN_INTERVAL: int = int(os.getenv("ADAPTIVE_MIN_INTERVAL", "10"))
+    ADAPTIVE_MAX_INTERVAL: int = int(os.getenv("ADAPTIVE_MAX_INTERVAL", "1440"))
+    HH_REQUEST_BUDGET: int = int(os.getenv("HH_REQUEST_BUDGET", "300"))
+    # index - инвертированные индексы, numpy - векторизованная матрица совпадений
+    MATCHER_BACKEND: str = os.getenv("MATCHER_BACKEND", "index").lower()
+
+    # Быстрый запуск: нативный async-цикл python-telegram-bot без nest_asyncio
+    FAST_START: bool = os.getenv("FAST_START", "true").lower() == "true"
+
+    # Предохранители HH и Telegram: доля ошибок для открытия и пауза до пробного запроса (секунды)
+    BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", "60"))
+
+    # Источник HH: не больше HH_PROVIDER_RPS запросов в секунду, таймаут запроса в проходе (секунды)
+    HH_PROVIDER_RPS: float = float(os.getenv("HH_PROVIDER_RPS", "5"))
+    HH_PROVIDER_TIMEOUT: float = float(os.getenv("HH_PROVIDER_TIMEOUT", "45"))
+    # Транспорт HH: live, record (запись запросов в кассету) или replay (ответы из кассеты без сети)
+    HH_TRANSPORT_MODE: str = os.getenv("HH_TRANSPORT_MODE", "live").lower()
+    HH_CASSETTE: str = os.getenv("HH_CASSETTE", "data/hh_cassette.jsonl.gz")
+    # Ускорение задержек при воспроизведении: 1 - как при записи, 0 - без задержек
+    HH_REPLAY_SPEED: float = float(os.getenv("HH_REPLAY_SPEED", "1"))
+
+    # Снимок состояния планировщика для быстрого старта (пустой путь - без снимка) и период его записи (минуты)
+    STATE_SNAPSHOT_PATH: str = os.getenv("STATE_SNAPSHOT_PATH", "data/scheduler_state.bin")
+    STATE_SNAPSHOT_INTERVAL: int = int(os.getenv("STATE_SNAPSHOT_INTERVAL", "10"))
+
+    # HTTP-проверки состояния для оркестратора: /health/live, /health/ready, /health
+    HEALTH_ENABLED: bool = os.getenv("HEALTH_ENABLED", "false").lower() == "true"
+    HEALTH_HOST: str = os.getenv("HEALTH_HOST", "127.0.0.1")
+    HEALTH_PORT: int = int(os.getenv("HEALTH_PORT", "8080"))
+    # Допустимая задержка цикла событий (секунды), больше - /health/live отвечает 503
+    HEALTH_MAX_LOOP_LAG: float = float(os.getenv("HEALTH_MAX_LOOP_LAG", "5"))
+
+    # Трассировка проходов планировщика в файлы Chrome Trace (chrome://tracing, ui.perfetto.dev)
+    TRACE_ENABLED: bool = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+    TRACE_DIR: str = os.getenv("TRACE_DIR", "data/traces")
+
+    # Администраторы бота (Telegram id через запятую): служебные команды вроде /memory
+    ADMIN_IDS: frozenset = frozenset(
+        int(user_id) for user_id in os.getenv("ADMIN_IDS", "").replace(' ', '').split(',') if user_id
+    )
+    # Глубина стека в снимках tracemalloc команды /memory
+    TRACEMALLOC_FRAMES: int = int(os.getenv("TRACEMALLOC_FRAMES", "1"))
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -1,44 +1,106 @@
+from startup_profiler import startup_profiler
 import asyncio
-import nest_asyncio
-from src.bot.bot import setup_bot
+import signal
 from logger import get_logger
 from config import config
-from src.storage.database import init_db
-from src.services.scheduler_service import init_scheduler
 
-nest_asyncio.apply()
 logger = get_logger(__name__)
 
+
+async def run_polling_fast(application):
+    """Запуск polling без nest_asyncio: жизненный цикл приложения на текущем event loop"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    async with application:
+        await application.start()
+        with startup_profiler.phase("first_poll"):
+            await application.updater.start_polling()
+        logger.info("Бот запущен и готов к работе!")
+        startup_profiler.report()
+
+        await stop_event.wait()
+
+        await application.updater.stop()
+        await application.stop()
+
+
 async def main():
     """Главная асинхронная функция запуска бота"""
     logger.info("Запуск бота...")
 
+    # Тяжелые подсистемы импортируются только здесь, чтобы замерить и сократить холодный старт
+    with startup_profiler.phase("imports"):
+        from src.bot.bot import setup_bot
+        from src.storage.database import init_db
+        from src.services.dictionaries import hh_dictionaries
+        from src.services.filter_service import filter_service
+
     # Инициализация базы данных
-    await init_db()
+    with startup_profiler.phase("db_init"):
+        if config.TRACE_ENABLED:
+            from src.storage.database import engine
+            from src.services.tracing import instrument_engine
+            instrument_engine(engine)
+        await init_db()
     logger.info("База данных готова")
 
+    # Справочники HH: снимок уже загружен, обновляем в фоне и перекомпилируем профили при изменениях
+    hh_dictionaries.on_update(filter_service.recompile_profiles)
+    hh_dictionaries.start_background_refresh()
+
     # Настройка и запуск бота
     logger.info("Создание приложения...")
-    application = await setup_bot(config.BOT_TOKEN)
+    with startup_profiler.phase("bot_setup"):
+        application = await setup_bot(config.BOT_TOKEN)
 
     # Инициализация планировщика
     scheduler = None
     if config.SCHEDULER_ENABLED:
-        scheduler = init_scheduler(application.bot)
-        await scheduler.start(config.CHECK_INTERVAL)
+        with startup_profiler.phase("scheduler"):
+            from src.services.scheduler_service import init_scheduler
+            scheduler = init_scheduler(application.bot)
+            await scheduler.start(config.CHECK_INTERVAL)
         logger.info(f"✅ Планировщик запущен с интервалом {config.CHECK_INTERVAL} минут")
 
-    logger.info("Бот запущен и готов к работе!")
+    # Проверки состояния для оркестратора
+    health_server = None
+    if config.HEALTH_ENABLED:
+        from src.services.health import HealthServer
+        health_server = HealthServer(application)
+        await health_server.start()
 
     try:
-        # Запуск polling
-        await application.run_polling()
+        if config.FAST_START:
+            await run_polling_fast(application)
+        else:
+            logger.info("Бот запущен и готов к работе!")
+            startup_profiler.report()
+            # Запуск polling
+            await application.run_polling()
     finally:
+        if health_server:
+            await health_server.stop()
         # Остановка планировщика при завершении работы
         if scheduler:
             await scheduler.stop()
+        from src.services.hh_client import hh_client
+        await hh_client.close()
+        if config.TRACE_ENABLED:
+            from src.services.tracing import tracer
+            tracer.flush()
 
 if __name__ == "__main__":
+    if not config.FAST_START:
+        # run_polling запускает собственный цикл внутри уже работающего
+        import nest_asyncio
+        nest_asyncio.apply()
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
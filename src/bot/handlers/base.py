@@ -1,15 +1,23 @@
+from datetime import datetime
 from telegram import Update
-from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters
+from telegram.ext import ContextTypes, CommandHandler, MessageHandler, TypeHandler, filters
 from logger import get_logger
 from src.bot.keyboards.main import get_main_keyboard
 from src.bot.handlers.filters import filter_handler
 from src.bot.handlers.vacancies import vacancy_handler
-from src.services.scheduler_service import get_scheduler
+from src.services.adaptive_polling import adaptive_poller
+from src.services.memory_stats import memory_stats, process_rss
 from config import config
 
 logger = get_logger(__name__)
 
 
+def get_scheduler():
+    """Планировщик импортируется лениво: APScheduler не нужен для запуска бота"""
+    from src.services.scheduler_service import get_scheduler as get_current_scheduler
+    return get_current_scheduler()
+
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start"""
     user = update.effective_user
@@ -110,16 +118,33 @@ async def scheduler_status_command(update: Update, context: ContextTypes.DEFAULT
         else:
             next_run_str = "не запланировано"
 
+        hh = status['hh_transfer']
+        snapshot_at = status['snapshot_saved_at']
+        snapshot_str = datetime.fromtimestamp(snapshot_at).strftime("%H:%M:%S") if snapshot_at else "еще не сохранялся"
+        breaker_icons = {'closed': '🟢', 'half_open': '🟡', 'open': '🔴'}
+        breakers_text = ''.join(
+            f"• {name}: {breaker_icons.get(state['state'], '')} {state['state']}"
+            f" (ошибок {state['failures']}/{state['calls']}"
+            + (f", повтор через {state['retry_in']} с" if state['retry_in'] else '')
+            + ")\n"
+            for name, state in status['breakers'].items()
+        )
+
         # Формируем сообщение БЕЗ Markdown
         status_text = (
             "📊 Статус планировщика\n\n"
             f"• Статус: {'🟢 Запущен' if status['running'] else '🔴 Остановлен'}\n"
             f"• Интервал проверки: {status['check_interval']} минут\n"
+            f"• Режим: {status['mode']}\n"
             f"• Следующая проверка: {next_run_str}\n"
             f"• Отслеживается пользователей: {status['users_tracked']}\n"
             f"• Активных пользователей: {status['active_users']}\n"
             f"• Пользователей с фильтрами: {status['users_with_filters']}\n"
-            f"• Количество задач: {status['job_count']}\n\n"
+            f"• Количество задач: {status['job_count']}\n"
+            f"• Снимок состояния: {snapshot_str}\n"
+            f"• Трафик HH: {hh['bytes_received'] // 1024} КБ, сэкономлено {hh['bytes_saved'] // 1024} КБ, "
+            f"без изменений (304): {hh['not_modified']} из {hh['requests']}\n"
+            f"{breakers_text}\n"
             "Команды управления:\n"
             "/scheduler_start - запустить планировщик\n"
             "/scheduler_stop - остановить планировщик\n"
@@ -279,11 +304,8 @@ async def scheduler_interval_command(update: Update, context: ContextTypes.DEFAU
                 )
             return
 
-        # Останавливаем текущий планировщик
-        await scheduler.stop()
-
-        # Запускаем с новым интервалом
-        await scheduler.start(interval)
+        # Меняем интервал без перезапуска: внеочередного прохода не будет
+        await scheduler.set_interval(interval)
 
         success_message = f"✅ Интервал планировщика изменен на {interval} минут"
 
@@ -316,6 +338,63 @@ async def scheduler_interval_command(update: Update, context: ContextTypes.DEFAU
             )
 
 
+def _format_bytes(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} МБ"
+    return f"{size / 1024:.0f} КБ"
+
+
+async def memory_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Память процесса (только для администраторов).
+
+    /memory - размеры хранилищ в памяти
+    /memory snapshot - включить tracemalloc и сделать базовый снимок
+    /memory diff - места аллокаций с наибольшим приростом с базового снимка
+    /memory stop - выключить tracemalloc
+    """
+    if update.effective_user.id not in config.ADMIN_IDS:
+        logger.warning(f"Пользователь {update.effective_user.id} запросил /memory без прав администратора")
+        await update.message.reply_text("⛔ Команда доступна только администраторам")
+        return
+
+    action = context.args[0].lower() if context.args else 'stores'
+    try:
+        if action == 'snapshot':
+            memory_stats.take_baseline()
+            text = "🧠 Базовый снимок tracemalloc сделан. Через некоторое время: /memory diff"
+        elif action == 'diff':
+            if not memory_stats.tracing:
+                text = "❌ Сначала сделайте базовый снимок: /memory snapshot"
+            else:
+                lines = [
+                    f"{stat.size_diff / 1024:+.0f} КБ ({stat.count_diff:+d}) {stat.traceback.format()[0].strip()}"
+                    for stat in memory_stats.diff()
+                ]
+                text = "🧠 Прирост аллокаций с базового снимка:\n\n" + ("\n".join(lines) or "изменений нет")
+        elif action == 'stop':
+            memory_stats.stop()
+            text = "🧠 tracemalloc выключен"
+        else:
+            rss = process_rss()
+            lines = [
+                f"• {gauge.name}: {gauge.entries} записей, "
+                f"{'' if gauge.exact else '≥'}{_format_bytes(gauge.bytes)}"
+                for gauge in memory_stats.gauges()
+            ]
+            text = (
+                "🧠 Память процесса\n\n"
+                f"• RSS: {_format_bytes(rss) if rss is not None else 'н/д'}\n"
+                f"• tracemalloc: {'включен' if memory_stats.tracing else 'выключен'}\n\n"
+                "Хранилища:\n" + "\n".join(lines)
+            )
+    except Exception as e:
+        logger.error(f"Ошибка команды /memory: {e}", exc_info=True)
+        text = "❌ Не удалось получить данные о памяти"
+
+    # Без parse_mode: в путях файлов бывают символы разметки
+    await update.message.reply_text(text[:4000], disable_web_page_preview=True)
+
+
 async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик нажатий на кнопки главного меню"""
     text = update.message.text
@@ -346,9 +425,18 @@ async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+async def track_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Учет активности пользователя для адаптивной частоты опроса"""
+    if update.effective_user:
+        adaptive_poller.touch_user(update.effective_user.id)
+
+
 def setup_handlers(application):
     """Регистрация базовых обработчиков"""
 
+    # Активность пользователей - до всех остальных обработчиков
+    application.add_handler(TypeHandler(Update, track_activity), group=-1)
+
     # Команды
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("help", help_command))
@@ -357,6 +445,7 @@ def setup_handlers(application):
     application.add_handler(CommandHandler("scheduler_start", scheduler_start_command))
     application.add_handler(CommandHandler("scheduler_stop", scheduler_stop_command))
     application.add_handler(CommandHandler("scheduler_interval", scheduler_interval_command))
+    application.add_handler(CommandHandler("memory", memory_command))
 
     # Текстовые сообщения (кнопки главного меню)
     application.add_handler(
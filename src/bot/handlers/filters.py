@@ -5,8 +5,10 @@ from src.bot.keyboards.filters import (
     get_schedule_keyboard, get_employment_keyboard, get_area_keyboard
 )
 from src.bot.keyboards.main import get_main_keyboard
-from src.storage.database import get_session
-from src.storage.repositories.filter_repo import get_filter_repo
+from src.services.areas import area_index
+from src.services.dictionaries import hh_dictionaries, SCHEDULE_OPTIONS, EMPLOYMENT_OPTIONS
+from src.services.filter_service import filter_service
+from src.services.memory_stats import memory_stats
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,7 +20,7 @@ class FilterHandler:
     def __init__(self):
         self.waiting_for_input = {}  # user_id -> filter_type
 
-    def _format_filters_text(self, filters: dict) -> str:
+    def _format_filters_text(self, filters: dict, salary_alerts: bool = False) -> str:
         """Форматирует фильтры для отображения"""
         if not filters:
             return "❌ Фильтры не настроены"
@@ -29,39 +31,24 @@ class FilterHandler:
         if filters.get('salary_min'):
             parts.append(f"💰 Зарплата от: {filters['salary_min']} руб.")
         if filters.get('experience'):
-            exp_map = {
-                'noExperience': 'Без опыта',
-                'between1And3': '1-3 года',
-                'between3And6': '3-6 лет',
-                'moreThan6': 'Более 6 лет'
-            }
-            parts.append(f"🎓 Опыт: {exp_map.get(filters['experience'], filters['experience'])}")
+            parts.append(f"🎓 Опыт: {hh_dictionaries.name('experience', filters['experience'])}")
         if filters.get('schedule'):
-            schedule_map = {
-                'office': 'Офис',
-                'remote': 'Удалённо',
-                'hybrid': 'Гибрид',
-                'flexible': 'Гибкий график'
-            }
-            parts.append(f"📍 Формат: {schedule_map.get(filters['schedule'], filters['schedule'])}")
+            schedule = SCHEDULE_OPTIONS.get(filters['schedule'])
+            parts.append(f"📍 Формат: {schedule[0] if schedule else filters['schedule']}")
         if filters.get('employment'):
-            employment_map = {
-                'fullDay': 'Полный день',
-                'partDay': 'Частичная',
-                'project': 'Проектная',
-                'internship': 'Стажировка'
-            }
-            parts.append(f"🏢 Занятость: {employment_map.get(filters['employment'], filters['employment'])}")
+            employment = EMPLOYMENT_OPTIONS.get(filters['employment'])
+            parts.append(f"🏢 Занятость: {employment[0] if employment else filters['employment']}")
         if filters.get('area'):
             area = filters['area']
-            area_map = {
-                '1': 'Москва',
-                '2': 'Санкт-Петербург',
-                '3': 'Екатеринбург',
-                '4': 'Новосибирск',
-                'remote': 'Удалённо'
-            }
-            parts.append(f"🌍 Город: {area_map.get(area, area)}")
+            if area == 'remote':
+                area_name = 'Удалённо'
+            elif area.isdigit():
+                area_name = area_index.name(area)
+            else:
+                area_name = area
+            parts.append(f"🌍 Город: {area_name}")
+        if salary_alerts:
+            parts.append("📈 Уведомлять о росте зарплаты")
 
         return "\n".join(parts) if parts else "❌ Фильтры не настроены"
 
@@ -75,13 +62,13 @@ class FilterHandler:
                 user_id = update.effective_user.id
 
         # Получаем текущие фильтры пользователя
-        async for session in get_session():
-            repo = get_filter_repo(session)
-            current_filters = await repo.get_user_filters(user_id)
-            logger.info(f"🔍 Фильтры пользователя в фильтрах {user_id} (filters: {current_filters})")
+        profile = await filter_service.get_profile(user_id)
+        current_filters = profile.filters if profile else {}
+        salary_alerts = await filter_service.get_salary_alerts(user_id)
+        logger.info(f"🔍 Фильтры пользователя в фильтрах {user_id} (filters: {current_filters})")
 
         # Формируем текст с текущими настройками
-        filters_text = self._format_filters_text(current_filters)
+        filters_text = self._format_filters_text(current_filters, salary_alerts)
 
         message_text = (
             f"⚙️ *Настройка фильтров поиска*\n\n"
@@ -93,19 +80,19 @@ class FilterHandler:
             await update.callback_query.edit_message_text(
                 message_text,
                 parse_mode='Markdown',
-                reply_markup=get_filters_main_keyboard(current_filters)
+                reply_markup=get_filters_main_keyboard(current_filters, salary_alerts)
             )
         elif from_callback:
             await update.callback_query.edit_message_text(
                 message_text,
                 parse_mode='Markdown',
-                reply_markup=get_filters_main_keyboard(current_filters)
+                reply_markup=get_filters_main_keyboard(current_filters, salary_alerts)
             )
         else:
             await update.message.reply_text(
                 message_text,
                 parse_mode='Markdown',
-                reply_markup=get_filters_main_keyboard(current_filters)
+                reply_markup=get_filters_main_keyboard(current_filters, salary_alerts)
             )
 
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -210,30 +197,22 @@ class FilterHandler:
                         parse_mode='Markdown'
                     )
                 else:
-                    async for session in get_session():
-                        repo = get_filter_repo(session)
-                        await repo.save_filter(user_id, 'profession', profession)
+                    await filter_service.save_filter(user_id, 'profession', profession)
                     await self.show_filters_menu(update, context, user_id, from_callback=True)
 
             elif data.startswith("exp_"):
                 experience = data.replace("exp_", "")
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'experience', experience)
+                await filter_service.save_filter(user_id, 'experience', experience)
                 await self.show_filters_menu(update, context, user_id, from_callback=True)
 
             elif data.startswith("schedule_"):
                 schedule = data.replace("schedule_", "")
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'schedule', schedule)
+                await filter_service.save_filter(user_id, 'schedule', schedule)
                 await self.show_filters_menu(update, context, user_id, from_callback=True)
 
             elif data.startswith("employment_"):
                 employment = data.replace("employment_", "")
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'employment', employment)
+                await filter_service.save_filter(user_id, 'employment', employment)
                 await self.show_filters_menu(update, context, user_id, from_callback=True)
 
             elif data.startswith("area_"):
@@ -246,9 +225,7 @@ class FilterHandler:
                         parse_mode='Markdown'
                     )
                 else:
-                    async for session in get_session():
-                        repo = get_filter_repo(session)
-                        await repo.save_filter(user_id, 'area', area)
+                    await filter_service.save_filter(user_id, 'area', area)
                     await self.show_filters_menu(update, context, user_id, from_callback=True)
         except Exception as e:
             logger.error(f"Ошибка сохранения фильтра: {e}")
@@ -274,10 +251,21 @@ class FilterHandler:
                 reply_markup=get_main_keyboard()
             )
 
+        elif data == "filters_salary_alerts":
+            # Уведомления о росте зарплаты в уже отправленных вакансиях
+            filters = await filter_service.get_user_filters(user_id)
+            salary_alerts = await filter_service.get_salary_alerts(user_id)
+            if not any(filters.values()):
+                await query.edit_message_text(
+                    "📈 Сначала настройте фильтры поиска",
+                    reply_markup=get_filters_main_keyboard(filters, salary_alerts)
+                )
+                return
+            await filter_service.set_salary_alerts(user_id, not salary_alerts)
+            await self.show_filters_menu(update, context, user_id, from_callback=True)
+
         elif data == "filters_clear":
-            async for session in get_session():
-                repo = get_filter_repo(session)
-                await repo.clear_all_filters(user_id)
+            await filter_service.clear_filters(user_id)
 
             await query.edit_message_text(
                 "🧹 Все фильтры очищены!",
@@ -302,24 +290,18 @@ class FilterHandler:
                     self.waiting_for_input[user_id] = filter_type
                     return
 
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'salary_min', salary)
+                await filter_service.save_filter(user_id, 'salary_min', salary)
 
                 await update.message.reply_text(f"✅ Минимальная зарплата сохранена: {salary} руб.")
 
             elif filter_type == 'profession':
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'profession', text)
+                await filter_service.save_filter(user_id, 'profession', text)
 
                 await update.message.reply_text(f"✅ Профессия сохранена: {text}")
 
             elif filter_type == 'area':
                 # Сохраняем как есть, преобразование будет в filter_service
-                async for session in get_session():
-                    repo = get_filter_repo(session)
-                    await repo.save_filter(user_id, 'area', text)
+                await filter_service.save_filter(user_id, 'area', text)
 
                 await update.message.reply_text(f"✅ Город сохранен: {text}")
 
@@ -333,6 +315,7 @@ class FilterHandler:
 
 # Создаем экземпляр обработчика
 filter_handler = FilterHandler()
+memory_stats.register('filter_handler.waiting_for_input', lambda: filter_handler.waiting_for_input)
 
 
 # Функции для регистрации обработчиков
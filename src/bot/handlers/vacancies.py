@@ -1,12 +1,21 @@
+import time
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, filters, CommandHandler
 from logger import get_logger
 from src.services.hh_client import hh_client
-from src.services.filter_service import filter_service
+from src.services.filter_service import filter_service, with_paging
+from src.services.local_search import local_search_service
+from src.services.providers import vacancy_providers
+from src.services.cover_letter import cover_letter_service, CoverLetterBusy
+from src.services.exclusions import exclusion_service
+from src.services.memory_stats import memory_stats
 from src.bot.keyboards.main import get_main_keyboard
 
 logger = get_logger(__name__)
 
+# Не чаще одного редактирования сообщения в секунду при потоковой выдаче письма
+STREAM_EDIT_INTERVAL = 1.0
+
 
 class VacancyHandler:
     """Обработчик вакансий"""
@@ -25,10 +34,10 @@ class VacancyHandler:
                 reply_markup=get_main_keyboard()
             )
 
-        # Получаем фильтры пользователя
-        filters = await filter_service.get_user_filters(user_id)
+        # Получаем профиль фильтров пользователя
+        profile = await filter_service.get_profile(user_id)
 
-        if not filters:
+        if not profile:
             if hasattr(update, 'message') and update.message:
                 await update.message.reply_text(
                     "❌ У вас не настроены фильтры поиска.\n\n"
@@ -37,8 +46,8 @@ class VacancyHandler:
                 )
             return
 
-        # Преобразуем фильтры в параметры HH API
-        params = await filter_service.to_hh_params(filters)
+        # Параметры HH API уже скомпилированы в профиле
+        params = with_paging(profile.hh_params)
 
         # Если нет текстового запроса, используем что-то по умолчанию
         if not params.get('text'):
@@ -47,8 +56,9 @@ class VacancyHandler:
         logger.info(f"Поиск с параметрами: {params}")
 
         try:
-            # Ищем вакансии
-            vacancies = await hh_client.search_vacancies(**params)
+            # Ищем вакансии (повторные запросы - из локального хранилища), без скрытых пользователем
+            vacancies = await local_search_service.search(params)
+            vacancies = await exclusion_service.exclude(user_id, vacancies)
 
             if not vacancies:
                 if hasattr(update, 'message') and update.message:
@@ -181,19 +191,78 @@ class VacancyHandler:
 
         elif data.startswith("save_"):
             vacancy_id = data.replace("save_", "")
+            await exclusion_service.save(user_id, vacancy_id)
             await query.answer("💾 Вакансия сохранена в избранное!")
 
         elif data.startswith("hide_"):
             vacancy_id = data.replace("hide_", "")
+            await exclusion_service.hide(user_id, vacancy_id)
             await query.answer("👎 Больше не показывать эту вакансию")
+            await self._drop_from_search(update, context, user_id, vacancy_id)
 
         elif data.startswith("cover_"):
             vacancy_id = data.replace("cover_", "")
-            await query.answer("📝 Функция в разработке")
+            await self.send_cover_letter(context, user_id, vacancy_id)
 
         elif data == "page_info":
             await query.answer(f"Текущая страница")
 
+    async def _drop_from_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                user_id: int, vacancy_id: str):
+        """Убрать скрытую вакансию из текущей выдачи и показать следующую"""
+        search_data = self.user_searches.get(user_id)
+        if not search_data:
+            return
+
+        vacancies = search_data['vacancies']
+        search_data['vacancies'] = [v for v in vacancies if str(v.get('id')) != vacancy_id]
+        if not search_data['vacancies']:
+            await update.callback_query.edit_message_text("✅ Больше вакансий в этой выдаче нет")
+            return
+
+        index = min(search_data['current_index'], len(search_data['vacancies']) - 1)
+        await self.send_vacancy(update, context, user_id, index)
+
+    def _find_vacancy(self, user_id: int, vacancy_id: str):
+        """Вакансия из текущей выдачи пользователя"""
+        search_data = self.user_searches.get(user_id) or {}
+        for vacancy in search_data.get('vacancies', []):
+            if str(vacancy.get('id')) == vacancy_id:
+                return vacancy
+        return None
+
+    async def send_cover_letter(self, context: ContextTypes.DEFAULT_TYPE, user_id: int, vacancy_id: str):
+        """Сопроводительное письмо к вакансии: текст появляется в одном сообщении по мере генерации"""
+        if not cover_letter_service.client.is_configured:
+            await context.bot.send_message(chat_id=user_id, text="❌ Генерация писем не настроена")
+            return
+
+        # Полное описание дает письмо точнее, фрагмент из выдачи - запасной вариант
+        vacancy = await vacancy_providers.get_vacancy(vacancy_id) or self._find_vacancy(user_id, vacancy_id)
+        if not vacancy:
+            await context.bot.send_message(chat_id=user_id, text="❌ Вакансия не найдена")
+            return
+
+        profile = await filter_service.get_profile(user_id)
+        message = await context.bot.send_message(chat_id=user_id, text="📝 Пишу сопроводительное письмо...")
+
+        text = ''
+        last_edit = 0.0
+        try:
+            async for text in cover_letter_service.stream(vacancy, profile.filters if profile else {}):
+                if time.monotonic() - last_edit >= STREAM_EDIT_INTERVAL:
+                    await message.edit_text(text[:4000] + ' ▌')
+                    last_edit = time.monotonic()
+
+            await message.edit_text(
+                f"📝 Письмо к вакансии «{vacancy.get('name', '')}»:\n\n{text}"[:4096]
+            )
+        except CoverLetterBusy:
+            await message.edit_text("⏳ Сейчас готовится много писем, попробуйте через минуту")
+        except Exception as e:
+            logger.error(f"Ошибка генерации письма для вакансии {vacancy_id}: {e}")
+            await message.edit_text("❌ Не удалось подготовить письмо, попробуйте позже")
+
     async def _send_error_message(self, update: Update):
         """Сообщение об ошибке"""
         if hasattr(update, 'message') and update.message:
@@ -215,6 +284,7 @@ class VacancyHandler:
 
 # Создаем экземпляр обработчика
 vacancy_handler = VacancyHandler()
+memory_stats.register('vacancy_handler.user_searches', lambda: vacancy_handler.user_searches)
 
 
 # Функции для регистрации обработчиков
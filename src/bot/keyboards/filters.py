@@ -1,7 +1,8 @@
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import Dict, Optional
+from src.services.dictionaries import hh_dictionaries, SCHEDULE_OPTIONS, EMPLOYMENT_OPTIONS
 
-def get_filters_main_keyboard(current_filters: Optional[Dict] = None) -> InlineKeyboardMarkup:
+def get_filters_main_keyboard(current_filters: Optional[Dict] = None, salary_alerts: bool = False) -> InlineKeyboardMarkup:
     """Главное меню настройки фильтров"""
     keyboard = [
         [InlineKeyboardButton("💼 Профессия", callback_data="filter_profession")],
@@ -10,6 +11,10 @@ def get_filters_main_keyboard(current_filters: Optional[Dict] = None) -> InlineK
         [InlineKeyboardButton("📍 Формат работы", callback_data="filter_schedule")],
         [InlineKeyboardButton("🏢 Тип занятости", callback_data="filter_employment")],
         [InlineKeyboardButton("🌍 Город", callback_data="filter_area")],
+        [InlineKeyboardButton(
+            "📈 Рост зарплаты: " + ("вкл" if salary_alerts else "выкл"),
+            callback_data="filters_salary_alerts"
+        )],
         [
             InlineKeyboardButton("✅ Сохранить и выйти", callback_data="filters_save"),
             InlineKeyboardButton("🧹 Очистить все", callback_data="filters_clear")
@@ -32,37 +37,31 @@ def get_profession_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 def get_experience_keyboard() -> InlineKeyboardMarkup:
-    """Клавиатура выбора опыта"""
+    """Клавиатура выбора опыта (варианты из справочника HH)"""
     keyboard = [
-        [InlineKeyboardButton("Без опыта", callback_data="exp_noExperience")],
-        [InlineKeyboardButton("1-3 года", callback_data="exp_between1And3")],
-        [InlineKeyboardButton("3-6 лет", callback_data="exp_between3And6")],
-        [InlineKeyboardButton("Более 6 лет", callback_data="exp_moreThan6")],
-        [InlineKeyboardButton("↩️ Назад", callback_data="back_to_filters")]
+        [InlineKeyboardButton(item['name'], callback_data=f"exp_{item['id']}")]
+        for item in hh_dictionaries.items('experience')
     ]
+    keyboard.append([InlineKeyboardButton("↩️ Назад", callback_data="back_to_filters")])
     return InlineKeyboardMarkup(keyboard)
 
-def get_schedule_keyboard() -> InlineKeyboardMarkup:
-    """Клавиатура выбора формата работы"""
+def _options_keyboard(prefix: str, options: Dict, dictionary: str) -> InlineKeyboardMarkup:
+    """Клавиатура вариантов фильтра, которые HH сейчас принимает"""
     keyboard = [
-        [InlineKeyboardButton("Офис", callback_data="schedule_office")],
-        [InlineKeyboardButton("Удалённо", callback_data="schedule_remote")],
-        [InlineKeyboardButton("Гибрид", callback_data="schedule_hybrid")],
-        [InlineKeyboardButton("Гибкий график", callback_data="schedule_flexible")],
-        [InlineKeyboardButton("↩️ Назад", callback_data="back_to_filters")]
+        [InlineKeyboardButton(label, callback_data=f"{prefix}_{key}")]
+        for key, (label, hh_id) in options.items()
+        if hh_dictionaries.is_valid(dictionary, hh_id)
     ]
+    keyboard.append([InlineKeyboardButton("↩️ Назад", callback_data="back_to_filters")])
     return InlineKeyboardMarkup(keyboard)
 
+def get_schedule_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура выбора формата работы"""
+    return _options_keyboard("schedule", SCHEDULE_OPTIONS, 'schedule')
+
 def get_employment_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура выбора типа занятости"""
-    keyboard = [
-        [InlineKeyboardButton("Полный день", callback_data="employment_fullDay")],
-        [InlineKeyboardButton("Частичная", callback_data="employment_partDay")],
-        [InlineKeyboardButton("Проектная", callback_data="employment_project")],
-        [InlineKeyboardButton("Стажировка", callback_data="employment_internship")],
-        [InlineKeyboardButton("↩️ Назад", callback_data="back_to_filters")]
-    ]
-    return InlineKeyboardMarkup(keyboard)
+    return _options_keyboard("employment", EMPLOYMENT_OPTIONS, 'employment')
 
 def get_area_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура выбора города"""
@@ -0,0 +1,213 @@
+"""
+Адаптивная частота опроса HH.
+
+Для каждого канонического запроса ведется экспоненциальное среднее числа новых
+вакансий в час. Интервал опроса подбирается так, чтобы за один запрос приходило
+около TARGET_NEW_PER_POLL новых вакансий: запросы с высокой отдачей опрашиваются
+чаще, спящие - реже. Запросы, все пользователи которых давно не заходили в бота,
+опрашиваются еще реже. Очередь упорядочена по времени следующего опроса, а общий
+бюджет запросов к HH ограничен корзиной токенов.
+"""
+import heapq
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from logger import get_logger
+from config import config
+from src.storage.database import AsyncSessionLocal
+from src.storage.repositories.poll_stats_repo import get_poll_stats_repo
+from src.services.memory_stats import memory_stats
+
+logger = get_logger(__name__)
+
+# Сколько новых вакансий ожидаем за один опрос
+TARGET_NEW_PER_POLL = 3
+# Вес нового наблюдения в экспоненциальном среднем
+EWMA_ALPHA = 0.3
+# Пользователь считается неактивным через неделю без действий в боте
+IDLE_AFTER = 7 * 24 * 3600
+IDLE_FACTOR = 4
+# Сколько id из последних выдач помнить для подсчета новых
+SEEN_LIMIT = 100
+
+
+@dataclass
+class QueryState:
+    """Состояние опроса одного запроса"""
+    query_hash: str
+    rate: Optional[float] = None  # новых вакансий в час, None - истории еще нет
+    last_polled: float = 0.0  # unix time
+    next_due: float = 0.0
+    seen_ids: List[int] = field(default_factory=list)
+    members: Set[int] = field(default_factory=set)  # telegram_id пользователей запроса
+
+
+class AdaptivePoller:
+    """Очередь запросов с приоритетом по времени следующего опроса и бюджетом запросов к HH"""
+
+    def __init__(self, base_interval_minutes: int = None, min_interval_minutes: int = None,
+                 max_interval_minutes: int = None, budget_per_hour: int = None):
+        self.base_interval = 60 * (base_interval_minutes or config.CHECK_INTERVAL)
+        self.min_interval = 60 * (min_interval_minutes or config.ADAPTIVE_MIN_INTERVAL)
+        self.max_interval = 60 * (max_interval_minutes or config.ADAPTIVE_MAX_INTERVAL)
+        self.budget_per_hour = budget_per_hour or config.HH_REQUEST_BUDGET
+
+        self.states: Dict[str, QueryState] = {}
+        self.last_active: Dict[int, float] = {}  # telegram_id -> unix time последнего действия
+        self._heap: List[Tuple[float, str]] = []
+        # Корзина токенов: не больше пяти минут бюджета за раз
+        self.capacity = max(1.0, self.budget_per_hour / 12)
+        self.tokens = self.capacity
+        self._refilled_at = time.time()
+
+    # --- активность пользователей ---
+
+    def touch_user(self, telegram_id: int, at: float = None):
+        """Отметить действие пользователя в боте"""
+        self.last_active[telegram_id] = at or time.time()
+
+    def seed_activity(self, telegram_id: int, updated_at: Optional[datetime]):
+        """Начальная активность по времени последнего изменения фильтров (UTC)"""
+        if telegram_id not in self.last_active and updated_at:
+            self.last_active[telegram_id] = updated_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def _is_idle(self, state: QueryState, now: float) -> bool:
+        return bool(state.members) and all(
+            now - self.last_active.get(telegram_id, 0.0) > IDLE_AFTER for telegram_id in state.members
+        )
+
+    # --- интервалы ---
+
+    def interval_for(self, state: QueryState, now: float = None) -> float:
+        """Интервал до следующего опроса запроса в секундах"""
+        now = now or time.time()
+        if state.rate is None:
+            interval = self.base_interval
+        elif state.rate <= 0:
+            interval = self.max_interval
+        else:
+            interval = TARGET_NEW_PER_POLL / state.rate * 3600
+        interval = min(self.max_interval, max(self.min_interval, interval))
+
+        if self._is_idle(state, now):
+            interval *= IDLE_FACTOR
+        return interval
+
+    def _schedule(self, state: QueryState, due: float):
+        state.next_due = due
+        heapq.heappush(self._heap, (due, state.query_hash))
+
+    # --- очередь ---
+
+    def sync(self, groups: Dict[str, Iterable[int]], now: float = None):
+        """Привести очередь к текущему набору запросов: {query_hash: telegram_id пользователей}"""
+        now = now or time.time()
+        for query_hash in list(self.states):
+            if query_hash not in groups:
+                del self.states[query_hash]
+
+        for query_hash, members in groups.items():
+            state = self.states.get(query_hash)
+            if state is None:
+                state = self.states[query_hash] = QueryState(query_hash)
+            state.members = set(members)
+            if not state.next_due:
+                # Новый запрос опрашиваем сразу, известный - через интервал после прошлого опроса
+                due = state.last_polled + self.interval_for(state, now) if state.last_polled else now
+                self._schedule(state, due)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.budget_per_hour / 3600)
+        self._refilled_at = now
+
+    def take_due(self, now: float = None) -> List[str]:
+        """Запросы, которые пора опросить, в порядке срока и в пределах бюджета"""
+        now = now or time.time()
+        self._refill(now)
+
+        due = []
+        while self._heap and self._heap[0][0] <= now and self.tokens >= 1:
+            next_due, query_hash = heapq.heappop(self._heap)
+            state = self.states.get(query_hash)
+            if state is None or state.next_due != next_due:
+                continue  # устаревшая запись очереди
+            state.next_due = 0.0
+            self.tokens -= 1
+            due.append(query_hash)
+
+        if self._heap and self._heap[0][0] <= now and self.tokens < 1:
+            logger.debug("Бюджет запросов к HH исчерпан, в очереди ждут запросы")
+        return due
+
+    def record(self, query_hash: str, vacancy_ids: List[int], now: float = None) -> int:
+        """Учесть результат опроса и поставить запрос в очередь; возвращает число новых вакансий"""
+        now = now or time.time()
+        state = self.states.get(query_hash)
+        if state is None:
+            return 0
+
+        seen = set(state.seen_ids)
+        new_ids = [vacancy_id for vacancy_id in vacancy_ids if vacancy_id not in seen]
+        # Первый опрос только запоминает выдачу: все вакансии в ней кажутся новыми
+        if state.last_polled:
+            hours = max((now - state.last_polled) / 3600, 1 / 60)
+            observed = len(new_ids) / hours
+            state.rate = observed if state.rate is None else EWMA_ALPHA * observed + (1 - EWMA_ALPHA) * state.rate
+
+        state.seen_ids = (new_ids + state.seen_ids)[:SEEN_LIMIT]
+        state.last_polled = now
+        self._schedule(state, now + self.interval_for(state, now))
+        return len(new_ids)
+
+    def defer(self, query_hash: str, now: float = None):
+        """Повторить запрос позже после ошибки"""
+        now = now or time.time()
+        state = self.states.get(query_hash)
+        if state is not None:
+            self._schedule(state, now + self.min_interval)
+
+    # --- хранение ---
+
+    def export_activity(self) -> Dict[str, float]:
+        """Активность пользователей для снимка состояния (в БД она не хранится)"""
+        return {str(telegram_id): at for telegram_id, at in self.last_active.items()}
+
+    def import_activity(self, activity: Dict[str, float]):
+        """Восстановить активность из снимка, не откатывая более свежие отметки"""
+        for telegram_id, at in activity.items():
+            telegram_id = int(telegram_id)
+            self.last_active[telegram_id] = max(at, self.last_active.get(telegram_id, 0.0))
+
+    async def load(self):
+        """Загрузить историю опроса из БД"""
+        async with AsyncSessionLocal() as session:
+            rows = await get_poll_stats_repo(session).get_all()
+
+        for row in rows:
+            state = self.states.setdefault(row.query_hash, QueryState(row.query_hash))
+            state.rate = row.rate
+            state.seen_ids = [int(vacancy_id) for vacancy_id in row.seen_ids or []]
+            if row.last_polled_at:
+                state.last_polled = row.last_polled_at.replace(tzinfo=timezone.utc).timestamp()
+        logger.info(f"📈 Загружена история опроса {len(rows)} запросов")
+
+    async def save(self, query_hashes: Iterable[str]):
+        """Сохранить историю опроса запросов"""
+        stats = [
+            {
+                'query_hash': state.query_hash,
+                'rate': state.rate,
+                'last_polled_at': datetime.utcfromtimestamp(state.last_polled) if state.last_polled else None,
+                'seen_ids': state.seen_ids,
+            }
+            for state in (self.states.get(query_hash) for query_hash in query_hashes)
+            if state is not None
+        ]
+        async with AsyncSessionLocal() as session:
+            await get_poll_stats_repo(session).save_many(stats)
+
+
+# Синглтон
+adaptive_poller = AdaptivePoller()
+memory_stats.register('adaptive_poller.states', lambda: adaptive_poller.states)
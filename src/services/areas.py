@@ -0,0 +1,228 @@
+"""
+Дерево регионов HH (/areas) со снимком на диске и нечетким поиском города по названию.
+
+Обновить снимок вручную:
+    python -m src.services.areas
+"""
+import asyncio
+import gzip
+import json
+import os
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+from logger import get_logger
+from config import config
+from src.services.city_mapping import CITY_MAPPING
+
+logger = get_logger(__name__)
+
+RUSSIA_ID = '113'
+
+_SEPARATORS_RE = re.compile(r"[\s\-‐–—_.,()]+")
+_PREFIX_RE = re.compile(r"^(г|город|пос|поселок|с|село)\.?\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Нормализация названия: регистр, ё/е, дефисы и лишние пробелы, префикс "г." """
+    name = name.lower().replace('ё', 'е').strip()
+    name = _PREFIX_RE.sub('', name)
+    return _SEPARATORS_RE.sub(' ', name).strip()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Расстояние Дамерау-Левенштейна с ранним выходом при превышении limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class AreaIndex:
+    """Индекс регионов: id -> (родитель, название), нормализованное название -> id"""
+
+    def __init__(self, snapshot_path: str = None):
+        self.snapshot_path = snapshot_path or config.AREAS_SNAPSHOT_PATH
+        self.parents: Dict[str, Optional[str]] = {}
+        self.names: Dict[str, str] = {}
+        self.children: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._sorted_names: List[str] = []
+        self._by_first_letter: Dict[str, List[str]] = {}
+        self._expanded: Dict[str, Set[str]] = {}
+        self._loaded = False
+
+    # --- загрузка ---
+
+    def _build(self, rows: List[Tuple[str, Optional[str], str]]):
+        self.parents, self.names, self.children = {}, {}, {}
+        self._by_name, self._by_first_letter, self._expanded = {}, {}, {}
+
+        for area_id, parent_id, name in rows:
+            self.parents[area_id] = parent_id
+            self.names[area_id] = name
+            if parent_id:
+                self.children.setdefault(parent_id, []).append(area_id)
+            self._by_name.setdefault(normalize_name(name), []).append(area_id)
+
+        # При совпадении названий приоритет у России и у более крупных регионов
+        for ids in self._by_name.values():
+            ids.sort(key=lambda area_id: (self.root(area_id) != RUSSIA_ID, self.depth(area_id)))
+
+        self._sorted_names = sorted(self._by_name)
+        for name in self._sorted_names:
+            self._by_first_letter.setdefault(name[:1], []).append(name)
+        self._loaded = True
+
+    def load(self):
+        """Загрузить снимок с диска; без снимка используется встроенный список городов"""
+        try:
+            with gzip.open(self.snapshot_path, 'rt', encoding='utf-8') as f:
+                rows = json.load(f)
+            self._build([tuple(row) for row in rows])
+            logger.info(f"🌍 Загружено регионов HH: {len(rows)}")
+        except FileNotFoundError:
+            self._build([(area_id, None, name) for name, area_id in CITY_MAPPING.items()])
+            logger.info("Снимок регионов HH не найден, используется встроенный список городов")
+        except (OSError, ValueError) as e:
+            self._build([(area_id, None, name) for name, area_id in CITY_MAPPING.items()])
+            logger.warning(f"Поврежден снимок регионов {self.snapshot_path}: {e}")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    @property
+    def has_snapshot(self) -> bool:
+        return os.path.exists(self.snapshot_path)
+
+    @staticmethod
+    def flatten(tree: List[Dict]) -> List[Tuple[str, Optional[str], str]]:
+        """Развернуть дерево /areas в плоский список (id, parent_id, name)"""
+        rows = []
+        stack = list(tree)
+        while stack:
+            node = stack.pop()
+            rows.append((str(node['id']), node.get('parent_id'), node['name']))
+            stack.extend(node.get('areas') or [])
+        return rows
+
+    def save_snapshot(self, tree: List[Dict]):
+        """Сохранить компактный снимок дерева и перестроить индекс"""
+        rows = self.flatten(tree)
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        with gzip.open(self.snapshot_path, 'wt', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, separators=(',', ':'))
+        self._build(rows)
+        logger.info(f"🌍 Снимок регионов HH сохранен: {len(rows)} регионов")
+
+    async def refresh(self) -> bool:
+        """Загрузить дерево регионов из HH и обновить снимок"""
+        from src.services.hh_client import hh_client
+        tree = await hh_client.get_areas()
+        if not tree:
+            return False
+        self.save_snapshot(tree)
+        return True
+
+    async def refresh_if_missing(self) -> bool:
+        """Загрузить дерево из HH, только если снимка на диске еще нет; True, если дерево загружено"""
+        if self.has_snapshot:
+            return False
+        return await self.refresh()
+
+    # --- дерево ---
+
+    def depth(self, area_id: str) -> int:
+        depth = 0
+        while self.parents.get(area_id):
+            area_id = self.parents[area_id]
+            depth += 1
+        return depth
+
+    def root(self, area_id: str) -> str:
+        while self.parents.get(area_id):
+            area_id = self.parents[area_id]
+        return area_id
+
+    def ancestors(self, area_id: Optional[str]) -> List[str]:
+        """Регион и все его родители, начиная с самого региона"""
+        self._ensure_loaded()
+        chain = []
+        while area_id:
+            chain.append(str(area_id))
+            area_id = self.parents.get(str(area_id))
+        return chain
+
+    def expand(self, area_id: str) -> Set[str]:
+        """Регион вместе со всеми вложенными регионами"""
+        self._ensure_loaded()
+        area_id = str(area_id)
+        expanded = self._expanded.get(area_id)
+        if expanded is None:
+            expanded, stack = set(), [area_id]
+            while stack:
+                current = stack.pop()
+                expanded.add(current)
+                stack.extend(self.children.get(current, ()))
+            self._expanded[area_id] = expanded
+        return expanded
+
+    def name(self, area_id: str) -> str:
+        self._ensure_loaded()
+        return self.names.get(str(area_id), str(area_id))
+
+    # --- поиск ---
+
+    def _rank_name(self, name: str) -> Tuple[bool, int, int]:
+        area_id = self._by_name[name][0]
+        return self.root(area_id) != RUSSIA_ID, len(name), self.depth(area_id)
+
+    def resolve(self, text: str) -> Optional[str]:
+        """Найти id региона по свободному вводу: точное совпадение, префикс, опечатки"""
+        self._ensure_loaded()
+        query = normalize_name(text or '')
+        if not query:
+            return None
+
+        exact = self._by_name.get(query)
+        if exact:
+            return exact[0]
+
+        # Префикс: "санкт" -> "санкт петербург"
+        position = bisect_left(self._sorted_names, query)
+        prefixed = []
+        while position < len(self._sorted_names) and self._sorted_names[position].startswith(query):
+            prefixed.append(self._sorted_names[position])
+            position += 1
+        if prefixed and len(query) >= 3:
+            return self._by_name[min(prefixed, key=self._rank_name)][0]
+
+        # Опечатки: до 1 ошибки для коротких названий, до 2 для длинных
+        limit = 1 if len(query) <= 5 else 2
+        best_name, best_distance = None, limit + 1
+        for name in self._by_first_letter.get(query[:1], ()):
+            distance = edit_distance(query, name, limit)
+            if distance < best_distance:
+                best_name, best_distance = name, distance
+        return self._by_name[best_name][0] if best_name else None
+
+
+# Синглтон
+area_index = AreaIndex()
+
+
+if __name__ == '__main__':
+    asyncio.run(area_index.refresh())
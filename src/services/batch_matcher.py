@@ -0,0 +1,145 @@
+"""
+Векторизованное сопоставление пачки вакансий со всеми профилями на NumPy
+"""
+import zlib
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from logger import get_logger
+from src.services.areas import area_index
+from src.services.matching import MatchIndex, tokenize, vacancy_max_salary
+
+logger = get_logger(__name__)
+
+ANY = 0       # код "без ограничения" в профиле
+UNKNOWN = -1  # код значения вакансии, которого нет ни в одном профиле
+
+
+def token_bit(token: str) -> int:
+    """Бит токена в 64-битной маске (детерминированно между процессами)"""
+    return 1 << (zlib.crc32(token.encode('utf-8')) & 63)
+
+
+def token_mask(tokens: Iterable[str]) -> int:
+    mask = 0
+    for token in tokens:
+        mask |= token_bit(token)
+    return mask
+
+
+class BatchMatcher:
+    """
+    Профили пользователей в виде колонок NumPy.
+
+    Поля area/experience/schedule/employment кодируются словарем значений
+    (0 - без ограничения), регион вакансии - вместе с его родителями,
+    зарплата - int64 (0 - без ограничения), токены профессии - 64-битной
+    маской. Маска может давать ложные совпадения, поэтому совпадения по
+    тексту перепроверяются точно.
+    """
+
+    FIELDS = MatchIndex.FIELDS
+    CODE_FIELDS = FIELDS[1:]  # поля с точным совпадением (все, кроме area)
+
+    def __init__(self):
+        self.user_keys = np.zeros(0, dtype=np.int64)
+        self.codes: Dict[str, Dict[str, int]] = {name: {} for name in self.FIELDS}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.salary = np.zeros(0, dtype=np.int64)
+        self.mask = np.zeros(0, dtype=np.uint64)
+        self.user_tokens: List[Optional[frozenset]] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.user_keys)
+
+    @classmethod
+    def build(cls, profiles: Iterable) -> 'BatchMatcher':
+        """Построить колонки из пар (ключ пользователя, скомпилированные параметры HH)"""
+        matcher = cls()
+        keys, salaries, masks = [], [], []
+        columns = {name: [] for name in cls.FIELDS}
+
+        for user_key, hh_params in profiles:
+            keys.append(user_key)
+            for name in cls.FIELDS:
+                value = hh_params.get(name)
+                if value is None:
+                    columns[name].append(ANY)
+                else:
+                    codes = matcher.codes[name]
+                    columns[name].append(codes.setdefault(str(value), len(codes) + 1))
+
+            salaries.append(int(hh_params.get('salary_min') or 0))
+            tokens = tokenize(hh_params.get('text'))
+            masks.append(token_mask(tokens))
+            matcher.user_tokens.append(frozenset(tokens) if tokens else None)
+
+        matcher.user_keys = np.array(keys, dtype=np.int64)
+        matcher.columns = {name: np.array(values, dtype=np.int32) for name, values in columns.items()}
+        matcher.salary = np.array(salaries, dtype=np.int64)
+        matcher.mask = np.array(masks, dtype=np.uint64)
+        return matcher
+
+    def encode_vacancies(self, vacancies: List[Dict]) -> Dict[str, np.ndarray]:
+        """Закодировать пачку вакансий теми же словарями, что и профили"""
+        encoded = {}
+        area_codes = self.codes['area']
+        # Регион вакансии - строка из кодов всей цепочки родителей, ширина - по самой длинной цепочке
+        chains = [area_index.ancestors((v.get('area') or {}).get('id')) for v in vacancies]
+        depth = max((len(chain) for chain in chains), default=0) or 1
+        encoded['area'] = np.array(
+            [[area_codes.get(a, UNKNOWN) for a in chain] + [UNKNOWN] * (depth - len(chain)) for chain in chains],
+            dtype=np.int32
+        ).reshape(len(vacancies), depth)
+
+        for name in self.CODE_FIELDS:
+            codes = self.codes[name]
+            encoded[name] = np.array(
+                [codes.get(str((v.get(name) or {}).get('id')), UNKNOWN) for v in vacancies],
+                dtype=np.int32
+            )
+        encoded['salary'] = np.array([vacancy_max_salary(v) or 0 for v in vacancies], dtype=np.int64)
+        encoded['mask'] = np.array([token_mask(tokenize(v.get('name'))) for v in vacancies], dtype=np.uint64)
+        return encoded
+
+    def match_matrix(self, vacancies: List[Dict]) -> np.ndarray:
+        """Матрица совпадений вакансия x пользователь (bool, shape = (V, U))"""
+        encoded = self.encode_vacancies(vacancies)
+
+        # Регион вакансии совпадает с профилем, если профиль указывает на него или на его родителя
+        users = self.columns['area'][None, :]
+        result = np.zeros((len(vacancies), self.size), dtype=bool)
+        result |= users == ANY
+        for level in range(encoded['area'].shape[1]):
+            result |= users == encoded['area'][:, level][:, None]
+
+        for name in self.CODE_FIELDS:
+            users = self.columns[name][None, :]
+            result &= (users == ANY) | (users == encoded[name][:, None])
+
+        result &= (self.salary[None, :] == 0) | (encoded['salary'][:, None] >= self.salary[None, :])
+        result &= (encoded['mask'][:, None] & self.mask[None, :]) == self.mask[None, :]
+        return result
+
+    def match_all(self, vacancies: List[Dict], chunk_size: int = 64) -> Dict[int, List[Dict]]:
+        """Разложить пачку вакансий по пользователям (матрица считается порциями)"""
+        per_user: Dict[int, List[Dict]] = {}
+        if not self.size:
+            return per_user
+
+        for start in range(0, len(vacancies), chunk_size):
+            chunk = vacancies[start:start + chunk_size]
+            rows, cols = np.nonzero(self.match_matrix(chunk))
+            chunk_tokens = [None] * len(chunk)
+
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                required = self.user_tokens[col]
+                if required:
+                    # Точная проверка после маски
+                    if chunk_tokens[row] is None:
+                        chunk_tokens[row] = tokenize(chunk[row].get('name'))
+                    if not required <= chunk_tokens[row]:
+                        continue
+                per_user.setdefault(int(self.user_keys[col]), []).append(chunk[row])
+
+        return per_user
@@ -0,0 +1,142 @@
+"""
+Предохранители (circuit breaker) для внешних зависимостей: HH API и Telegram.
+
+closed    - запросы идут, исходы последних WINDOW вызовов копятся в окне;
+open      - доля ошибок в окне превысила порог: запросы сразу отклоняются
+            в течение open_seconds, без ожидания таймаутов;
+half_open - после паузы пропускается один пробный запрос: успех закрывает
+            предохранитель, ошибка снова открывает.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Размер окна исходов и минимум вызовов в нем для решения об открытии
+WINDOW = 20
+MIN_CALLS = 5
+
+
+class CircuitOpenError(Exception):
+    """Зависимость недоступна: предохранитель открыт"""
+
+    def __init__(self, name: str, retry_at: float):
+        super().__init__(f"{name}: предохранитель открыт")
+        self.name = name
+        self.retry_at = retry_at
+
+
+class CircuitBreaker:
+    """Предохранитель с окном доли ошибок"""
+
+    def __init__(self, name: str, failure_rate: float = None, open_seconds: float = None,
+                 window: int = WINDOW, min_calls: int = MIN_CALLS):
+        self.name = name
+        self.failure_rate = failure_rate or config.BREAKER_FAILURE_RATE
+        self.open_seconds = open_seconds or config.BREAKER_OPEN_SECONDS
+        self.min_calls = min_calls
+        self.outcomes: Deque[bool] = deque(maxlen=window)  # True - ошибка
+        self._state = CLOSED
+        self.opened_at = 0.0
+        self._trial_in_progress = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_in_progress = False
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Запросы сейчас отклоняются (пробный запрос в half_open не в счет)"""
+        return self.state == OPEN
+
+    @property
+    def retry_at(self) -> float:
+        """Когда (time.monotonic) предохранитель пропустит пробный запрос"""
+        return self.opened_at + self.open_seconds
+
+    def retry_in(self) -> float:
+        return max(0.0, self.retry_at - time.monotonic()) if self.is_open else 0.0
+
+    def allow(self) -> bool:
+        """Можно ли выполнить запрос; в half_open пропускается только один пробный"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self):
+        """allow() с исключением для отклоненного запроса"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_at)
+
+    def record_success(self):
+        if self._state == HALF_OPEN:
+            logger.info(f"🟢 {self.name}: зависимость восстановилась, предохранитель закрыт")
+            self._state = CLOSED
+            self.outcomes.clear()
+        self._trial_in_progress = False
+        self.outcomes.append(False)
+
+    def release(self):
+        """Завершить вызов без исхода (отмена, ошибка не на стороне зависимости): пробный слот освобождается"""
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self._trial_in_progress = False
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+
+        self.outcomes.append(True)
+        failures = sum(self.outcomes)
+        if (self._state == CLOSED and len(self.outcomes) >= self.min_calls
+                and failures / len(self.outcomes) >= self.failure_rate):
+            self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(f"🔴 {self.name}: предохранитель открыт на {self.open_seconds:.0f} с "
+                       f"(ошибок {sum(self.outcomes)} из {len(self.outcomes)})")
+
+    def snapshot(self) -> Dict:
+        """Состояние для /scheduler_status"""
+        failures = sum(self.outcomes)
+        return {
+            'state': self.state,
+            'failures': failures,
+            'calls': len(self.outcomes),
+            'rejected': self.rejected,
+            'retry_in': round(self.retry_in()),
+        }
+
+
+hh_breaker = CircuitBreaker('HH API')
+telegram_breaker = CircuitBreaker('Telegram')
+
+
+def breaker_states() -> Dict[str, Dict]:
+    return {breaker.name: breaker.snapshot() for breaker in (hh_breaker, telegram_breaker)}
+
+
+def blocking_breaker() -> Optional[CircuitBreaker]:
+    """Открытый предохранитель, из-за которого проход планировщика стоит отложить"""
+    for breaker in (hh_breaker, telegram_breaker):
+        if breaker.is_open:
+            return breaker
+    return None
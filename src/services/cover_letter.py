@@ -0,0 +1,157 @@
+"""
+Сопроводительные письма к вакансиям.
+
+Письма кэшируются по хэшу содержимого вакансии и профиля пользователя, поэтому
+повторные и популярные вакансии не требуют обращения к LLM. Одинаковые запросы,
+пришедшие во время генерации, ждут общий результат. Число одновременных
+обращений к LLM и длина очереди ограничены.
+"""
+import asyncio
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional
+from logger import get_logger
+from config import config
+from src.services.areas import area_index
+from src.services.deepseek import LLMError, deepseek_client
+from src.services.dictionaries import hh_dictionaries
+from src.services.memory_stats import memory_stats
+
+logger = get_logger(__name__)
+
+# Сколько символов описания вакансии отправлять в модель
+DESCRIPTION_LIMIT = 3000
+
+SYSTEM_PROMPT = (
+    "Ты помогаешь соискателю откликнуться на вакансию. Напиши короткое (до 1200 символов) "
+    "сопроводительное письмо на русском языке: вежливое, конкретное, без шаблонных фраз "
+    "и выдуманных фактов о кандидате. Не используй Markdown."
+)
+
+class CoverLetterBusy(Exception):
+    """Очередь генерации писем переполнена"""
+
+
+def _strip_html(text: Optional[str]) -> str:
+    return re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', text or '')).strip()
+
+
+def vacancy_text(vacancy: Dict) -> str:
+    """Описание вакансии для промпта: полное описание или фрагменты из выдачи поиска"""
+    snippet = vacancy.get('snippet') or {}
+    description = _strip_html(vacancy.get('description')) or ' '.join(
+        _strip_html(snippet.get(key)) for key in ('requirement', 'responsibility') if snippet.get(key)
+    )
+    skills = ', '.join(skill.get('name', '') for skill in vacancy.get('key_skills') or [])
+
+    lines = [
+        f"Вакансия: {vacancy.get('name', '')}",
+        f"Компания: {(vacancy.get('employer') or {}).get('name', '')}",
+    ]
+    if skills:
+        lines.append(f"Ключевые навыки: {skills}")
+    if description:
+        lines.append(f"Описание: {description[:DESCRIPTION_LIMIT]}")
+    return '\n'.join(lines)
+
+
+def profile_text(filters: Dict) -> str:
+    """Что известно о кандидате из его фильтров"""
+    lines = []
+    if filters.get('profession'):
+        lines.append(f"Желаемая должность: {filters['profession']}")
+    if filters.get('experience'):
+        lines.append(f"Опыт работы: {hh_dictionaries.name('experience', filters['experience'])}")
+    if filters.get('area'):
+        lines.append(f"Город: {area_index.name(filters['area'])}")
+    if filters.get('salary_min'):
+        lines.append(f"Ожидаемая зарплата: от {filters['salary_min']} ₽")
+    return '\n'.join(lines) or 'Данных о кандидате нет'
+
+
+def cache_key(vacancy: Dict, filters: Dict) -> str:
+    """Хэш содержимого вакансии и профиля: изменение любого из них дает новое письмо"""
+    payload = json.dumps([vacancy_text(vacancy), filters], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CoverLetterService:
+    """Генерация писем с кэшем, объединением одинаковых запросов и ограничением параллельности"""
+
+    def __init__(self, client=None, concurrency: int = None, queue_size: int = None,
+                 cache_size: int = 500):
+        self.client = client or deepseek_client
+        self.queue_size = queue_size or config.COVER_LETTER_QUEUE
+        self.cache_size = cache_size
+        self._semaphore = asyncio.Semaphore(concurrency or config.COVER_LETTER_CONCURRENCY)
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queued = 0
+
+    def _remember(self, key: str, text: str):
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def backlog(self) -> Dict[str, int]:
+        """Письма, ожидающие свободного слота, и генерируемые сейчас"""
+        return {'queued': self._queued, 'in_flight': len(self._in_flight) - self._queued}
+
+    async def stream(self, vacancy: Dict, filters: Dict) -> AsyncIterator[str]:
+        """Текст письма, накопленный к текущему моменту; последнее значение - письмо целиком"""
+        key = cache_key(vacancy, filters)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            logger.debug(f"Письмо {key[:12]} взято из кэша")
+            yield cached
+            return
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # Такое же письмо уже генерируется - ждем общий результат
+            yield await asyncio.shield(in_flight)
+            return
+
+        if self._queued >= self.queue_size:
+            raise CoverLetterBusy()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._queued += 1
+        waiting = True
+        try:
+            async with self._semaphore:
+                self._queued -= 1
+                waiting = False
+                messages = [
+                    {'role': 'system', 'content': SYSTEM_PROMPT},
+                    {'role': 'user', 'content': f"{vacancy_text(vacancy)}\n\nО кандидате:\n{profile_text(filters)}"},
+                ]
+                text = ''
+                async for part in self.client.stream_chat(messages):
+                    text += part
+                    yield text
+
+            text = text.strip()
+            self._remember(key, text)
+            future.set_result(text)
+            logger.info(f"📝 Сгенерировано письмо {key[:12]} ({len(text)} символов)")
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e if isinstance(e, Exception) else LLMError("Генерация письма прервана"))
+                future.exception()  # ожидающих может не быть
+            raise
+        finally:
+            if waiting:
+                self._queued -= 1
+            self._in_flight.pop(key, None)
+
+
+# Синглтон
+cover_letter_service = CoverLetterService()
+memory_stats.register('cover_letters.cache', lambda: cover_letter_service._cache)
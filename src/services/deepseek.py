@@ -1,7 +1,78 @@
-# Заглушка для DeepSeek API
+"""
+Клиент LLM с OpenAI-совместимым API (по умолчанию DeepSeek).
+
+Адрес API настраивается, поэтому вместо DeepSeek можно подставить любой
+совместимый сервер, в том числе локальную заглушку для проверки.
+"""
+import json
+from typing import AsyncIterator, Dict, List
+import aiohttp
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+
+class LLMError(Exception):
+    """Ошибка обращения к LLM"""
+
+
 class DeepSeekClient:
-    def __init__(self):
-        pass
+    """Потоковая генерация через /chat/completions"""
+
+    def __init__(self, api_key: str = None, api_url: str = None, model: str = None,
+                 timeout: float = 120):
+        self.api_key = api_key if api_key is not None else config.DEEPSEEK_API_KEY
+        self.api_url = (api_url or config.DEEPSEEK_API_URL).rstrip('/')
+        self.model = model or config.DEEPSEEK_MODEL
+        self.timeout = timeout
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def stream_chat(self, messages: List[Dict], temperature: float = 0.7,
+                          max_tokens: int = 1000) -> AsyncIterator[str]:
+        """Фрагменты ответа модели по мере генерации (server-sent events)"""
+        if not self.is_configured:
+            raise LLMError("DEEPSEEK_API_KEY не установлен")
+
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'stream': True,
+        }
+        headers = {'Authorization': f"Bearer {self.api_key}"}
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with session.post(f"{self.api_url}/chat/completions", json=payload, headers=headers) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMError(f"Ошибка LLM API {response.status}: {text[:200]}")
+
+                async for raw_line in response.content:
+                    line = raw_line.decode('utf-8').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        logger.debug(f"Некорректный фрагмент ответа LLM: {data[:100]}")
+                        continue
+                    for choice in chunk.get('choices', []):
+                        content = (choice.get('delta') or {}).get('content')
+                        if content:
+                            yield content
+
+    async def complete(self, messages: List[Dict], **kwargs) -> str:
+        """Ответ модели целиком"""
+        return ''.join([part async for part in self.stream_chat(messages, **kwargs)])
+
 
-    async def generate_cover_letter(self, vacancy_data):
-        return "Сопроводительное письмо в разработке..."
+# Синглтон
+deepseek_client = DeepSeekClient()
@@ -0,0 +1,179 @@
+"""
+Справочники HH (/dictionaries): опыт, график, занятость, валюты.
+
+При старте загружаются из локального кэша, а если его нет - из снимка,
+поставляемого с ботом. В фоне периодически обновляются условным
+запросом (If-None-Match), так что неизменившийся справочник не скачивается.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+BUNDLED_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'hh_dictionaries.json')
+
+# Справочники, которые использует бот
+USED_DICTIONARIES = ('experience', 'schedule', 'employment', 'currency')
+
+# Варианты фильтров в боте: ключ -> (подпись кнопки, id в справочнике HH)
+SCHEDULE_OPTIONS = {
+    'office': ('Офис', 'fullDay'),
+    'remote': ('Удалённо', 'remote'),
+    'hybrid': ('Гибрид', 'flexible'),
+    'flexible': ('Гибкий график', 'flexible'),
+}
+
+EMPLOYMENT_OPTIONS = {
+    'fullDay': ('Полный день', 'full'),
+    'partDay': ('Частичная', 'part'),
+    'project': ('Проектная', 'project'),
+    'internship': ('Стажировка', 'probation'),
+}
+
+
+class HHDictionaries:
+    """Кэш справочников HH с фоновым обновлением"""
+
+    def __init__(self, cache_path: str = None):
+        self.cache_path = cache_path or config.DICTIONARIES_CACHE_PATH
+        self.dictionaries: Dict[str, List[Dict]] = {}
+        self.etag: Optional[str] = None
+        self.fetched_at = 0.0
+        self._names: Dict[str, Dict[str, str]] = {}
+        self._rates: Dict[str, float] = {}
+        self._listeners: List[Callable] = []
+        self._task: Optional[asyncio.Task] = None
+        self._loaded = False
+
+    # --- загрузка ---
+
+    def _apply(self, data: Dict):
+        self.dictionaries = {name: data['dictionaries'].get(name, []) for name in USED_DICTIONARIES}
+        self.etag = data.get('etag')
+        self.fetched_at = data.get('fetched_at') or 0.0
+        self._names = {
+            name: {str(item.get('id') or item.get('code')): item.get('name') for item in items}
+            for name, items in self.dictionaries.items()
+        }
+        self._rates = {
+            item['code']: item['rate']
+            for item in self.dictionaries.get('currency', [])
+            if item.get('code') and item.get('rate')
+        }
+        self._loaded = True
+
+    def load(self):
+        """Загрузить справочники из кэша, а при его отсутствии - из поставляемого снимка"""
+        for path in (self.cache_path, BUNDLED_SNAPSHOT_PATH):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._apply(json.load(f))
+                logger.debug(f"Справочники HH загружены из {path}")
+                return
+            except FileNotFoundError:
+                continue
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Поврежден файл справочников {path}: {e}")
+        raise RuntimeError("Не найден снимок справочников HH")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'etag': self.etag,
+                'fetched_at': self.fetched_at,
+                'dictionaries': self.dictionaries,
+            }, f, ensure_ascii=False)
+
+    # --- обновление ---
+
+    def on_update(self, listener: Callable):
+        """Подписаться на обновление справочников (listener может быть корутиной)"""
+        self._listeners.append(listener)
+
+    async def refresh(self) -> bool:
+        """Условный запрос к HH; True, если справочники изменились"""
+        self._ensure_loaded()
+        from src.services.hh_client import hh_client
+
+        status, data, etag = await hh_client.get_dictionaries(etag=self.etag)
+        if status == 304:
+            self.fetched_at = time.time()
+            logger.debug("Справочники HH не изменились")
+            return False
+        if status != 200 or not data:
+            return False
+
+        old_dictionaries = self.dictionaries
+        self._apply({'dictionaries': data, 'etag': etag, 'fetched_at': time.time()})
+        self._save()
+
+        if self.dictionaries == old_dictionaries:
+            return False
+
+        logger.info("📚 Справочники HH обновлены")
+        for listener in self._listeners:
+            try:
+                result = listener()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Ошибка обработчика обновления справочников: {e}")
+        return True
+
+    async def _refresh_loop(self, interval_seconds: float):
+        # После быстрого перезапуска не запрашиваем HH раньше срока
+        await asyncio.sleep(max(0.0, self.fetched_at + interval_seconds - time.time()))
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Ошибка обновления справочников HH: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def start_background_refresh(self, interval_hours: float = None):
+        """Запустить периодическое обновление в фоне"""
+        self._ensure_loaded()
+        if self._task and not self._task.done():
+            return
+        interval = 3600 * (interval_hours or config.DICTIONARIES_REFRESH_HOURS)
+        self._task = asyncio.create_task(self._refresh_loop(interval))
+
+    def stop_background_refresh(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    # --- чтение ---
+
+    def items(self, dictionary: str) -> List[Dict]:
+        self._ensure_loaded()
+        return self.dictionaries.get(dictionary, [])
+
+    def is_valid(self, dictionary: str, value: Optional[str]) -> bool:
+        """Принимает ли HH такое значение"""
+        self._ensure_loaded()
+        return value is not None and str(value) in self._names.get(dictionary, {})
+
+    def name(self, dictionary: str, value: str) -> str:
+        """Название значения для отображения"""
+        self._ensure_loaded()
+        return self._names.get(dictionary, {}).get(str(value)) or str(value)
+
+    def currency_rate(self, code: Optional[str]) -> Optional[float]:
+        """Сколько единиц валюты в одном рубле"""
+        self._ensure_loaded()
+        return self._rates.get(code or 'RUR')
+
+
+# Синглтон
+hh_dictionaries = HHDictionaries()
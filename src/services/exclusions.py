@@ -0,0 +1,138 @@
+"""
+Сохраненные и скрытые вакансии пользователей.
+
+Скрытые вакансии хранятся в БД, а в памяти - компактным множеством целых id
+на пользователя (IdSet). Для пользователей с очень большим числом скрытых вакансий
+множество заменяется фильтром Блума с долей ложных срабатываний около 0.1%.
+Исключения применяются при сборке выдачи поиска и пакетов уведомлений.
+"""
+import math
+from typing import Dict, Iterable, List, Union
+from logger import get_logger
+from src.storage.database import AsyncSessionLocal
+from src.storage.repositories.action_repo import get_action_repo
+from src.services.id_sets import IdSet, vacancy_int_id
+from src.services.memory_stats import memory_stats
+
+logger = get_logger(__name__)
+
+ACTION_SAVE = 'save'
+ACTION_HIDE = 'hide'
+
+# С какого числа скрытых вакансий переходить на фильтр Блума
+BLOOM_THRESHOLD = 10000
+BLOOM_ERROR_RATE = 0.001
+
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """Фильтр Блума по целым id (двойное хэширование)"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.capacity = capacity  # после стольких вставок доля ложных срабатываний выше расчетной
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: int):
+        h1 = (value * 0x9E3779B97F4A7C15) & _MASK64
+        h2 = ((value ^ (value >> 31)) * 0xBF58476D1CE4E5B9 & _MASK64) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: int):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        if value is None:
+            return False
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+ExclusionSet = Union[IdSet, BloomFilter]
+
+
+def build_exclusion_set(ids: Iterable[int]) -> ExclusionSet:
+    """Множество id или фильтр Блума для больших списков"""
+    ids = list(ids)
+    if len(ids) < BLOOM_THRESHOLD:
+        return IdSet(ids)
+
+    bloom = BloomFilter(2 * len(ids))  # запас на рост без перестроения
+    for vacancy_id in ids:
+        bloom.add(vacancy_id)
+    return bloom
+
+
+class ExclusionService:
+    """Сохранение действий с вакансиями и фильтрация скрытых"""
+
+    def __init__(self):
+        self._hidden: Dict[int, ExclusionSet] = {}  # telegram_id -> скрытые id
+
+    async def _record(self, user_id: int, vacancy_id, action: str) -> bool:
+        int_id = vacancy_int_id(vacancy_id)
+        if int_id is None:
+            logger.warning(f"Некорректный id вакансии: {vacancy_id}")
+            return False
+        async with AsyncSessionLocal() as session:
+            return await get_action_repo(session).add_action(user_id, int_id, action)
+
+    async def save(self, user_id: int, vacancy_id) -> bool:
+        """Сохранить вакансию в избранное"""
+        return await self._record(user_id, vacancy_id, ACTION_SAVE)
+
+    async def hide(self, user_id: int, vacancy_id) -> bool:
+        """Скрыть вакансию: она больше не попадет в поиск и уведомления"""
+        added = await self._record(user_id, vacancy_id, ACTION_HIDE)
+        hidden = self._hidden.get(user_id)
+        if added and hidden is not None:
+            hidden.add(vacancy_int_id(vacancy_id))
+            if isinstance(hidden, IdSet) and len(hidden) >= BLOOM_THRESHOLD:
+                self._hidden[user_id] = build_exclusion_set(hidden)
+            elif isinstance(hidden, BloomFilter) and hidden.count > hidden.capacity:
+                # Переполненный фильтр начинает скрывать обычные вакансии; id из фильтра
+                # не достать, поэтому он пересобирается из БД при следующем обращении
+                del self._hidden[user_id]
+        return added
+
+    async def saved_ids(self, user_id: int) -> List[int]:
+        """Id сохраненных вакансий пользователя"""
+        async with AsyncSessionLocal() as session:
+            return await get_action_repo(session).get_vacancy_ids(user_id, ACTION_SAVE)
+
+    async def preload(self, user_ids: Iterable[int]):
+        """Загрузить скрытые вакансии группы пользователей одним запросом"""
+        missing = [user_id for user_id in set(user_ids) if user_id not in self._hidden]
+        if not missing:
+            return
+        async with AsyncSessionLocal() as session:
+            ids = await get_action_repo(session).get_vacancy_ids_for_users(missing, ACTION_HIDE)
+        for user_id, vacancy_ids in ids.items():
+            self._hidden[user_id] = build_exclusion_set(vacancy_ids)
+
+    async def hidden_for(self, user_id: int) -> ExclusionSet:
+        """Скрытые вакансии пользователя"""
+        if user_id not in self._hidden:
+            await self.preload([user_id])
+        return self._hidden[user_id]
+
+    async def exclude(self, user_id: int, vacancies: List[Dict]) -> List[Dict]:
+        """Убрать из списка вакансии, скрытые пользователем"""
+        hidden = await self.hidden_for(user_id)
+        if not len(hidden):
+            return vacancies
+        return [vacancy for vacancy in vacancies if vacancy_int_id(vacancy.get('id')) not in hidden]
+
+
+# Синглтон
+exclusion_service = ExclusionService()
+memory_stats.register('exclusions.hidden', lambda: exclusion_service._hidden)
@@ -1,15 +1,131 @@
-from typing import Dict, Any
+import asyncio
+import hashlib
+import json
+from typing import Callable, Dict, Any, List, Optional
+from sqlalchemy import select
 from logger import get_logger
 from src.storage.database import get_session
+from src.storage.models import User, UserProfile
 from src.storage.repositories.filter_repo import get_filter_repo
-from src.services.city_mapping import get_city_id  # Импортируем из отдельного файла
+from src.storage.repositories.profile_repo import get_profile_repo
+from src.services.areas import area_index
+from src.services.dictionaries import hh_dictionaries, SCHEDULE_OPTIONS, EMPLOYMENT_OPTIONS
 
 logger = get_logger(__name__)
 
+# Параметры постраничной выдачи не входят в канонический запрос
+PAGING_PARAMS = {
+    'per_page': 20,
+    'page': 0,
+    'order_by': 'publication_time',
+}
+
+# Параметры профиля, которые проверяются локально и в HH не отправляются
+LOCAL_PARAMS = ('salary_min',)
+
+
+def _option_value(options: Dict[str, tuple], dictionary: str, key: str) -> Optional[str]:
+    """id HH для варианта фильтра из бота; None, если HH такое значение больше не принимает"""
+    option = options.get(key)
+    if not option:
+        return None
+    if not hh_dictionaries.is_valid(dictionary, option[1]):
+        logger.warning(f"Значение '{option[1]}' отсутствует в справочнике HH {dictionary}")
+        return None
+    return option[1]
+
+
+def compile_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Скомпилировать фильтры пользователя в параметры HH API (без пагинации)"""
+    # Пробелы по краям не меняют запрос: "python " и "python" дают один хэш
+    filters = {key: value.strip() if isinstance(value, str) else value for key, value in filters.items()}
+    params = {}
+
+    # Текстовый запрос (профессия)
+    if filters.get('profession'):
+        params['text'] = filters['profession']
+        params['search_field'] = 'name'
+
+    # Опыт работы
+    if filters.get('experience'):
+        if hh_dictionaries.is_valid('experience', filters['experience']):
+            params['experience'] = filters['experience']
+        else:
+            logger.warning(f"Опыт '{filters['experience']}' отсутствует в справочнике HH")
+
+    # Зарплата - сравнивается локально с вилкой в рублях на руки: фильтр HH не учитывает
+    # валюту, gross и почасовые ставки, поэтому в запрос к HH не попадает
+    if filters.get('salary_min'):
+        try:
+            params['salary_min'] = int(filters['salary_min'])
+        except (ValueError, TypeError):
+            logger.error(f"Некорректная зарплата: {filters.get('salary_min')}")
+
+    # График работы
+    if filters.get('schedule'):
+        schedule_value = _option_value(SCHEDULE_OPTIONS, 'schedule', filters['schedule'])
+        if schedule_value:
+            params['schedule'] = schedule_value
+
+    # Тип занятости
+    if filters.get('employment'):
+        employment_value = _option_value(EMPLOYMENT_OPTIONS, 'employment', filters['employment'])
+        if employment_value:
+            params['employment'] = employment_value
+
+    # Город - ищем по дереву регионов HH (точно, по префиксу и с опечатками)
+    if filters.get('area'):
+        area = filters['area']
+
+        if area == 'remote':
+            params['schedule'] = 'remote'
+        elif area.isdigit():
+            params['area'] = area
+        else:
+            area_id = area_index.resolve(area)
+            if area_id:
+                params['area'] = area_id
+            else:
+                current_text = params.get('text', '')
+                params['text'] = f"{current_text} {area}".strip()
+                logger.warning(f"Город '{area}' не найден в справочнике регионов")
+
+    return params
+
+
+def make_query_hash(hh_params: Dict[str, Any]) -> str:
+    """Канонический хэш запроса: одинаковые фильтры дают одинаковый хэш"""
+    canonical = json.dumps(hh_params, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def with_paging(hh_params: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """Добавить к скомпилированному запросу параметры пагинации"""
+    params = dict(hh_params)
+    params.update(PAGING_PARAMS)
+    params.update(overrides)
+    return params
+
 
 class FilterService:
     """Сервис для работы с фильтрами поиска"""
 
+    def __init__(self):
+        self._listeners: List[Callable] = []
+
+    def on_change(self, listener: Callable):
+        """Подписаться на изменение фильтров пользователя: listener(user_id), может быть корутиной"""
+        self._listeners.append(listener)
+
+    async def _notify_change(self, user_id: int):
+        for listener in self._listeners:
+            try:
+                result = listener(user_id)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Ошибка обработчика изменения фильтров: {e}")
+
     async def get_user_filters(self, user_id: int) -> Dict[str, Any]:
         """Получить фильтры пользователя"""
         async for session in get_session():
@@ -17,84 +133,96 @@ class FilterService:
             return await repo.get_user_filters(user_id)
         return {}
 
+    async def get_profile(self, user_id: int) -> Optional[UserProfile]:
+        """Получить профиль пользователя (собирается из user_filters, если его еще нет)"""
+        async for session in get_session():
+            profile = await get_profile_repo(session).get_profile(user_id)
+            if profile is None:
+                profile = await self.refresh_profile(session, user_id)
+            return profile
+        return None
+
+    async def save_filter(self, user_id: int, filter_type: str, filter_value: str) -> None:
+        """Сохранить фильтр и пересобрать профиль пользователя"""
+        async for session in get_session():
+            await get_filter_repo(session).save_filter(user_id, filter_type, filter_value)
+            await self.refresh_profile(session, user_id)
+        await self._notify_change(user_id)
+
+    async def get_salary_alerts(self, user_id: int) -> bool:
+        """Включены ли уведомления о росте зарплаты"""
+        async for session in get_session():
+            stmt = select(User.salary_alerts).where(User.telegram_id == user_id)
+            return bool((await session.execute(stmt)).scalar_one_or_none())
+        return False
+
+    async def set_salary_alerts(self, user_id: int, enabled: bool) -> None:
+        """Включить или выключить уведомления о росте зарплаты.
+
+        Настройка хранится у пользователя, а не среди фильтров: она не меняет
+        запрос к HH, профиль и ключ кэша сопроводительных писем и не вызывает
+        внеочередную проверку вакансий.
+        """
+        async for session in get_session():
+            user = (await session.execute(select(User).where(User.telegram_id == user_id))).scalar_one_or_none()
+            if user is None:
+                return
+            user.salary_alerts = enabled
+            await session.commit()
+            logger.info(f"Уведомления о росте зарплаты {'включены' if enabled else 'выключены'} для пользователя {user_id}")
+
+    async def clear_filters(self, user_id: int) -> None:
+        """Очистить все фильтры и профиль пользователя"""
+        async for session in get_session():
+            await get_filter_repo(session).clear_all_filters(user_id)
+            await get_profile_repo(session).delete_profile(user_id)
+
+    async def refresh_profile(self, session, user_id: int) -> Optional[UserProfile]:
+        """Пересобрать профиль: компиляция параметров HH и хэш считаются только здесь"""
+        filters = await get_filter_repo(session).get_user_filters(user_id)
+        profile_repo = get_profile_repo(session)
+
+        if not filters:
+            await profile_repo.delete_profile(user_id)
+            return None
+
+        hh_params = compile_filters(filters)
+        return await profile_repo.upsert_profile(
+            user_id, filters, hh_params, make_query_hash(hh_params)
+        )
+
+    async def ensure_profiles(self) -> int:
+        """Собрать профили для пользователей, у которых их еще нет"""
+        built = 0
+        async for session in get_session():
+            user_ids = await get_profile_repo(session).get_users_without_profile()
+            for user_id in user_ids:
+                if await self.refresh_profile(session, user_id):
+                    built += 1
+
+        if built:
+            logger.info(f"📦 Собрано профилей фильтров: {built}")
+        return built
+
+    async def recompile_profiles(self) -> int:
+        """Перекомпилировать все профили (например, после обновления справочников HH)"""
+        updated = 0
+        async for session in get_session():
+            profile_repo = get_profile_repo(session)
+            for profile in await profile_repo.get_all_profiles():
+                hh_params = compile_filters(profile.filters)
+                query_hash = make_query_hash(hh_params)
+                if query_hash != profile.query_hash:
+                    await profile_repo.upsert_profile(profile.user_id, profile.filters, hh_params, query_hash)
+                    updated += 1
+
+        if updated:
+            logger.info(f"📦 Перекомпилировано профилей фильтров: {updated}")
+        return updated
+
     async def to_hh_params(self, filters: Dict[str, Any]) -> Dict[str, Any]:
         """Преобразовать фильтры пользователя в параметры HH API"""
-        params = {}
-
-        # Текстовый запрос (профессия)
-        if filters.get('profession'):
-            params['text'] = filters['profession']
-            params['search_field'] = 'name'
-
-        # Опыт работы
-        if filters.get('experience'):
-            exp_map = {
-                'noExperience': 'noExperience',
-                'between1And3': 'between1And3',
-                'between3And6': 'between3And6',
-                'moreThan6': 'moreThan6'
-            }
-            exp_value = exp_map.get(filters['experience'])
-            if exp_value:
-                params['experience'] = exp_value
-
-        # Зарплата
-        if filters.get('salary_min'):
-            try:
-                salary = int(filters['salary_min'])
-                params['salary'] = salary
-                params['only_with_salary'] = True
-            except (ValueError, TypeError):
-                logger.error(f"Некорректная зарплата: {filters.get('salary_min')}")
-
-        # График работы
-        if filters.get('schedule'):
-            schedule_map = {
-                'office': 'fullDay',
-                'remote': 'remote',
-                'hybrid': 'flexible',
-                'flexible': 'flexible'
-            }
-            schedule_value = schedule_map.get(filters['schedule'])
-            if schedule_value:
-                params['schedule'] = schedule_value
-
-        # Тип занятости
-        if filters.get('employment'):
-            employment_map = {
-                'fullDay': 'full',
-                'partDay': 'part',
-                'project': 'project',
-                'internship': 'probation'
-            }
-            employment_value = employment_map.get(filters['employment'])
-            if employment_value:
-                params['employment'] = employment_value
-
-        # Город - используем функцию из отдельного файла
-        if filters.get('area'):
-            area = filters['area']
-
-            if area == 'remote':
-                params['schedule'] = 'remote'
-            elif area.isdigit():
-                params['area'] = area
-            else:
-                # Используем функцию из city_mapping.py
-                city_id = get_city_id(area)
-                if city_id:
-                    params['area'] = city_id
-                else:
-                    current_text = params.get('text', '')
-                    params['text'] = f"{current_text} {area}".strip()
-                    logger.warning(f"Город '{area}' не найден в маппинге")
-
-        # Обязательные параметры
-        params.update({
-            'per_page': 20,
-            'page': 0,
-            'order_by': 'publication_time',
-        })
+        params = with_paging(compile_filters(filters))
 
         logger.info(f"Преобразованные параметры HH API: {params}")
         return params
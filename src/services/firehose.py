@@ -0,0 +1,169 @@
+"""
+Общий поток свежих вакансий: одна выборка на регион за проход вместо запроса на каждого пользователя.
+
+HH отдает выборку от новых к старым. Курсор региона сдвигается на начало
+прохода только после выборки без ошибок. Если бюджет страниц кончился раньше,
+чем выборка дошла до прошлого курсора, непрочитанная часть окна запоминается
+как догрузка и читается в следующих проходах (через date_to), так что
+вакансии в пропущенном окне не теряются.
+
+Новизну вакансии определяет окно курсора и множества уже отправленных
+пользователям вакансий, а не наличие в хранилище: туда же пишут интерактивный
+поиск и автопоиск по запросам.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from logger import get_logger
+from config import config
+from src.services.hh_client import hh_client
+from src.storage.database import AsyncSessionLocal
+from src.storage.repositories.vacancy_repo import get_vacancy_repo
+
+logger = get_logger(__name__)
+
+# Перекрытие окна выборки, чтобы не терять вакансии на границе проходов
+CURSOR_OVERLAP = timedelta(minutes=5)
+# Окно первой выборки региона; курсоры старше него не восстанавливаются
+INITIAL_WINDOW = timedelta(hours=24)
+# Глубина выдачи HH по одному запросу: дальше выборка продолжается с date_to
+HH_SEARCH_DEPTH = 2000
+
+
+def published_at(vacancy: Dict) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(vacancy['published_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class FirehoseService:
+    """Выборка свежих вакансий по регионам в локальное хранилище"""
+
+    def __init__(self, pages: int = None, per_page: int = None):
+        self.pages = pages or config.FIREHOSE_PAGES
+        self.per_page = per_page or config.FIREHOSE_PER_PAGE
+        self.cursors: Dict[Optional[str], datetime] = {}  # area -> время начала последней полной выборки
+        # area -> (date_from, date_to) непрочитанной части окна
+        self.backfill: Dict[Optional[str], Tuple[datetime, datetime]] = {}
+
+    async def _walk(self, area: Optional[str], since: datetime, until: Optional[datetime],
+                    budget: int) -> Tuple[List[Dict], Optional[datetime], int]:
+        """Окно [since, until] от новых к старым в пределах budget страниц.
+
+        Возвращает (вакансии, граница непрочитанного остатка или None, если окно
+        прочитано целиком, потраченные страницы). Ошибки запроса пробрасываются.
+        """
+        vacancies = []
+        page = pages_used = 0
+        date_to = until
+        while pages_used < budget:
+            params = {
+                'order_by': 'publication_time',
+                'per_page': self.per_page,
+                'page': page,
+                'date_from': since.isoformat(timespec='seconds'),
+            }
+            if date_to:
+                params['date_to'] = date_to.isoformat(timespec='seconds')
+            if area:
+                params['area'] = area
+
+            items = await hh_client.fetch_vacancies(**params)
+            pages_used += 1
+            vacancies.extend(items)
+            if len(items) < self.per_page:
+                return vacancies, None, pages_used
+
+            page += 1
+            if (page + 1) * self.per_page > HH_SEARCH_DEPTH:
+                # Глубже HH не отдает: продолжаем от самой старой полученной вакансии
+                date_to = min(filter(None, map(published_at, items)), default=date_to)
+                page = 0
+
+        oldest = min(filter(None, map(published_at, vacancies)), default=None)
+        return vacancies, oldest or date_to or since, pages_used
+
+    async def fetch_bucket(self, area: Optional[str]) -> List[Dict]:
+        """Свежие вакансии региона (None - без ограничения по региону) с момента прошлой выборки"""
+        started_at = datetime.now().astimezone()
+        since = self.cursors.get(area, started_at - INITIAL_WINDOW) - CURSOR_OVERLAP
+
+        vacancies, remainder, pages_used = await self._walk(area, since, None, self.pages)
+        if remainder is not None:
+            # Бюджет кончился до прошлого курсора: остаток окна догрузим позже
+            previous = self.backfill.get(area)
+            self.backfill[area] = (min(since, previous[0]) if previous else since, remainder)
+        self.cursors[area] = started_at
+
+        backlog = self.backfill.get(area)
+        if backlog and remainder is None and pages_used < self.pages:
+            try:
+                older, remainder, _ = await self._walk(area, backlog[0], backlog[1], self.pages - pages_used)
+            except Exception as e:
+                # Свежая часть уже получена, догрузка повторится целиком
+                logger.error(f"❌ Ошибка догрузки вакансий для региона {area}: {e}")
+            else:
+                vacancies.extend(older)
+                if remainder is None:
+                    del self.backfill[area]
+                else:
+                    self.backfill[area] = (backlog[0], remainder)
+
+        if area in self.backfill:
+            window_from, window_to = self.backfill[area]
+            logger.warning(f"🌊 Регион {area or 'все'}: не хватило {self.pages} страниц, "
+                           f"догрузка {window_from:%d.%m %H:%M} - {window_to:%d.%m %H:%M} продолжится в следующем проходе")
+        logger.info(f"🌊 Регион {area or 'все'}: получено {len(vacancies)} свежих вакансий")
+        return vacancies
+
+    def export_cursors(self) -> Dict[str, str]:
+        """Курсоры для снимка состояния: регион ('' - все) -> время в ISO"""
+        return {area or '': started_at.isoformat() for area, started_at in self.cursors.items()}
+
+    def import_cursors(self, cursors: Dict[str, str]):
+        """Восстановить курсоры из снимка, не откатывая более свежие"""
+        oldest = datetime.now().astimezone() - INITIAL_WINDOW
+        for area, started_at in cursors.items():
+            area = area or None
+            started_at = datetime.fromisoformat(started_at)
+            if started_at < oldest:
+                continue
+            if area not in self.cursors or self.cursors[area] < started_at:
+                self.cursors[area] = started_at
+
+    def export_backfill(self) -> Dict[str, List[str]]:
+        """Непрочитанные части окон для снимка состояния"""
+        return {area or '': [window_from.isoformat(), window_to.isoformat()]
+                for area, (window_from, window_to) in self.backfill.items()}
+
+    def import_backfill(self, backfill: Dict[str, List[str]]):
+        for area, (window_from, window_to) in backfill.items():
+            self.backfill.setdefault(area or None, (datetime.fromisoformat(window_from),
+                                                    datetime.fromisoformat(window_to)))
+
+    async def ingest(self, vacancies: List[Dict]):
+        """Сохранить вакансии в хранилище (для локального поиска)"""
+        async with AsyncSessionLocal() as session:
+            await get_vacancy_repo(session).upsert_many(vacancies)
+
+    async def collect(self, areas: List[Optional[str]]) -> List[Dict]:
+        """Выборка по всем регионам прохода без повторов; что уже отправлено, отсеют множества пользователей"""
+        fresh: Dict[str, Dict] = {}
+        for area in areas:
+            try:
+                vacancies = await self.fetch_bucket(area)
+            except Exception as e:
+                # Курсор региона не сдвинут: окно перечитается в следующем проходе
+                logger.error(f"❌ Ошибка выборки вакансий для региона {area}: {e}")
+                continue
+            for vacancy in vacancies:
+                fresh.setdefault(str(vacancy.get('id')), vacancy)
+            try:
+                await self.ingest(vacancies)
+            except Exception as e:
+                logger.error(f"Не удалось сохранить вакансии региона {area}: {e}")
+        return list(fresh.values())
+
+
+# Синглтон
+firehose_service = FirehoseService()
@@ -0,0 +1,201 @@
+"""
+Локальный HTTP-сервер проверок состояния для оркестратора.
+
+/health/live - процесс жив: задержка цикла событий (насколько позже срока
+просыпается фоновая проба) не превышает HEALTH_MAX_LOOP_LAG. Если цикл занят
+долгим блокирующим проходом, сервер не отвечает вовсе, и проверка падает по таймауту.
+/health/ready - бот может работать: база отвечает, Telegram опрашивается
+(polling или webhook), а планировщик не отстал больше чем на STALE_INTERVALS
+интервалов проверки (пока предохранитель HH или Telegram открыт, отставание не считается).
+/health - подробности в JSON: задержка цикла, свежесть планировщика, очереди
+исходящей работы и метрики памяти. Память измеряется не на каждый запрос, а раз в
+MEMORY_INTERVAL фоновой задачей в цикле событий (хранилища меняются только в нем,
+поэтому обходить их из другого потока нельзя); проба отдает последний замер.
+
+Код ответа 200 - проверка пройдена, 503 - нет.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from aiohttp import web
+from sqlalchemy import text
+from logger import get_logger
+from config import config
+from src.storage.database import engine
+from src.services.circuit_breaker import blocking_breaker, breaker_states
+from src.services.cover_letter import cover_letter_service
+from src.services.memory_stats import memory_stats
+
+logger = get_logger(__name__)
+
+# Период пробы цикла событий и окно, за которое показывается максимальная задержка (секунды)
+PROBE_INTERVAL = 0.5
+LAG_WINDOW = 60
+# Таймаут проверки базы (секунды)
+DB_CHECK_TIMEOUT = 2
+# Период замера памяти хранилищ (секунды)
+MEMORY_INTERVAL = 60
+# Планировщик отстал, если с последнего прохода прошло больше стольких интервалов проверки
+STALE_INTERVALS = 2
+
+
+class LoopLagProbe:
+    """Фоновая проба: на сколько позже срока просыпается короткий sleep"""
+
+    def __init__(self, interval: float = PROBE_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self._recent: "deque[Tuple[float, float]]" = deque()  # (monotonic, задержка)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.lag = max(0.0, now - started - self.interval)
+            self._recent.append((now, self.lag))
+            while self._recent and self._recent[0][0] < now - LAG_WINDOW:
+                self._recent.popleft()
+
+    @property
+    def max_lag(self) -> float:
+        """Максимальная задержка за последние LAG_WINDOW секунд"""
+        return max((lag for _, lag in self._recent), default=0.0)
+
+
+class HealthServer:
+    """Эндпоинты живости и готовности поверх aiohttp"""
+
+    def __init__(self, application=None, host: str = None, port: int = None):
+        self.application = application  # telegram.ext.Application
+        self.host = host or config.HEALTH_HOST
+        self.port = port or config.HEALTH_PORT
+        self.probe = LoopLagProbe()
+        self.memory: Dict[str, float] = {}  # последний замер памяти
+        self.memory_measured_at: Optional[float] = None
+        self._memory_task: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/health/live', self.live)
+        app.router.add_get('/health/ready', self.ready)
+        app.router.add_get('/health', self.details)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.probe.start()
+        self._memory_task = asyncio.create_task(self._measure_memory())
+        logger.info(f"🩺 Проверки состояния: http://{self.host}:{self.port}/health")
+
+    async def stop(self):
+        self.probe.stop()
+        if self._memory_task is not None:
+            self._memory_task.cancel()
+            self._memory_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _measure_memory(self):
+        """Замер памяти по хранилищам с передачей управления циклу между ними"""
+        while True:
+            gauges = []
+            for name in memory_stats.store_names:
+                gauge = memory_stats.gauge(name)
+                if gauge is not None:
+                    gauges.append(gauge)
+                await asyncio.sleep(0)
+            self.memory = memory_stats.metrics(gauges)
+            self.memory_measured_at = time.time()
+            await asyncio.sleep(MEMORY_INTERVAL)
+
+    # --- проверки ---
+
+    def _live(self) -> bool:
+        return self.probe.lag <= config.HEALTH_MAX_LOOP_LAG
+
+    async def _database_ok(self) -> bool:
+        async def ping():
+            async with engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+        try:
+            await asyncio.wait_for(ping(), DB_CHECK_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning(f"Проверка готовности: база недоступна: {e}")
+            return False
+
+    def _telegram_ok(self) -> bool:
+        """Приложение запущено и получает обновления (polling или webhook)"""
+        application = self.application
+        return bool(application and application.running
+                    and application.updater is not None and application.updater.running)
+
+    @staticmethod
+    def _scheduler_state() -> Optional[Dict]:
+        """Свежесть и очередь планировщика; None, если он не запущен в этом процессе"""
+        from src.services.scheduler_service import get_scheduler
+        scheduler = get_scheduler()
+        if scheduler is None or not scheduler.scheduler.running:
+            return None
+
+        now = time.time()
+        since = scheduler.last_pass_at or scheduler.started_at or now
+        age = now - since
+        limit = STALE_INTERVALS * scheduler.check_interval * 60
+        return {
+            'mode': scheduler.mode,
+            'last_pass_at': scheduler.last_pass_at,
+            'seconds_since_last_pass': round(age, 1),
+            'pass_running_for': round(now - scheduler.pass_started_at, 1) if scheduler.pass_started_at else None,
+            # Пока зависимость недоступна, отставание - не вина процесса, перезапуск не поможет
+            'stale': age > limit and blocking_breaker() is None,
+            'backlog': scheduler.backlog(),
+        }
+
+    # --- обработчики ---
+
+    async def live(self, request: web.Request) -> web.Response:
+        live = self._live()
+        return web.json_response({'live': live, 'loop_lag': round(self.probe.lag, 4)},
+                                 status=200 if live else 503)
+
+    async def ready(self, request: web.Request) -> web.Response:
+        checks = {'database': await self._database_ok(), 'telegram': self._telegram_ok()}
+        scheduler = self._scheduler_state()
+        if scheduler is not None:
+            checks['scheduler'] = not scheduler['stale']
+        ready = all(checks.values())
+        return web.json_response({'ready': ready, **checks}, status=200 if ready else 503)
+
+    async def details(self, request: web.Request) -> web.Response:
+        checks = {'database': await self._database_ok(), 'telegram': self._telegram_ok()}
+        scheduler = self._scheduler_state()
+        ready = all(checks.values()) and not (scheduler and scheduler['stale'])
+        return web.json_response({
+            'live': self._live(),
+            'ready': ready,
+            'checks': checks,
+            'loop_lag': {'last': round(self.probe.lag, 4), 'max_recent': round(self.probe.max_lag, 4)},
+            'scheduler': scheduler,
+            'cover_letters': cover_letter_service.backlog(),
+            'breakers': breaker_states(),
+            'memory': self.memory,
+            'memory_measured_at': self.memory_measured_at,
+        }, status=200 if ready else 503)
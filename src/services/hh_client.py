@@ -1,20 +1,209 @@
 import aiohttp
 import asyncio
 import json
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from logger import get_logger
+from src.services.salary import normalize_salary
+from src.services.circuit_breaker import CircuitOpenError, hh_breaker
+from src.services.tracing import tracer
+from src.services.vacancy_changes import content_hash
+from src.services.hh_transport import CassetteMissError, TransportResponse, create_transport
+from src.services.memory_stats import memory_stats
+from config import config
+
+try:  # brotli - необязательная зависимость: без нее запрашиваем только gzip
+    import brotli
+except ImportError:
+    brotli = None
 
 logger = get_logger(__name__)
 
+HEADERS = {
+    "User-Agent": "JobSearchBot/1.0 (job-search-bot@example.com)",
+    "HH-User-Agent": "JobBot/1.0"
+}
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+# Сколько ответов с валидаторами (ETag/Last-Modified) помнить для условных запросов
+VALIDATOR_CACHE_SIZE = 2000
+# Сколько отформатированных вакансий держать в кэше
+RENDER_CACHE_SIZE = 5000
+
+
+def decompress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Распаковать тело ответа по Content-Encoding"""
+    encoding = (encoding or '').lower()
+    if encoding == 'gzip':
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompress(body)
+    if encoding == 'br' and brotli:
+        return brotli.decompress(body)
+    return body
+
+
+class HHAPIError(Exception):
+    """HH ответил статусом, отличным от 200"""
+
+    def __init__(self, status: int):
+        super().__init__(f"Ошибка API {status}")
+        self.status = status
+
 
 class HHAPIClient:
     """Клиент для работы с API HeadHunter"""
 
     BASE_URL = "https://api.hh.ru"
 
-    async def search_vacancies(self, **params) -> List[Dict]:
-        """Поиск вакансий по параметрам"""
+    def __init__(self, transport=None):
+        self._session: Optional[aiohttp.ClientSession] = None
+        # live / record / replay (см. hh_transport); создается при первом запросе
+        self._transport = transport
+        # Канонический запрос -> (ETag, Last-Modified, разобранный ответ)
+        self._validators: "OrderedDict[str, Tuple[Optional[str], Optional[str], Any, int]]" = OrderedDict()
+        # Хэш содержимого вакансии -> отформатированная основная часть сообщения
+        self._rendered: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'bytes_received': 0,   # по сети
+            'bytes_decoded': 0,    # после распаковки
+            'bytes_saved': 0,      # сжатие + тела, которые не пришлось скачивать из-за 304
+        }
+
+    # --- транспорт ---
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Общая сессия: соединения с HH переиспользуются между запросами"""
+        if self._session is None or self._session.closed:
+            # Распаковываем сами, чтобы считать сэкономленный трафик
+            self._session = aiohttp.ClientSession(headers=HEADERS, auto_decompress=False)
+        return self._session
+
+    def _get_transport(self):
+        if self._transport is None:
+            self._transport = create_transport(config.HH_TRANSPORT_MODE, self.BASE_URL, self._get_session)
+        return self._transport
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    @staticmethod
+    def _request_key(path: str, params: Optional[Dict]) -> str:
+        return path + '?' + json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+
+    async def _fetch(self, path: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                     timeout: float = 30, conditional: bool = True) -> Tuple[int, Any, Dict]:
+        """GET к HH API: (статус, разобранный JSON, заголовки ответа).
+
+        Для conditional-запросов валидаторы хранятся по каноническому запросу;
+        на 304 возвращается сохраненный разобранный ответ со статусом 200.
+        Возвращаемые данные могут быть общими для повторных вызовов - не изменяйте их.
+        """
+        key = self._request_key(path, params)
+        request_headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        cached = self._validators.get(key) if conditional else None
+        if cached:
+            etag, last_modified, _, _ = cached
+            if etag:
+                request_headers["If-None-Match"] = etag
+            if last_modified:
+                request_headers["If-Modified-Since"] = last_modified
+
+        # При открытом предохранителе запрос отклоняется сразу, без ожидания таймаута
+        hh_breaker.check()
+        self.stats['requests'] += 1
+        with tracer.span(f"hh {path}", 'hh', conditional=bool(cached)) as span:
+            try:
+                response = await self._get_transport().get(path, params, request_headers, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                hh_breaker.record_failure()
+                raise
+            except BaseException:
+                # Отмена, промах кассеты и т.п. - не исход запроса, но пробный запрос в half_open завершен
+                hh_breaker.release()
+                raise
+            if span is not None:
+                span.args.update(status=response.status, bytes=len(response.body))
+
+        try:
+            result = self._handle_response(key, path, response, cached, conditional)
+        except Exception:
+            # Ответ не разбирается (битый JSON или сжатие) - тоже сбой зависимости
+            hh_breaker.record_failure()
+            raise
+        # Перегрузка и ошибки сервера - сбой зависимости, остальные ответы - штатная работа
+        if response.status >= 500 or response.status == 429:
+            hh_breaker.record_failure()
+        else:
+            hh_breaker.record_success()
+        return result
+
+    def _handle_response(self, key: str, path: str, response: TransportResponse,
+                         cached: Optional[Tuple], conditional: bool) -> Tuple[int, Any, Dict]:
+        """Разбор ответа и обновление кэша валидаторов"""
+        body = response.body
+        self.stats['bytes_received'] += len(body)
+
+        if response.status == 304 and cached:
+            self._validators.move_to_end(key)
+            self.stats['not_modified'] += 1
+            self.stats['bytes_saved'] += cached[3]
+            logger.debug(f"HH {path}: не изменилось (304)")
+            return 200, cached[2], dict(response.headers)
+        if response.status == 304:
+            return 304, None, dict(response.headers)
+
+        raw = decompress(body, response.headers.get("Content-Encoding"))
+        self.stats['bytes_decoded'] += len(raw)
+        self.stats['bytes_saved'] += len(raw) - len(body)
+
+        if response.status != 200:
+            logger.debug(f"Ответ API (статус {response.status}): {raw[:500]!r}")
+            return response.status, None, dict(response.headers)
+
+        data = json.loads(raw)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if conditional and (etag or last_modified):
+            self._validators[key] = (etag, last_modified, data, len(body))
+            self._validators.move_to_end(key)
+            while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                self._validators.popitem(last=False)
+        return 200, data, dict(response.headers)
+
+    def export_validators(self) -> List[List]:
+        """Кэш валидаторов для снимка состояния: [ключ, ETag, Last-Modified, ответ, размер] от старых к новым"""
+        return [[key, *entry] for key, entry in self._validators.items()]
+
+    def import_validators(self, entries: List[List]):
+        """Восстановить кэш валидаторов из снимка, не вытесняя уже полученные ответы"""
+        for key, etag, last_modified, data, size in reversed(entries[-VALIDATOR_CACHE_SIZE:]):
+            if key not in self._validators:
+                self._validators[key] = (etag, last_modified, data, size)
+                self._validators.move_to_end(key, last=False)
+        while len(self._validators) > VALIDATOR_CACHE_SIZE:
+            self._validators.popitem(last=False)
+
+    def transfer_stats(self) -> Dict[str, int]:
+        """Статистика трафика к HH"""
+        return dict(self.stats)
+
+    # --- методы API ---
+
+    async def fetch_vacancies(self, **params) -> List[Dict]:
+        """Поиск вакансий по параметрам; ошибки запроса пробрасываются.
+
+        Пустой список - только действительно пустая выдача. Сбои (предохранитель,
+        сеть, таймаут, ответ не 200) поднимаются исключением, чтобы вызывающий
+        мог отличить отказ HH от отсутствия вакансий.
+        """
         # Очищаем None значения
         search_params = {k: v for k, v in params.items() if v is not None}
 
@@ -32,33 +221,29 @@ class HHAPIClient:
 
         logger.info(f"Поиск вакансий с параметрами: {json.dumps(prepared_params, ensure_ascii=False)}")
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                        f"{self.BASE_URL}/vacancies",
-                        params=prepared_params,
-                        headers={
-                            "User-Agent": "JobSearchBot/1.0 (job-search-bot@example.com)",
-                            "HH-User-Agent": "JobBot/1.0"
-                        },
-                        timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-
-                    response_text = await response.text()
-                    logger.debug(f"Ответ API (статус {response.status}): {response_text[:500]}...")
-
-                    if response.status == 200:
-                        data = await response.json()
-                        vacancies = data.get("items", [])
-                        found = data.get("found", 0)
-                        pages = data.get("pages", 0)
-
-                        logger.info(f"Найдено вакансий: {found}, страниц: {pages}, возвращено: {len(vacancies)}")
-                        return vacancies
-                    else:
-                        logger.error(f"Ошибка API {response.status}: {response_text}")
-                        return []
+        status, data, _ = await self._fetch("/vacancies", params=prepared_params)
+        if status != 200:
+            raise HHAPIError(status)
+
+        vacancies = data.get("items", [])
+        found = data.get("found", 0)
+        pages = data.get("pages", 0)
+        logger.info(f"Найдено вакансий: {found}, страниц: {pages}, возвращено: {len(vacancies)}")
+        return vacancies
 
+    async def search_vacancies(self, **params) -> List[Dict]:
+        """Поиск вакансий по параметрам; при любой ошибке - пустой список"""
+        try:
+            return await self.fetch_vacancies(**params)
+        except HHAPIError as e:
+            logger.error(str(e))
+            return []
+        except CircuitOpenError:
+            logger.warning("HH API недоступен (предохранитель открыт), запрос пропущен")
+            return []
+        except CassetteMissError as e:
+            logger.error(str(e))
+            return []
         except aiohttp.ClientError as e:
             logger.error(f"Ошибка сети при запросе к HH API: {e}")
             return []
@@ -72,25 +257,53 @@ class HHAPIClient:
     async def get_vacancy_details(self, vacancy_id: str) -> Optional[Dict]:
         """Получить детальную информацию о вакансии"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                        f"{self.BASE_URL}/vacancies/{vacancy_id}",
-                        headers={
-                            "User-Agent": "JobSearchBot/1.0",
-                            "HH-User-Agent": "JobBot/1.0"
-                        }
-                ) as response:
-
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.warning(f"Вакансия {vacancy_id} не найдена: {response.status}")
-                        return None
+            status, data, _ = await self._fetch(f"/vacancies/{vacancy_id}")
+
+            if status == 200:
+                return data
+            else:
+                logger.warning(f"Вакансия {vacancy_id} не найдена: {status}")
+                return None
 
         except Exception as e:
             logger.error(f"Ошибка получения вакансии {vacancy_id}: {e}")
             return None
 
+    async def get_dictionaries(self, etag: Optional[str] = None) -> Tuple[int, Optional[Dict], Optional[str]]:
+        """Получить справочники HH условным запросом: (статус, данные, ETag)"""
+        headers = {"If-None-Match": etag} if etag else None
+
+        try:
+            # ETag справочников хранится вместе с их кэшем на диске
+            status, data, response_headers = await self._fetch("/dictionaries", headers=headers, conditional=False)
+
+            if status == 200:
+                return 200, data, response_headers.get("ETag")
+            elif status == 304:
+                return 304, None, etag
+            else:
+                logger.warning(f"Справочники HH недоступны: {status}")
+                return status, None, None
+
+        except Exception as e:
+            logger.error(f"Ошибка получения справочников HH: {e}")
+            return 0, None, None
+
+    async def get_areas(self) -> Optional[List[Dict]]:
+        """Получить полное дерево регионов HH"""
+        try:
+            status, data, _ = await self._fetch("/areas", timeout=60, conditional=False)
+
+            if status == 200:
+                return data
+            else:
+                logger.warning(f"Дерево регионов HH недоступно: {status}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Ошибка получения дерева регионов HH: {e}")
+            return None
+
     def _format_time_ago(self, published_at_str: str) -> str:
         """Форматирует время публикации в понятный формат"""
         try:
@@ -148,19 +361,38 @@ class HHAPIClient:
             return "🕐 Недавно"
 
     def format_vacancy_message(self, vacancy: Dict) -> str:
-        """Форматирование вакансии в читаемое сообщение"""
+        """Форматирование вакансии в читаемое сообщение.
+
+        Основная часть кэшируется по хэшу содержимого: переопубликованная без правок
+        вакансия заново не форматируется. Время публикации считается каждый раз.
+        """
+        key = content_hash(vacancy)
+        body = self._rendered.get(key)
+        if body is None:
+            body = self._render_body(vacancy)
+            self._rendered[key] = body
+            while len(self._rendered) > RENDER_CACHE_SIZE:
+                self._rendered.popitem(last=False)
+        else:
+            self._rendered.move_to_end(key)
+
+        message = body
+        published_at = vacancy.get('published_at')
+        time_info = self._format_time_ago(published_at) if published_at else ""
+        # Добавляем информацию о времени публикации
+        if time_info:
+            message += f"\n{time_info}\n"
+
+        message += f"\n🔗 [Ссылка на вакансию]({vacancy.get('alternate_url', '')})"
+        return message
+
+    def _render_body(self, vacancy: Dict) -> str:
+        """Часть сообщения, зависящая только от содержимого вакансии"""
         title = vacancy.get('name', 'Без названия')
         employer = vacancy.get('employer', {}).get('name', 'Не указано')
         salary = vacancy.get('salary')
         area = vacancy.get('area', {}).get('name', 'Не указано')
         experience = vacancy.get('experience', {}).get('name', 'Не указан')
-        url = vacancy.get('alternate_url', '')
-
-        # Добавляем информацию о публикации
-        published_at = vacancy.get('published_at')
-        time_info = ""
-        if published_at:
-            time_info = self._format_time_ago(published_at)
 
         # Форматируем зарплату
         salary_text = "не указана"
@@ -176,8 +408,15 @@ class HHAPIClient:
             elif salary_to:
                 salary_text = f"до {salary_to:,} {currency}".replace(',', ' ')
 
+            # Для валюты и зарплаты до вычета налогов показываем сумму в рублях на руки
+            if (currency != 'RUR' or salary.get('gross')) and (salary_from or salary_to):
+                rub_from, rub_to = normalize_salary(vacancy)
+                rub = rub_to or rub_from
+                if rub:
+                    salary_text += f" (≈ {rub:,} ₽ на руки)".replace(',', ' ')
+
         # Формируем сообщение
-        message = (
+        return (
             f"💼 *{title}*\n\n"
             f"🏢 *Компания:* {employer}\n"
             f"💰 *Зарплата:* {salary_text}\n"
@@ -185,14 +424,8 @@ class HHAPIClient:
             f"📊 *Опыт:* {experience}\n"
         )
 
-        # Добавляем информацию о времени публикации
-        if time_info:
-            message += f"\n{time_info}\n"
-
-        message += f"\n🔗 [Ссылка на вакансию]({url})"
-
-        return message
-
 
 # Синглтон
 hh_client = HHAPIClient()
+memory_stats.register('hh_client.validators', lambda: hh_client._validators)
+memory_stats.register('hh_client.rendered', lambda: hh_client._rendered)
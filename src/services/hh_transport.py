@@ -0,0 +1,192 @@
+"""
+Транспорт запросов к HH: живой, с записью и воспроизведение записи.
+
+record - запросы идут в HH, а пары запрос/ответ (путь, параметры, статус,
+заголовки, тело в том виде, в каком пришло по сети, время ответа) дописываются
+в сжатую кассету (gzip JSONL).
+replay - ответы отдаются из кассеты без сети, с исходной задержкой, ускоренной
+в HH_REPLAY_SPEED раз (0 - без задержек). Так реальную смесь запросов можно
+прогонять офлайн и сравнивать пропускную способность и аллокации между сборками.
+
+Параметры дат (date_from, date_to) при сопоставлении с кассетой не учитываются:
+автопоиск подставляет в них текущую дату, и запись, сделанная вчера, иначе
+бы не совпала ни с одним запросом.
+"""
+import asyncio
+import base64
+import gzip
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import aiohttp
+from multidict import CIMultiDict
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+TRANSPORT_MODES = ('live', 'record', 'replay')
+
+# Параметры, которые не участвуют в сопоставлении запроса с записью
+REPLAY_IGNORED_PARAMS = ('date_from', 'date_to')
+
+# Через сколько записей сбрасывать буфер gzip на диск
+RECORD_FLUSH_EVERY = 50
+
+
+@dataclass
+class TransportResponse:
+    """Ответ HH: тело - байты в том виде, в каком пришли по сети (возможно, сжатые)"""
+    status: int
+    headers: CIMultiDict
+    body: bytes
+    elapsed: float = 0.0
+
+
+class CassetteMissError(LookupError):
+    """В кассете нет ответа на запрос"""
+
+
+def replay_key(path: str, params: Optional[Dict]) -> str:
+    """Ключ сопоставления запроса с записью"""
+    params = {k: v for k, v in (params or {}).items() if k not in REPLAY_IGNORED_PARAMS}
+    return path + '?' + json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+
+class LiveTransport:
+    """Запросы к HH через общую сессию клиента"""
+
+    def __init__(self, base_url: str, get_session: Callable[[], aiohttp.ClientSession]):
+        self.base_url = base_url
+        self._get_session = get_session
+
+    async def get(self, path: str, params: Optional[Dict], headers: Dict, timeout: float) -> TransportResponse:
+        started = time.perf_counter()
+        async with self._get_session().get(
+                f"{self.base_url}{path}",
+                params=params,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            body = await response.read()
+            return TransportResponse(response.status, CIMultiDict(response.headers), body,
+                                     time.perf_counter() - started)
+
+    def close(self):
+        pass
+
+
+class RecordingTransport:
+    """Живой транспорт, дописывающий пары запрос/ответ в кассету"""
+
+    def __init__(self, inner: LiveTransport, path: str):
+        self.inner = inner
+        self.path = path
+        self._file = None
+        self._started = time.time()
+        self.recorded = 0
+
+    async def get(self, path: str, params: Optional[Dict], headers: Dict, timeout: float) -> TransportResponse:
+        response = await self.inner.get(path, params, headers, timeout)
+        self._write({
+            'at': round(time.time() - self._started, 3),
+            'path': path,
+            'params': params or {},
+            'conditional': any(h in headers for h in ('If-None-Match', 'If-Modified-Since')),
+            'status': response.status,
+            'headers': dict(response.headers),
+            'body': base64.b64encode(response.body).decode('ascii'),
+            'elapsed': round(response.elapsed, 4),
+        })
+        return response
+
+    def _write(self, record: Dict):
+        if self._file is None:
+            # Дозапись отдельным gzip-потоком: склеенные потоки читаются как один файл
+            self._file = gzip.open(self.path, 'at', encoding='utf-8')
+            logger.info(f"📼 Запись запросов к HH в {self.path}")
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.recorded += 1
+        if self.recorded % RECORD_FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"📼 Записано запросов к HH: {self.recorded}")
+
+
+def load_cassette(path: str) -> List[Dict]:
+    """Записи кассеты в порядке записи"""
+    records = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+class ReplayTransport:
+    """Ответы из кассеты: для каждого запроса по кругу в порядке записи"""
+
+    def __init__(self, path: str = None, speed: float = None, records: List[Dict] = None):
+        self.speed = config.HH_REPLAY_SPEED if speed is None else speed
+        self.records = records if records is not None else load_cassette(path)
+        self._by_key: Dict[str, List[Dict]] = defaultdict(list)
+        for record in self.records:
+            self._by_key[replay_key(record['path'], record['params'])].append(record)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self.served = 0
+        self.misses = 0
+        logger.info(f"📼 Воспроизведение HH из кассеты: {len(self.records)} записей, "
+                    f"{len(self._by_key)} разных запросов, скорость x{self.speed:g}")
+
+    def requests(self) -> List[Tuple[str, Dict]]:
+        """Записанная смесь запросов в исходном порядке"""
+        return [(record['path'], record['params']) for record in self.records]
+
+    def _pick(self, key: str, conditional: bool) -> Dict:
+        candidates = self._by_key.get(key)
+        if not candidates:
+            self.misses += 1
+            raise CassetteMissError(f"В кассете нет ответа на {key}")
+
+        position = self._positions[key]
+        self._positions[key] = (position + 1) % len(candidates)
+        record = candidates[position]
+        if record['status'] == 304 and not conditional:
+            # Без валидатора у клиента 304 бесполезен: отдаем последний полный ответ
+            for previous in reversed(candidates[:position + 1]):
+                if previous['status'] != 304:
+                    return previous
+        return record
+
+    async def get(self, path: str, params: Optional[Dict], headers: Dict, timeout: float) -> TransportResponse:
+        conditional = any(h in headers for h in ('If-None-Match', 'If-Modified-Since'))
+        record = self._pick(replay_key(path, params), conditional)
+        if self.speed > 0 and record['elapsed']:
+            await asyncio.sleep(record['elapsed'] / self.speed)
+        self.served += 1
+        return TransportResponse(record['status'], CIMultiDict(record['headers']),
+                                 base64.b64decode(record['body']), record['elapsed'])
+
+    def close(self):
+        if self.misses:
+            logger.warning(f"📼 Запросов без записи в кассете: {self.misses} из {self.served + self.misses}")
+
+
+def create_transport(mode: str, base_url: str, get_session: Callable[[], aiohttp.ClientSession]):
+    """Транспорт по режиму HH_TRANSPORT_MODE"""
+    if mode not in TRANSPORT_MODES:
+        logger.warning(f"Неизвестный HH_TRANSPORT_MODE={mode}, используется live")
+        mode = 'live'
+    if mode == 'replay':
+        return ReplayTransport(config.HH_CASSETTE)
+    live = LiveTransport(base_url, get_session)
+    if mode == 'record':
+        return RecordingTransport(live, config.HH_CASSETTE)
+    return live
@@ -0,0 +1,101 @@
+"""
+Компактные множества числовых id вакансий.
+
+HH выдает id вакансий строками из цифр. Внутри бота они хранятся как целые,
+а множества просмотренных и скрытых вакансий - отсортированным массивом
+array('q') (8 байт на id) с буфером недавних вставок. set[str] тратит на
+один id порядка 100 байт: объект строки плюс слот хэш-таблицы.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Set
+
+# Минимальный размер буфера вставок; дальше буфер растет вместе с массивом (1/16),
+# чтобы слияния при пошаговом добавлении обходились в амортизированный O(log n) на id
+MERGE_THRESHOLD = 256
+
+
+def vacancy_int_id(vacancy_id) -> Optional[int]:
+    """Числовой id вакансии HH (None для нечисловых)"""
+    try:
+        return int(vacancy_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class IdSet:
+    """Множество целых id на отсортированном массиве с поиском делением пополам"""
+
+    __slots__ = ('_sorted', '_pending')
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._sorted = array('q', sorted(set(ids)))
+        self._pending: Set[int] = set()
+
+    def _merge(self):
+        # Буфер не пересекается с массивом: дубликаты отсекаются при вставке
+        if self._pending:
+            self._sorted = array('q', sorted(self._sorted + array('q', self._pending)))
+            self._pending = set()
+
+    def _in_sorted(self, value: int) -> bool:
+        position = bisect_left(self._sorted, value)
+        return position < len(self._sorted) and self._sorted[position] == value
+
+    def __contains__(self, value) -> bool:
+        if not isinstance(value, int):
+            value = vacancy_int_id(value)
+            if value is None:
+                return False
+        return value in self._pending or self._in_sorted(value)
+
+    def _maybe_merge(self):
+        if len(self._pending) >= max(MERGE_THRESHOLD, len(self._sorted) >> 4):
+            self._merge()
+
+    def add(self, value: int):
+        value = int(value)
+        if value not in self:
+            self._pending.add(value)
+            self._maybe_merge()
+
+    def update(self, values: Iterable[int]):
+        self._pending.update(value for value in map(int, values) if value not in self)
+        self._maybe_merge()
+
+    def clear(self):
+        self._sorted = array('q')
+        self._pending = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __iter__(self) -> Iterator[int]:
+        self._merge()
+        return iter(self._sorted)
+
+    @property
+    def nbytes(self) -> int:
+        """Объем отсортированного массива в байтах (без буфера вставок)"""
+        return self._sorted.buffer_info()[1] * self._sorted.itemsize
+
+    def to_bytes(self) -> bytes:
+        """Отсортированные id в виде int64 little-endian (для снимка состояния)"""
+        self._merge()
+        if sys.byteorder == 'little':
+            return self._sorted.tobytes()
+        data = array('q', self._sorted)
+        data.byteswap()
+        return data.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'IdSet':
+        """Множество из результата to_bytes без повторной сортировки"""
+        ids = array('q')
+        ids.frombytes(data)
+        if sys.byteorder != 'little':
+            ids.byteswap()
+        result = cls()
+        result._sorted = ids
+        return result
@@ -0,0 +1,88 @@
+"""
+Интерактивный поиск из локального хранилища с откатом на HH API
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from logger import get_logger
+from config import config
+from src.services.areas import area_index
+from src.services.providers import vacancy_providers
+from src.services.circuit_breaker import hh_breaker
+from src.services.filter_service import PAGING_PARAMS, make_query_hash
+from src.services.matching import filter_by_salary, tokenize
+from src.storage.database import AsyncSessionLocal
+from src.storage.repositories.vacancy_repo import get_vacancy_repo
+from src.services.memory_stats import memory_stats
+
+logger = get_logger(__name__)
+
+# Параметры HH, которые фильтруются по одноименным колонкам хранилища
+COLUMN_PARAMS = ('area', 'experience', 'schedule', 'employment')
+
+
+class LocalSearchService:
+    """Повторные запросы в пределах LOCAL_SEARCH_MAX_AGE обслуживаются из хранилища"""
+
+    def __init__(self, max_age_minutes: int = None):
+        self.max_age = 60 * (max_age_minutes if max_age_minutes is not None else config.LOCAL_SEARCH_MAX_AGE)
+        self._fetched_at: Dict[str, float] = {}  # хэш запроса -> время последней выборки из HH
+
+    def _query_key(self, params: Dict) -> str:
+        return make_query_hash({k: v for k, v in params.items() if k not in PAGING_PARAMS})
+
+    def is_fresh(self, params: Dict) -> bool:
+        fetched_at = self._fetched_at.get(self._query_key(params))
+        return fetched_at is not None and time.monotonic() - fetched_at < self.max_age
+
+    async def search(self, params: Dict) -> List[Dict]:
+        """Поиск вакансий: из хранилища, если оно достаточно свежее или HH недоступен, иначе у источников"""
+        degraded = hh_breaker.is_open
+        if self.is_fresh(params) or degraded:
+            try:
+                vacancies = await self.search_store(params)
+                if vacancies:
+                    if degraded:
+                        logger.warning(f"HH недоступен, выдача из локального хранилища: {len(vacancies)} вакансий")
+                    else:
+                        logger.info(f"⚡ Поиск обслужен из локального хранилища: {len(vacancies)} вакансий")
+                    return vacancies
+            except Exception as e:
+                logger.warning(f"Ошибка локального поиска, запрос уйдет в HH: {e}")
+
+        try:
+            vacancies = await vacancy_providers.search(params)
+        except Exception as e:
+            logger.error(f"Ни один источник вакансий не ответил: {e}")
+            return []
+        if vacancies:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await get_vacancy_repo(session).upsert_many(vacancies)
+                self._fetched_at[self._query_key(params)] = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить результаты поиска: {e}")
+        return filter_by_salary(params, vacancies)
+
+    async def search_store(self, params: Dict) -> List[Dict]:
+        """Поиск по локальному хранилищу с семантикой параметров HH"""
+        fields = {name: params[name] for name in COLUMN_PARAMS if params.get(name)}
+        if 'area' in fields:
+            # Регион включает все вложенные города
+            fields['area'] = area_index.expand(fields['area'])
+        period = params.get('period') or 30
+
+        async with AsyncSessionLocal() as session:
+            return await get_vacancy_repo(session).search(
+                tokenize(params.get('text')),
+                title_only=params.get('search_field') == 'name',
+                fields=fields,
+                min_salary=int(params['salary_min']) if params.get('salary_min') else None,
+                published_since=datetime.utcnow() - timedelta(days=int(period)),
+                limit=int(params.get('per_page', PAGING_PARAMS['per_page']))
+            )
+
+
+# Синглтон
+local_search_service = LocalSearchService()
+memory_stats.register('local_search.fetched_at', lambda: local_search_service._fetched_at)
@@ -0,0 +1,208 @@
+"""
+Локальное сопоставление вакансий с фильтрами всех пользователей через инвертированные индексы
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set
+from logger import get_logger
+from src.services.areas import area_index
+from src.services.salary import normalize_salary
+
+logger = get_logger(__name__)
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """Нормализованные токены текста (регистр, ё/е)"""
+    if not text:
+        return set()
+    return set(_TOKEN_RE.findall(text.lower().replace('ё', 'е')))
+
+
+def vacancy_max_salary(vacancy: Dict) -> Optional[int]:
+    """Верхняя граница зарплаты вакансии в рублях в месяц на руки (None, если неизвестна)"""
+    salary_from, salary_to = normalize_salary(vacancy)
+    return salary_to or salary_from
+
+
+def salary_matches(hh_params: Dict, vacancy: Dict) -> bool:
+    """Вакансия проходит минимальную зарплату профиля (без указанной зарплаты - нет)"""
+    salary = hh_params.get('salary_min')
+    if not salary:
+        return True
+    max_salary = vacancy_max_salary(vacancy)
+    return bool(max_salary) and max_salary >= int(salary)
+
+
+def filter_by_salary(hh_params: Dict, vacancies: List[Dict]) -> List[Dict]:
+    """Выдача HH с учетом минимальной зарплаты, которая в HH не отправляется"""
+    if not hh_params.get('salary_min'):
+        return vacancies
+    return [vacancy for vacancy in vacancies if salary_matches(hh_params, vacancy)]
+
+
+def profile_matches(hh_params: Dict, vacancy: Dict) -> bool:
+    """Эталонная проверка одного профиля против одной вакансии (без индексов)"""
+    for name in MatchIndex.FIELDS:
+        expected = hh_params.get(name)
+        if expected is None:
+            continue
+        value = (vacancy.get(name) or {}).get('id')
+        if name == 'area':
+            if str(expected) not in area_index.ancestors(value):
+                return False
+        elif str(expected) != str(value):
+            return False
+
+    tokens = tokenize(hh_params.get('text'))
+    if tokens and not tokens <= tokenize(vacancy.get('name')):
+        return False
+
+    return salary_matches(hh_params, vacancy)
+
+
+class _FieldIndex:
+    """Инвертированный индекс одного поля: значение -> пользователи"""
+
+    def __init__(self):
+        self.by_value: Dict[str, Set[int]] = {}
+        self.any: Set[int] = set()  # пользователи без ограничения по полю
+        self._merged: Dict[str, Set[int]] = {}  # кэш объединений any | by_value[value]
+
+    def add(self, user_key: int, value: Optional[str]):
+        if value is None:
+            self.any.add(user_key)
+        else:
+            self.by_value.setdefault(str(value), set()).add(user_key)
+
+    def candidates(self, value: Optional[str], expand=None) -> Set[int]:
+        """Пользователи, допускающие значение; expand - значения-родители (для регионов)"""
+        if value is None:
+            return self.any
+        value = str(value)
+        merged = self._merged.get(value)
+        if merged is None:
+            merged = self.any
+            for key in (expand(value) if expand else (value,)):
+                matched = self.by_value.get(key)
+                if matched:
+                    merged = merged | matched
+            self._merged[value] = merged
+        return merged
+
+
+class MatchIndex:
+    """
+    Индекс фильтров всех пользователей.
+
+    Ключ пользователя - произвольный int (в планировщике это users.id).
+    Семантика повторяет параметры HH: area - регион вакансии или любой
+    из его родителей, experience, schedule, employment на точное совпадение,
+    text - все токены в названии вакансии,
+    salary - верхняя граница вилки не ниже указанной суммы.
+    """
+
+    FIELDS = ('area', 'experience', 'schedule', 'employment')
+
+    def __init__(self):
+        self.fields = {name: _FieldIndex() for name in self.FIELDS}
+        self.tokens: Dict[str, Set[int]] = {}  # токен профессии -> пользователи
+        self.user_tokens: Dict[int, Set[str]] = {}
+        self.no_text: Set[int] = set()
+        self._salary_values: List[int] = []  # отсортированные минимальные зарплаты
+        self._salary_users: List[int] = []
+        self.min_salary: Dict[int, int] = {}
+        self.no_salary: Set[int] = set()
+        self.size = 0
+
+    @classmethod
+    def build(cls, profiles: Iterable) -> 'MatchIndex':
+        """Построить индекс из пар (ключ пользователя, скомпилированные параметры HH)"""
+        index = cls()
+        salaries = []
+        for user_key, hh_params in profiles:
+            index.size += 1
+            for name in cls.FIELDS:
+                index.fields[name].add(user_key, hh_params.get(name))
+
+            tokens = tokenize(hh_params.get('text'))
+            if tokens:
+                index.user_tokens[user_key] = tokens
+                for token in tokens:
+                    index.tokens.setdefault(token, set()).add(user_key)
+            else:
+                index.no_text.add(user_key)
+
+            salary = hh_params.get('salary_min')
+            if salary:
+                salaries.append((int(salary), user_key))
+                index.min_salary[user_key] = int(salary)
+            else:
+                index.no_salary.add(user_key)
+
+        salaries.sort()
+        index._salary_values = [value for value, _ in salaries]
+        index._salary_users = [user_key for _, user_key in salaries]
+        return index
+
+    def _filter_text(self, vacancy: Dict, candidates: Set[int]) -> Set[int]:
+        vacancy_tokens = tokenize(vacancy.get('name'))
+
+        # Небольшой набор кандидатов дешевле проверить напрямую
+        if len(candidates) <= sum(len(self.tokens.get(t, ())) for t in vacancy_tokens):
+            return {
+                user_key for user_key in candidates
+                if user_key in self.no_text or self.user_tokens[user_key] <= vacancy_tokens
+            }
+
+        hits: Dict[int, int] = {}
+        for token in vacancy_tokens:
+            for user_key in self.tokens.get(token, ()):
+                hits[user_key] = hits.get(user_key, 0) + 1
+        matched = {user_key for user_key, count in hits.items() if count == len(self.user_tokens[user_key])}
+        return candidates & (matched | self.no_text)
+
+    def _filter_salary(self, vacancy: Dict, candidates: Set[int]) -> Set[int]:
+        max_salary = vacancy_max_salary(vacancy)
+        if not max_salary:
+            return candidates & self.no_salary
+
+        position = bisect_right(self._salary_values, max_salary)
+        if len(candidates) <= position:
+            return {
+                user_key for user_key in candidates
+                if self.min_salary.get(user_key, 0) <= max_salary
+            }
+        return candidates & self.no_salary.union(self._salary_users[:position])
+
+    def match(self, vacancy: Dict) -> Set[int]:
+        """Пользователи, чьим фильтрам соответствует вакансия"""
+        candidate_sets = [
+            # Фильтр по региону допускает вакансии всех вложенных регионов
+            self.fields['area'].candidates((vacancy.get('area') or {}).get('id'), area_index.ancestors),
+            self.fields['experience'].candidates((vacancy.get('experience') or {}).get('id')),
+            self.fields['schedule'].candidates((vacancy.get('schedule') or {}).get('id')),
+            self.fields['employment'].candidates((vacancy.get('employment') or {}).get('id')),
+        ]
+        # Пересекаем, начиная с самого маленького множества
+        candidate_sets.sort(key=len)
+        result = candidate_sets[0] & candidate_sets[1]
+        for candidates in candidate_sets[2:]:
+            if not result:
+                return result
+            result &= candidates
+
+        if result:
+            result = self._filter_text(vacancy, result)
+        if result:
+            result = self._filter_salary(vacancy, result)
+        return result
+
+    def match_all(self, vacancies: Iterable[Dict]) -> Dict[int, List[Dict]]:
+        """Разложить пачку вакансий по пользователям"""
+        per_user: Dict[int, List[Dict]] = {}
+        for vacancy in vacancies:
+            for user_key in self.match(vacancy):
+                per_user.setdefault(user_key, []).append(vacancy)
+        return per_user
@@ -0,0 +1,158 @@
+"""
+Память долгоживущего процесса: размеры хранилищ в памяти и снимки tracemalloc.
+
+Модули с хранилищами, растущими со временем (поиски пользователей, просмотренные
+вакансии, кэши), регистрируют их здесь. Размер оценивается обходом объектов
+с ограничением на число посещенных объектов, поэтому отчет дешев даже на больших
+хранилищах (при превышении лимита оценка помечается как нижняя граница).
+
+Снимки tracemalloc включаются только по запросу: трассировка аллокаций заметно
+замедляет процесс.
+"""
+import os
+import sys
+import tracemalloc
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+# Сколько объектов обходить при оценке размера одного хранилища
+SIZE_WALK_LIMIT = 200_000
+
+_ATOMIC = (str, bytes, bytearray, int, float, bool, complex, type(None), array, range)
+
+
+@dataclass
+class StoreGauge:
+    name: str
+    entries: int
+    bytes: int
+    exact: bool  # False - обход прерван по лимиту, bytes - нижняя граница
+
+
+def deep_sizeof(obj, limit: int = SIZE_WALK_LIMIT) -> Tuple[int, bool]:
+    """Суммарный размер объекта и всего, на что он ссылается: (байты, полностью ли обойден)"""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        if len(seen) >= limit:
+            return total, False
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, _ATOMIC):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            if hasattr(current, '__dict__'):
+                stack.append(current.__dict__)
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total, True
+
+
+def process_rss() -> Optional[int]:
+    """Текущий RSS процесса в байтах (Linux), иначе пиковый по getrusage"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class MemoryStats:
+    """Реестр хранилищ в памяти и снимки tracemalloc"""
+
+    def __init__(self):
+        self._stores: Dict[str, Tuple[Callable, Callable]] = {}  # имя -> (объект, число записей)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    def register(self, name: str, getter: Callable, entries: Callable = None):
+        """Зарегистрировать хранилище: getter возвращает объект, entries - число записей (по умолчанию len)"""
+        self._stores[name] = (getter, entries or len)
+
+    @property
+    def store_names(self) -> List[str]:
+        return list(self._stores)
+
+    def gauge(self, name: str) -> Optional[StoreGauge]:
+        """Размер и число записей одного хранилища; None, если измерить не удалось"""
+        getter, entries = self._stores[name]
+        try:
+            store = getter()
+            size, exact = deep_sizeof(store)
+            return StoreGauge(name, entries(store), size, exact)
+        except Exception as e:
+            logger.error(f"Не удалось измерить хранилище {name}: {e}")
+            return None
+
+    def gauges(self) -> List[StoreGauge]:
+        """Размер и число записей каждого хранилища"""
+        return [gauge for gauge in map(self.gauge, self.store_names) if gauge is not None]
+
+    def metrics(self, gauges: List[StoreGauge] = None) -> Dict[str, float]:
+        """Плоский набор метрик для экспорта (gauges - уже снятые замеры хранилищ)"""
+        metrics = {}
+        rss = process_rss()
+        if rss is not None:
+            metrics['process_rss_bytes'] = rss
+        for gauge in self.gauges() if gauges is None else gauges:
+            metrics[f"store_entries{{store=\"{gauge.name}\"}}"] = gauge.entries
+            metrics[f"store_bytes{{store=\"{gauge.name}\"}}"] = gauge.bytes
+        return metrics
+
+    # --- tracemalloc ---
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take_baseline(self):
+        """Включить tracemalloc (если выключен) и запомнить базовый снимок"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.TRACEMALLOC_FRAMES)
+            logger.info("🧠 tracemalloc включен")
+        self._baseline = self._snapshot()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+
+    def diff(self, top: int = 10) -> List[tracemalloc.StatisticDiff]:
+        """Места аллокаций с наибольшим приростом с базового снимка"""
+        if self._baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("Базовый снимок не сделан")
+        return self._snapshot().compare_to(self._baseline, 'lineno')[:top]
+
+    def stop(self):
+        """Выключить tracemalloc и забыть базовый снимок"""
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("🧠 tracemalloc выключен")
+
+
+# Синглтон
+memory_stats = MemoryStats()
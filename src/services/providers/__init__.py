@@ -0,0 +1,4 @@
+from .base import VacancyProvider, RateLimiter
+from .aggregator import ProviderAggregator, vacancy_providers, dedupe_key
+
+__all__ = ['VacancyProvider', 'RateLimiter', 'ProviderAggregator', 'vacancy_providers', 'dedupe_key']
@@ -0,0 +1,120 @@
+"""
+Параллельный опрос всех источников вакансий и слияние результатов.
+
+Источники опрашиваются одновременно, поэтому новый источник добавляет к проходу
+не свою задержку, а максимум из задержек. Одна и та же вакансия, опубликованная
+на нескольких площадках, остается в выдаче один раз: ключ - нормализованные
+название, работодатель и город, приоритет у источника, зарегистрированного раньше.
+Внутри одного источника вакансии с одинаковым ключом не склеиваются: у сетевых
+работодателей это обычно разные вакансии (разные адреса, смены).
+"""
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+from logger import get_logger
+from src.services.areas import area_index
+from src.services.providers.base import VacancyProvider
+from src.services.tracing import tracer
+
+logger = get_logger(__name__)
+
+# Организационно-правовые формы не различают работодателей
+LEGAL_FORMS = re.compile(r'\b(ооо|оао|зао|пао|ао|ип|нко|гк|llc|ltd|inc|gmbh)\b')
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def _normalize(text: Optional[str]) -> str:
+    text = (text or '').lower().replace('ё', 'е')
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+
+def dedupe_key(vacancy: Dict) -> Tuple[str, str, str]:
+    """Ключ одинаковой вакансии на разных площадках"""
+    employer = _normalize((vacancy.get('employer') or {}).get('name'))
+    area = vacancy.get('area') or {}
+    city = area.get('name') or (area_index.name(area['id']) if area.get('id') else '')
+    return _normalize(vacancy.get('name')), ' '.join(LEGAL_FORMS.sub(' ', employer).split()), _normalize(city)
+
+
+class ProviderAggregator:
+    """Реестр источников и их одновременный опрос"""
+
+    def __init__(self):
+        self.providers: List[VacancyProvider] = []
+
+    def register(self, provider: VacancyProvider):
+        self.providers.append(provider)
+
+    def get(self, name: str) -> Optional[VacancyProvider]:
+        return next((provider for provider in self.providers if provider.name == name), None)
+
+    async def _search_one(self, provider: VacancyProvider, params: Dict) -> List[Dict]:
+        with tracer.span(f"provider {provider.name}", 'provider') as span:
+            vacancies = await asyncio.wait_for(provider.search(params), provider.timeout)
+            if span is not None:
+                span.args['vacancies'] = len(vacancies)
+            return vacancies
+
+    async def search(self, params: Dict) -> List[Dict]:
+        """Вакансии всех источников без повторов.
+
+        Ошибка или таймаут источника не мешает остальным; если не ответил ни один,
+        ошибка пробрасывается, чтобы вызывающий мог отличить сбой от пустой выдачи.
+        """
+        results = await asyncio.gather(
+            *(self._search_one(provider, params) for provider in self.providers),
+            return_exceptions=True
+        )
+
+        merged, errors = [], []
+        seen: Dict[Tuple[str, str, str], str] = {}  # ключ -> источник, первым давший вакансию
+        for provider, result in zip(self.providers, results):
+            if isinstance(result, BaseException):
+                if isinstance(result, asyncio.TimeoutError):
+                    logger.warning(f"Источник {provider.name} не ответил за {provider.timeout} с")
+                else:
+                    logger.error(f"Ошибка источника {provider.name}: {result}")
+                errors.append(result)
+                continue
+            if len(self.providers) == 1:
+                merged.extend(result)
+                continue
+            for vacancy in result:
+                key = dedupe_key(vacancy)
+                if seen.setdefault(key, provider.name) != provider.name:
+                    continue
+                merged.append(vacancy)
+
+        if errors and len(errors) == len(self.providers):
+            raise errors[0]
+        if len(self.providers) > 1:
+            total = sum(len(result) for result in results if not isinstance(result, BaseException))
+            logger.debug(f"Источники: {total} вакансий, без повторов {len(merged)}")
+        return merged
+
+    async def get_vacancy(self, vacancy_id: str) -> Optional[Dict]:
+        """Полное описание вакансии от первого источника, который его вернул"""
+        for provider in self.providers:
+            try:
+                vacancy = await asyncio.wait_for(provider.get_vacancy(vacancy_id), provider.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Источник {provider.name} не вернул вакансию {vacancy_id} за {provider.timeout} с")
+                continue
+            except Exception as e:
+                logger.error(f"Ошибка источника {provider.name} при запросе вакансии {vacancy_id}: {e}")
+                continue
+            if vacancy:
+                return vacancy
+        return None
+
+
+def _default_aggregator() -> ProviderAggregator:
+    from src.services.providers.hh import HHProvider
+
+    aggregator = ProviderAggregator()
+    aggregator.register(HHProvider())
+    return aggregator
+
+
+# Синглтон
+vacancy_providers = _default_aggregator()
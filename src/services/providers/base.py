@@ -0,0 +1,55 @@
+"""
+Интерфейс источника вакансий.
+
+Источник принимает параметры поиска в формате HH (это внутреннее представление
+фильтров бота) и сам переводит их в свой API. Вакансии возвращаются в форме
+ответа HH (id, name, employer, area, salary, alternate_url, published_at...),
+чтобы хранилище, сопоставление и форматирование сообщений работали без изменений.
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+class RateLimiter:
+    """Асинхронное ведро токенов: не больше rate запросов в секунду, всплеск до burst"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self._refilled_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def acquire(self):
+        # Ожидающие обслуживаются по очереди захвата блокировки
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class VacancyProvider(ABC):
+    """Источник вакансий со своим ограничением частоты и таймаутом"""
+
+    name: str = ''
+
+    def __init__(self, rate: float, timeout: float):
+        self.rate_limiter = RateLimiter(rate)
+        self.timeout = timeout
+
+    @abstractmethod
+    async def search(self, params: Dict) -> List[Dict]:
+        """Вакансии по параметрам в формате HH; сбой источника - исключение, а не пустой список"""
+
+    async def get_vacancy(self, vacancy_id: str) -> Optional[Dict]:
+        """Полное описание вакансии этого источника"""
+        return None
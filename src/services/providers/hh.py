@@ -0,0 +1,26 @@
+"""
+HeadHunter как источник вакансий
+"""
+from typing import Dict, List, Optional
+from config import config
+from src.services.filter_service import LOCAL_PARAMS
+from src.services.hh_client import HHAPIClient, hh_client
+from src.services.providers.base import VacancyProvider
+
+
+class HHProvider(VacancyProvider):
+    """Поиск через HHAPIClient; параметры уже в формате HH, кроме локальных фильтров"""
+
+    name = 'hh'
+
+    def __init__(self, client: HHAPIClient = None, rate: float = None, timeout: float = None):
+        super().__init__(rate or config.HH_PROVIDER_RPS, timeout or config.HH_PROVIDER_TIMEOUT)
+        self.client = client or hh_client
+
+    async def search(self, params: Dict) -> List[Dict]:
+        await self.rate_limiter.acquire()
+        return await self.client.fetch_vacancies(**{k: v for k, v in params.items() if k not in LOCAL_PARAMS})
+
+    async def get_vacancy(self, vacancy_id: str) -> Optional[Dict]:
+        await self.rate_limiter.acquire()
+        return await self.client.get_vacancy_details(vacancy_id)
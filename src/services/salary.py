@@ -0,0 +1,42 @@
+"""
+Нормализация зарплат вакансий в рубли в месяц "на руки"
+"""
+from typing import Dict, Optional, Tuple
+from src.services.dictionaries import hh_dictionaries
+
+# Ставка НДФЛ для пересчета gross -> net
+INCOME_TAX = 0.13
+
+# Множители для зарплат, указанных не за месяц (salary_range.mode.id)
+MODE_MULTIPLIERS = {
+    'HOUR': 168,   # 21 рабочий день по 8 часов
+    'SHIFT': 21,
+}
+
+
+def to_rub(amount: float, currency: Optional[str]) -> Optional[float]:
+    """Перевести сумму в рубли по курсу из справочника HH (None для неизвестной валюты)"""
+    rate = hh_dictionaries.currency_rate(currency)
+    if not rate:
+        return None
+    return amount / rate
+
+
+def normalize_salary(vacancy: Dict) -> Tuple[Optional[int], Optional[int]]:
+    """Вилка зарплаты вакансии в рублях в месяц на руки: (от, до)"""
+    salary = vacancy.get('salary_range') or vacancy.get('salary')
+    if not salary:
+        return None, None
+
+    mode = ((salary.get('mode') or {}).get('id') or 'MONTH').upper()
+    multiplier = MODE_MULTIPLIERS.get(mode, 1)
+    if salary.get('gross'):
+        multiplier *= 1 - INCOME_TAX
+
+    def convert(amount) -> Optional[int]:
+        if not amount:
+            return None
+        rub = to_rub(amount, salary.get('currency'))
+        return int(round(rub * multiplier)) if rub is not None else None
+
+    return convert(salary.get('from')), convert(salary.get('to'))
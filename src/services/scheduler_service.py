@@ -1,18 +1,59 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Set
+import json
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
 from sqlalchemy import select
 from logger import get_logger
+from config import config
 from src.storage.database import AsyncSessionLocal
-from src.storage.models import User, UserFilter
+from src.storage.models import User, UserProfile
 from src.services.hh_client import hh_client
-from src.services.filter_service import filter_service
-from src.storage.repositories.filter_repo import FilterRepository
+from src.services.filter_service import filter_service, with_paging
+from src.services.firehose import firehose_service
+from src.services.providers import vacancy_providers
+from src.services.adaptive_polling import adaptive_poller
+from src.services.timer_wheel import TimerWheel, phase_offset
+from src.services.exclusions import exclusion_service
+from src.services.id_sets import IdSet, vacancy_int_id
+from src.services.state_snapshot import SnapshotError, read_snapshot, write_snapshot
+from src.services.tracing import tracer
+from src.services.vacancy_changes import salary_increase, vacancy_salary_level
+from src.services.memory_stats import memory_stats
+from src.services.circuit_breaker import CircuitOpenError, blocking_breaker, breaker_states, telegram_breaker
+from src.services.areas import area_index
+from src.services.matching import MatchIndex, filter_by_salary
+from src.storage.repositories.profile_repo import get_profile_repo
+from src.storage.repositories.pass_repo import get_pass_repo
+from src.storage.repositories.vacancy_repo import get_vacancy_repo
 
 logger = get_logger(__name__)
 
+# Режимы, в которых задача планировщика - частый тик очереди запросов, а не полный проход
+TICK_MODES = ('adaptive', 'staggered')
+TICK_MINUTES = 1
+
+# Раздел снимка с множествами отправленных вакансий: число пользователей, затем на каждого
+# (user_id, число id) и сами id массивом int64
+PROCESSED_COUNT = struct.Struct('<I')
+PROCESSED_ENTRY = struct.Struct('<qI')
+
+# Сколько последних отправленных вакансий на пользователя отслеживать для уведомлений о росте зарплаты
+SALARY_ALERTS_TRACKED = 500
+
+
+@dataclass
+class QueryTiming:
+    """Последняя проверка группы запросов"""
+    checked_at: float  # unix time
+    duration: float  # секунды
+    vacancies: Optional[int]  # None - запрос завершился ошибкой
+
 
 class SchedulerService:
     """Сервис для автоматического поиска вакансий по расписанию"""
@@ -21,35 +62,229 @@ class SchedulerService:
         self.bot = bot
         self.scheduler = AsyncIOScheduler()
         self.check_interval = 60  # минут по умолчанию
-        self.processed_vacancies: Dict[int, Set[str]] = {}  # user_id -> set(vacancy_ids)
+        self.processed_vacancies: Dict[int, IdSet] = {}  # user_id -> id отправленных вакансий
+        # user_id -> {id вакансии: уровень зарплаты, который пользователь видел (0 - не указана)};
+        # только для включивших уведомления о росте зарплаты
+        self.notified_salaries: Dict[int, Dict[int, int]] = {}
+        self.mode = config.SCHEDULER_MODE
+        self.poller = adaptive_poller
+        self.wheel: Optional[TimerWheel] = None
+        self.overdue_queries: List[str] = []  # группы, пропущенные из-за недоступности HH/Telegram
+        self._user_checks: Dict[int, asyncio.Task] = {}  # telegram_id -> отложенная проверка
+        self._dispatch_locks: Dict[int, asyncio.Lock] = {}  # user_id -> отправка вакансий пользователю
+        self._areas_task: Optional[asyncio.Task] = None
+        filter_service.on_change(self.request_user_check)
+        self._pass_in_progress = False
+        # Для проверок состояния: время запуска, последнего завершенного прохода (тика) и начала текущего
+        self.started_at: Optional[float] = None
+        self.last_pass_at: Optional[float] = None
+        self.pass_started_at: Optional[float] = None
+        self.query_timings: Dict[str, QueryTiming] = {}  # query_hash -> последняя проверка
+        self.snapshot_saved_at: Optional[float] = None
+        memory_stats.register('scheduler.processed_vacancies', lambda: self.processed_vacancies,
+                              entries=lambda store: sum(len(ids) for ids in store.values()))
+        memory_stats.register('scheduler.notified_salaries', lambda: self.notified_salaries,
+                              entries=lambda store: sum(len(levels) for levels in store.values()))
 
     async def start(self, interval_minutes: int = 60):
         """Запуск планировщика"""
+        if self.scheduler.running:
+            # Повторный запуск только меняет интервал, без лишнего прохода
+            await self.set_interval(interval_minutes)
+            return
+
         self.check_interval = interval_minutes
+        self.poller.base_interval = 60 * interval_minutes
+        self.started_at = time.time()
 
-        # Загружаем уже обработанные вакансии для каждого пользователя
+        # Состояние прошлого запуска, затем уже обработанные вакансии для каждого пользователя
+        await self.restore_snapshot()
         await self._load_processed_vacancies()
+        if self.mode == 'adaptive':
+            await self.poller.load()
 
-        # Добавляем задачу
-        trigger = IntervalTrigger(minutes=interval_minutes)
+        # Дерево регионов HH: при первом запуске загружаем снимок в фоне, чтобы не задерживать старт
+        if not area_index.has_snapshot and (self._areas_task is None or self._areas_task.done()):
+            self._areas_task = asyncio.create_task(self._load_areas())
+
+        # Добавляем задачу. Первый проход - сразу, если предыдущий не завершен или давно закончился,
+        # иначе через интервал после него: перезапуски и деплои не удваивают нагрузку на HH и Telegram
+        trigger = self._job_trigger()
+        next_run_time = await self._next_run_time()
         self.scheduler.add_job(
             self.check_new_vacancies_for_all_users,
             trigger,
             id='auto_search',
-            replace_existing=True
+            replace_existing=True,
+            next_run_time=next_run_time,
+            coalesce=True,
+            misfire_grace_time=None
         )
 
+        if config.STATE_SNAPSHOT_PATH and config.STATE_SNAPSHOT_INTERVAL > 0:
+            self.scheduler.add_job(
+                self.save_snapshot,
+                IntervalTrigger(minutes=config.STATE_SNAPSHOT_INTERVAL),
+                id='state_snapshot',
+                replace_existing=True,
+                coalesce=True
+            )
+
         self.scheduler.start()
-        logger.info(f"✅ Планировщик запущен. Интервал проверки: {interval_minutes} минут")
+        logger.info(f"✅ Планировщик запущен. Интервал проверки: {interval_minutes} минут, "
+                    f"следующая проверка: {next_run_time:%H:%M:%S} UTC")
+
+    async def _load_areas(self):
+        """Загрузить дерево регионов и уточнить города в профилях"""
+        try:
+            if await area_index.refresh_if_missing():
+                await filter_service.recompile_profiles()
+        except Exception as e:
+            logger.error(f"Не удалось загрузить дерево регионов HH: {e}")
 
-        # Сразу делаем первую проверку
-        asyncio.create_task(self.check_new_vacancies_for_all_users())
+    async def set_interval(self, interval_minutes: int):
+        """Изменить интервал без перезапуска планировщика и внеочередного прохода"""
+        if not self.scheduler.running:
+            await self.start(interval_minutes)
+            return
+
+        self.check_interval = interval_minutes
+        self.poller.base_interval = 60 * interval_minutes
+        if self.mode in TICK_MODES:
+            # Колесо перестроится на следующем тике с новым числом ячеек
+            self.wheel = None
+            logger.info(f"⏱ Базовый интервал опроса запросов изменен на {interval_minutes} минут")
+            return
+
+        self.scheduler.reschedule_job('auto_search', trigger=IntervalTrigger(minutes=interval_minutes))
+        next_run_time = await self._next_run_time()
+        self.scheduler.modify_job('auto_search', next_run_time=next_run_time)
+        logger.info(f"⏱ Интервал проверки изменен на {interval_minutes} минут, "
+                    f"следующая проверка: {next_run_time:%H:%M:%S} UTC")
+
+    def _job_trigger(self) -> IntervalTrigger:
+        """Триггер задачи: полный проход раз в интервал или частый тик очереди запросов"""
+        if self.mode in TICK_MODES:
+            return IntervalTrigger(minutes=TICK_MINUTES)
+        return IntervalTrigger(minutes=self.check_interval)
+
+    async def _next_run_time(self) -> datetime:
+        """Время следующего прохода с учетом последнего прохода в БД"""
+        now = datetime.now(timezone.utc)
+        if self.mode in TICK_MODES:
+            return now
+        if self._pass_in_progress:
+            return now + timedelta(minutes=self.check_interval)
+
+        async with AsyncSessionLocal() as session:
+            last_pass = await get_pass_repo(session).get_last_pass()
+
+        if not last_pass or last_pass.status != 'completed' or not last_pass.finished_at:
+            # Проходов еще не было или прошлый прервался - продолжаем сразу
+            return now
+        due = last_pass.finished_at.replace(tzinfo=timezone.utc) + timedelta(minutes=self.check_interval)
+        return max(now, due)
 
     async def stop(self):
         """Остановка планировщика"""
         self.scheduler.shutdown(wait=False)
+        if self._areas_task and not self._areas_task.done():
+            self._areas_task.cancel()
+        await self.save_snapshot()
         logger.info("🛑 Планировщик остановлен")
 
+    # --- снимок состояния ---
+
+    async def save_snapshot(self):
+        """Сохранить состояние для быстрого старта: сбор - в цикле событий, кодирование и запись - в потоке"""
+        if not config.STATE_SNAPSHOT_PATH:
+            return
+        started = time.perf_counter()
+        state = {
+            'processed': {user_id: ids.to_bytes() for user_id, ids in self.processed_vacancies.items()},
+            'hh_validators': hh_client.export_validators(),
+            'firehose_cursors': firehose_service.export_cursors(),
+            'firehose_backfill': firehose_service.export_backfill(),
+            'notified_salaries': {user_id: list(levels.items()) for user_id, levels in self.notified_salaries.items()},
+            'poller_activity': self.poller.export_activity(),
+            'query_timings': {query_hash: [t.checked_at, t.duration, t.vacancies]
+                              for query_hash, t in self.query_timings.items()},
+        }
+        try:
+            size = await asyncio.to_thread(self._write_snapshot, config.STATE_SNAPSHOT_PATH, state)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить снимок состояния: {e}")
+            return
+        self.snapshot_saved_at = time.time()
+        logger.info(f"💾 Снимок состояния сохранен: {size / 1024:.0f} КБ, "
+                    f"{time.perf_counter() - started:.2f} с")
+
+    @staticmethod
+    def _write_snapshot(path: str, state: Dict) -> int:
+        processed = state.pop('processed')
+        parts = [PROCESSED_COUNT.pack(len(processed))]
+        for user_id, ids in processed.items():
+            parts.append(PROCESSED_ENTRY.pack(user_id, len(ids) // 8))
+            parts.append(ids)
+        sections = {'processed': b''.join(parts)}
+        for name, value in state.items():
+            sections[name] = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return write_snapshot(path, sections)
+
+    @staticmethod
+    def _read_snapshot(path: str) -> Tuple[Dict, float]:
+        sections, created_at = read_snapshot(path)
+        state = {name: json.loads(data) for name, data in sections.items() if name != 'processed'}
+
+        processed = {}
+        data = sections.get('processed', b'')
+        if data:
+            (count,) = PROCESSED_COUNT.unpack_from(data)
+            position = PROCESSED_COUNT.size
+            for _ in range(count):
+                user_id, length = PROCESSED_ENTRY.unpack_from(data, position)
+                position += PROCESSED_ENTRY.size
+                processed[user_id] = IdSet.from_bytes(data[position:position + 8 * length])
+                position += 8 * length
+        state['processed'] = processed
+        return state, created_at
+
+    async def restore_snapshot(self):
+        """Восстановить состояние прошлого запуска; без снимка или с негодным снимком старт идет с нуля"""
+        path = config.STATE_SNAPSHOT_PATH
+        if not path:
+            return
+        started = time.perf_counter()
+        try:
+            state, created_at = await asyncio.to_thread(self._read_snapshot, path)
+        except FileNotFoundError:
+            logger.info("Снимок состояния не найден, планировщик стартует с нуля")
+            return
+        except (SnapshotError, ValueError, struct.error) as e:
+            logger.warning(f"Снимок состояния {path} не загружен: {e}")
+            return
+
+        for user_id, ids in state['processed'].items():
+            current = self.processed_vacancies.get(user_id)
+            if current is None:
+                self.processed_vacancies[user_id] = ids
+            else:
+                current.update(ids)
+        hh_client.import_validators(state.get('hh_validators', []))
+        firehose_service.import_cursors(state.get('firehose_cursors', {}))
+        firehose_service.import_backfill(state.get('firehose_backfill', {}))
+        for user_id, levels in state.get('notified_salaries', {}).items():
+            self.notified_salaries.setdefault(int(user_id), dict(levels))
+        self.poller.import_activity(state.get('poller_activity', {}))
+        for query_hash, (checked_at, duration, vacancies) in state.get('query_timings', {}).items():
+            self.query_timings.setdefault(query_hash, QueryTiming(checked_at, duration, vacancies))
+
+        logger.info(f"💾 Загружен снимок состояния от {datetime.fromtimestamp(created_at):%d.%m %H:%M}: "
+                    f"пользователей {len(state['processed'])}, "
+                    f"ответов HH {len(state.get('hh_validators', []))}, "
+                    f"запросов {len(state.get('query_timings', {}))}, "
+                    f"{time.perf_counter() - started:.2f} с")
+
     async def _load_processed_vacancies(self):
         """Загрузка уже обработанных вакансий"""
         async with AsyncSessionLocal() as session:
@@ -59,91 +294,445 @@ class SchedulerService:
             users = result.scalars().all()
 
             for user in users:
-                self.processed_vacancies[user.id] = set()
+                self.processed_vacancies.setdefault(user.id, IdSet())
 
             logger.info(f"📊 Загружено {len(users)} пользователей для автоматического поиска")
 
+        # Профили для пользователей, настроивших фильтры до их появления, и профили,
+        # скомпилированные прежней версией
+        await filter_service.ensure_profiles()
+        await filter_service.recompile_profiles()
+
+    @tracer.traced('pass', 'scheduler')
     async def check_new_vacancies_for_all_users(self):
         """Проверка новых вакансий для всех активных пользователей"""
+        breaker = blocking_breaker()
+        if breaker:
+            # Зависимость недоступна: не тратим проход на таймауты
+            self._defer_pass(CircuitOpenError(breaker.name, breaker.retry_at))
+            return
+
+        if self.mode in TICK_MODES:
+            self.pass_started_at = time.time()
+            try:
+                if self.mode == 'adaptive':
+                    await self._check_adaptive()
+                else:
+                    await self._check_staggered()
+                self.last_pass_at = time.time()
+            finally:
+                self.pass_started_at = None
+            return
+
         logger.info("🔍 Запуск автоматической проверки вакансий...")
 
         async with AsyncSessionLocal() as session:
-            # Получаем всех активных пользователей
-            stmt = select(User).where(User.is_active == True)
-            result = await session.execute(stmt)
-            users = result.scalars().all()
+            # Активные пользователи вместе с готовыми профилями - одним запросом
+            rows = await get_profile_repo(session).get_active_profiles()
+
+            # Незавершенный проход (сбой, перезапуск) продолжаем с контрольной точки
+            pass_repo = get_pass_repo(session)
+            scheduler_pass = await pass_repo.get_last_pass()
+            if scheduler_pass and scheduler_pass.status == 'running' and scheduler_pass.mode == self.mode:
+                logger.info(f"↩️ Продолжаем проход #{scheduler_pass.id} "
+                            f"с контрольной точки {(scheduler_pass.cursor or '-')[:12]}")
+            else:
+                scheduler_pass = await pass_repo.start_pass(self.mode)
+            pass_id, cursor = scheduler_pass.id, scheduler_pass.cursor or ''
+
+        self._pass_in_progress = True
+        self.pass_started_at = time.time()
+        try:
+            if self.mode == 'firehose':
+                await self._check_firehose(rows, pass_id, scheduler_pass.batch or [])
+            else:
+                await self._check_query_groups(rows, pass_id, cursor)
+
+            async with AsyncSessionLocal() as session:
+                await get_pass_repo(session).complete_pass(pass_id)
+            self.last_pass_at = time.time()
+            logger.info(f"🏁 Проход #{pass_id} завершен")
+        except CircuitOpenError as e:
+            # Проход остается незавершенным и продолжится с контрольной точки
+            self._defer_pass(e)
+        finally:
+            self._pass_in_progress = False
+            self.pass_started_at = None
+
+    def _ensure_dependencies(self):
+        """Прервать проход, если HH или Telegram недоступны"""
+        breaker = blocking_breaker()
+        if breaker:
+            raise CircuitOpenError(breaker.name, breaker.retry_at)
+
+    def _defer_pass(self, error: CircuitOpenError):
+        """Перенести следующий запуск на момент пробного запроса предохранителя"""
+        retry_in = max(5.0, error.retry_at - time.monotonic())
+        logger.warning(f"⏸ {error.name} недоступен, проверка отложена на {retry_in:.0f} с")
+        if self.mode not in TICK_MODES and self.scheduler.get_job('auto_search'):
+            self.scheduler.modify_job(
+                'auto_search', next_run_time=datetime.now(timezone.utc) + timedelta(seconds=retry_in)
+            )
+
+    async def _save_checkpoint(self, pass_id: int, cursor: str):
+        """Запомнить последний полностью обработанный ключ прохода"""
+        async with AsyncSessionLocal() as session:
+            await get_pass_repo(session).save_cursor(pass_id, cursor)
 
-            logger.info(f"👥 Найдено {len(users)} активных пользователей")
+    async def _check_query_groups(self, rows: List[Tuple[User, UserProfile]], pass_id: int, cursor: str):
+        """Запросы к HH по группам фильтров в порядке хэша, начиная после контрольной точки"""
+        groups = self._group_by_query(rows)
+        pending = sorted((query_hash, group) for query_hash, group in groups.items() if query_hash > cursor)
+        logger.info(f"👥 Найдено {len(rows)} активных пользователей с фильтрами, "
+                    f"уникальных запросов: {len(groups)}, осталось в проходе: {len(pending)}")
 
-            for user in users:
-                try:
-                    await self.check_new_vacancies_for_user(session, user)
-                    # Небольшая задержка между пользователями
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logger.error(f"❌ Ошибка при проверке вакансий для пользователя {user.id}: {e}")
+        for query_hash, (hh_params, users) in pending:
+            self._ensure_dependencies()
+            try:
+                await self._check_timed(query_hash, hh_params, users)
+                # Небольшая задержка между запросами к HH
+                await asyncio.sleep(1)
+            except Exception as e:
+                logger.error(f"❌ Ошибка при проверке запроса {query_hash[:12]}: {e}")
+            # Группа, на которой отказала зависимость, повторится после восстановления
+            self._ensure_dependencies()
+            await self._save_checkpoint(pass_id, query_hash)
+
+    def _group_by_query(self, rows: List[Tuple[User, UserProfile]]) -> Dict[str, Tuple[Dict, List[User]]]:
+        """Группировка пользователей по каноническому хэшу запроса"""
+        groups: Dict[str, Tuple[Dict, List[User]]] = {}
+        for user, profile in rows:
+            if profile.query_hash not in groups:
+                groups[profile.query_hash] = (profile.hh_params, [])
+            groups[profile.query_hash][1].append(user)
+        return groups
+
+    async def _check_adaptive(self):
+        """Тик адаптивного режима: опрос запросов, срок которых подошел, в пределах бюджета"""
+        async with AsyncSessionLocal() as session:
+            rows = await get_profile_repo(session).get_active_profiles()
+
+        groups = self._group_by_query(rows)
+        self.poller.sync({
+            query_hash: [user.telegram_id for user in users]
+            for query_hash, (_, users) in groups.items()
+        })
+        for user, profile in rows:
+            self.poller.seed_activity(user.telegram_id, profile.updated_at)
+
+        due = self.poller.take_due()
+        if not due:
+            return
+        logger.info(f"🎯 К опросу {len(due)} из {len(groups)} запросов")
+
+        for query_hash in due:
+            hh_params, users = groups[query_hash]
+            vacancies = await self._check_timed(query_hash, hh_params, users) if not blocking_breaker() else None
+            if vacancies is None or blocking_breaker():
+                # Сбой запроса (None) - не нулевая отдача: не снижаем частоту, повторим через минимальный интервал
+                self.poller.defer(query_hash)
+            else:
+                new_count = self.poller.record(
+                    query_hash, [vacancy_int_id(v.get('id')) for v in vacancies if vacancy_int_id(v.get('id'))]
+                )
+                state = self.poller.states[query_hash]
+                logger.debug(f"Запрос {query_hash[:12]}: новых {new_count}, "
+                             f"следующий опрос через {(state.next_due - state.last_polled) / 60:.0f} мин")
+            # Небольшая задержка между запросами к HH
+            await asyncio.sleep(1)
+
+        try:
+            await self.poller.save(due)
+        except Exception as e:
+            logger.error(f"Не удалось сохранить статистику опроса: {e}")
+
+    async def _check_staggered(self):
+        """Тик равномерного режима: группы запросов, чья фаза внутри интервала пришлась на прошедшие минуты"""
+        async with AsyncSessionLocal() as session:
+            rows = await get_profile_repo(session).get_active_profiles()
+
+        groups = self._group_by_query(rows)
+        now = time.time()
+        if self.wheel is None:
+            self.wheel = TimerWheel(self.check_interval, TICK_MINUTES * 60, now)
+
+        # Стабильная фаза каждой группы: нагрузка распределяется по интервалу равномерно
+        for query_hash in list(self.wheel.slot_of):
+            if query_hash not in groups:
+                self.wheel.remove(query_hash)
+        for query_hash in groups:
+            if query_hash not in self.wheel:
+                self.wheel.add(query_hash, phase_offset(query_hash, int(self.wheel.period)))
+
+        # Пропущенные на прошлых тиках группы идут первыми, не дожидаясь следующего оборота колеса
+        due = list(dict.fromkeys(self.overdue_queries + self.wheel.advance(now)))
+        due = [query_hash for query_hash in due if query_hash in groups]
+        self.overdue_queries = []
+        if not due:
+            return
+        logger.info(f"🕐 К опросу {len(due)} из {len(groups)} запросов")
+
+        for index, query_hash in enumerate(due):
+            if blocking_breaker():
+                self.overdue_queries = due[index:]
+                logger.warning(f"⏸ Зависимость недоступна, {len(self.overdue_queries)} запросов "
+                               f"отложено до следующего тика")
+                return
+            hh_params, users = groups[query_hash]
+            await self._check_timed(query_hash, hh_params, users)
+            # Небольшая задержка между запросами к HH
+            await asyncio.sleep(1)
+
+    async def _check_firehose(self, rows: List[Tuple[User, UserProfile]], pass_id: int, pending: List[int]):
+        """Общая выборка свежих вакансий по регионам и локальное сопоставление со всеми фильтрами.
+
+        Выборка сдвигает курсоры регионов, поэтому прерванный проход не может просто
+        продолжиться с пользователя, на котором остановился: новое окно нужно всем.
+        Вместо контрольной точки id выборки сохраняются в проходе; продолжение
+        рассылает их вместе со свежим окном, повторы отсеивают множества отправленных.
+        """
+        if not rows:
+            return
+
+        users = {user.id: user for user, _ in rows}
+        index = self._build_matcher(rows)
+        areas = sorted({profile.hh_params.get('area') for _, profile in rows}, key=lambda a: a or '')
+        logger.info(f"👥 Локальное сопоставление для {len(rows)} пользователей, регионов: {len(areas)}")
+
+        self._ensure_dependencies()
+        fresh = await firehose_service.collect(areas)
+        if pending:
+            async with AsyncSessionLocal() as session:
+                replay = await get_vacancy_repo(session).get_many(pending)
+            logger.info(f"↩️ Повторная рассылка выборки прерванного прохода: {len(replay)} вакансий")
+            fresh_ids = {str(vacancy.get('id')) for vacancy in fresh}
+            fresh.extend(vacancy for vacancy in replay if str(vacancy.get('id')) not in fresh_ids)
+        async with AsyncSessionLocal() as session:
+            await get_pass_repo(session).save_batch(
+                pass_id, [key for key in map(vacancy_int_id, (v.get('id') for v in fresh)) if key is not None]
+            )
+        per_user = index.match_all(fresh)
+        logger.info(f"🌊 Свежих вакансий: {len(fresh)}, получателей: {len(per_user)}")
+        await self._preload_exclusions([users[user_key] for user_key in per_user])
 
+        for user_key in sorted(per_user):
+            self._ensure_dependencies()
+            user = users[user_key]
+            try:
+                with tracer.span('user', 'scheduler', user_id=user.id, vacancies=len(per_user[user_key])):
+                    await self._dispatch_new_vacancies(user, per_user[user_key])
+            except Exception as e:
+                logger.error(f"❌ Ошибка при отправке вакансий пользователю {user.id}: {e}")
+
+    def _build_matcher(self, rows: List[Tuple[User, UserProfile]]):
+        """Индекс фильтров для локального сопоставления"""
+        profiles = [(user.id, profile.hh_params) for user, profile in rows]
+        if config.MATCHER_BACKEND == 'numpy':
+            from src.services.batch_matcher import BatchMatcher
+            return BatchMatcher.build(profiles)
+        return MatchIndex.build(profiles)
+
+    @tracer.traced('user_check', 'scheduler')
     async def check_new_vacancies_for_user(self, session, user: User):
         """Проверка новых вакансий для конкретного пользователя"""
         logger.info(f"🔍 Проверка вакансий для пользователя {user.id} (Telegram: {user.telegram_id})")
 
-        # Получаем фильтры пользователя
-        repo = FilterRepository(session)
-        filters = await repo.get_user_filters(user.telegram_id)
-        logger.info(f"🔍 Фильтры пользователя {user.id} (filters: {filters})")
-        if not filters:
+        profile = await get_profile_repo(session).get_profile(user.telegram_id)
+        if not profile:
             logger.debug(f"Пользователь {user.id} не имеет настроенных фильтров, пропускаем")
             return
 
-        # Преобразуем фильтры в параметры HH API
-        params = await filter_service.to_hh_params(filters)
+        await self._check_query_group(profile.hh_params, [user])
 
-        # Для автоматического поиска ищем только самые свежие вакансии
-        # Ищем за последние 24 часа
-        from_date = datetime.now() - timedelta(hours=24)
-        params['date_from'] = from_date.strftime('%Y-%m-%d')
-        params['order_by'] = 'publication_time'
-        params['per_page'] = 10  # Ограничиваем количество для уведомлений
+    def request_user_check(self, telegram_id: int):
+        """Проверить вакансии пользователя вскоре после изменения фильтров.
 
-        logger.info(f"🔎 Автопоиск для пользователя {user.id} с параметрами: {params}")
+        Повторные правки в течение FILTER_CHECK_DELAY откладывают проверку, так что
+        серия изменений дает один запрос к HH, а не внеочередной полный проход.
+        """
+        if not self.scheduler.running:
+            return
 
+        pending = self._user_checks.get(telegram_id)
+        if pending and not pending.done():
+            pending.cancel()
+        self._user_checks[telegram_id] = asyncio.create_task(self._debounced_user_check(telegram_id))
+
+    async def _debounced_user_check(self, telegram_id: int):
         try:
-            # Ищем вакансии
-            vacancies = await hh_client.search_vacancies(**params)
+            await asyncio.sleep(config.FILTER_CHECK_DELAY)
+        except asyncio.CancelledError:
+            return
+        # Начатую проверку новые правки уже не отменяют
+        self._user_checks.pop(telegram_id, None)
 
-            if not vacancies:
-                logger.debug(f"Для пользователя {user.id} новых вакансий не найдено")
-                return
+        try:
+            with tracer.span('filter_change_check', 'scheduler', telegram_id=telegram_id):
+                await self._check_user_by_telegram_id(telegram_id)
+        except Exception as e:
+            logger.error(f"❌ Ошибка проверки вакансий после изменения фильтров {telegram_id}: {e}")
 
-            # Фильтруем уже отправленные вакансии
-            new_vacancies = []
-            user_processed = self.processed_vacancies.get(user.id, set())
+    async def _check_user_by_telegram_id(self, telegram_id: int):
+        async with AsyncSessionLocal() as session:
+            stmt = select(User).where(User.telegram_id == telegram_id, User.is_active == True)
+            user = (await session.execute(stmt)).scalar_one_or_none()
+            if user:
+                await self.check_new_vacancies_for_user(session, user)
 
-            for vacancy in vacancies:
-                vacancy_id = vacancy.get('id')
-                if vacancy_id and vacancy_id not in user_processed:
-                    new_vacancies.append(vacancy)
+    def _build_auto_search_params(self, hh_params: Dict) -> Dict:
+        """Параметры автопоиска: только самые свежие вакансии"""
+        # Ищем за последние 24 часа
+        from_date = datetime.now() - timedelta(hours=24)
+        return with_paging(
+            hh_params,
+            date_from=from_date.strftime('%Y-%m-%d'),
+            order_by='publication_time',
+            per_page=10  # Ограничиваем количество для уведомлений
+        )
 
-            if not new_vacancies:
-                logger.debug(f"Для пользователя {user.id} все вакансии уже были отправлены")
-                return
+    async def _check_query_group(self, hh_params: Dict, users: List[User]) -> Optional[List[Dict]]:
+        """Один запрос к HH на группу пользователей с одинаковыми фильтрами; None при ошибке запроса"""
+        params = self._build_auto_search_params(hh_params)
+        logger.info(f"🔎 Автопоиск для {len(users)} пользователей с параметрами: {params}")
+
+        with tracer.span('query_group', 'scheduler', users=len(users), text=params.get('text')) as span:
+            vacancies = await self._run_query_group(params, users)
+            if span is not None:
+                span.args['vacancies'] = None if vacancies is None else len(vacancies)
+        return vacancies
+
+    async def _check_timed(self, query_hash: str, hh_params: Dict, users: List[User]) -> Optional[List[Dict]]:
+        """Проверка группы с запоминанием времени и длительности"""
+        started = time.perf_counter()
+        vacancies = await self._check_query_group(hh_params, users)
+        self.query_timings[query_hash] = QueryTiming(
+            time.time(), time.perf_counter() - started, None if vacancies is None else len(vacancies)
+        )
+        return vacancies
 
-            # Отправляем уведомления о новых вакансиях
-            await self.send_vacancy_notifications(user.telegram_id, new_vacancies)
+    async def _run_query_group(self, params: Dict, users: List[User]) -> Optional[List[Dict]]:
+        try:
+            vacancies = await vacancy_providers.search(params)
+        except Exception as e:
+            logger.error(f"Ошибка при поиске вакансий: {e}")
+            return None
 
-            # Сохраняем ID отправленных вакансий
-            for vacancy in new_vacancies:
-                vacancy_id = vacancy.get('id')
-                if vacancy_id:
-                    user_processed.add(vacancy_id)
+        if not vacancies:
+            logger.debug("Новых вакансий по запросу не найдено")
+            return vacancies
+
+        # Хранилище обновляется только изменившимися вакансиями
+        try:
+            async with AsyncSessionLocal() as session:
+                await get_vacancy_repo(session).ingest(vacancies)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения результатов запроса: {e}")
 
-            # Обновляем список обработанных вакансий
-            self.processed_vacancies[user.id] = user_processed
+        # В хранилище - вся выдача, пользователям - только прошедшие минимальную зарплату
+        vacancies = filter_by_salary(params, vacancies)
+        await self._preload_exclusions(users)
 
-            logger.info(f"✅ Пользователю {user.id} отправлено {len(new_vacancies)} новых вакансий")
+        for user in users:
+            try:
+                with tracer.span('user', 'scheduler', user_id=user.id):
+                    await self._dispatch_new_vacancies(user, vacancies)
+            except Exception as e:
+                logger.error(f"❌ Ошибка при отправке вакансий пользователю {user.id}: {e}")
+        return vacancies
 
+    async def _preload_exclusions(self, users: List[User]):
+        """Скрытые вакансии всех получателей одним запросом, а не по запросу на пользователя"""
+        try:
+            await exclusion_service.preload(user.telegram_id for user in users)
         except Exception as e:
-            logger.error(f"Ошибка при поиске вакансий для пользователя {user.id}: {e}")
+            # Не страшно: exclude догрузит недостающих по одному
+            logger.warning(f"Не удалось загрузить скрытые вакансии получателей: {e}")
+
+    async def _dispatch_new_vacancies(self, user: User, vacancies: List[Dict]):
+        """Отправка пользователю вакансий, которые он еще не видел.
+
+        Проверка после правки фильтров может идти одновременно с проходом, а отправленными
+        вакансии отмечаются только после отправки: без очереди на пользователя обе
+        проверки отправили бы одни и те же вакансии.
+        """
+        async with self._dispatch_locks.setdefault(user.id, asyncio.Lock()):
+            await self._send_new_vacancies(user, vacancies)
+
+    async def _send_new_vacancies(self, user: User, vacancies: List[Dict]):
+        # Фильтруем уже отправленные вакансии
+        user_processed = self.processed_vacancies.setdefault(user.id, IdSet())
+        if user.salary_alerts:
+            await self._notify_salary_increases(user, vacancies)
+        else:
+            self.notified_salaries.pop(user.id, None)
+
+        new_vacancies = [
+            vacancy for vacancy in vacancies
+            if vacancy_int_id(vacancy.get('id')) is not None and vacancy['id'] not in user_processed
+        ]
+        # И скрытые пользователем
+        new_vacancies = await exclusion_service.exclude(user.telegram_id, new_vacancies)
+
+        if not new_vacancies:
+            logger.debug(f"Для пользователя {user.id} все вакансии уже были отправлены")
+            return
+
+        # Отправляем уведомления о новых вакансиях
+        await self.send_vacancy_notifications(user.telegram_id, new_vacancies)
+
+        # Сохраняем ID отправленных вакансий
+        user_processed.update(vacancy_int_id(vacancy['id']) for vacancy in new_vacancies)
+        if user.salary_alerts:
+            self._remember_salaries(user.id, new_vacancies)
+
+        logger.info(f"✅ Пользователю {user.id} отправлено {len(new_vacancies)} новых вакансий")
+
+    def _remember_salaries(self, user_id: int, vacancies: List[Dict]):
+        """Запомнить зарплаты отправленных вакансий; старые записи вытесняются"""
+        levels = self.notified_salaries.setdefault(user_id, {})
+        for vacancy in vacancies:
+            levels[vacancy_int_id(vacancy['id'])] = vacancy_salary_level(vacancy) or 0
+        while len(levels) > SALARY_ALERTS_TRACKED:
+            del levels[next(iter(levels))]
+
+    @tracer.traced('notify', 'telegram')
+    async def _notify_salary_increases(self, user: User, vacancies: List[Dict]):
+        """Сообщить о росте зарплаты в уже отправленных пользователю вакансиях.
+
+        Сравнение идет с зарплатой, которую видел сам пользователь, а не с версией
+        в общем хранилище: туда же пишут интерактивный поиск и firehose.
+        """
+        levels = self.notified_salaries.get(user.id)
+        if not levels:
+            return
+
+        increases = []
+        for vacancy in vacancies:
+            key = vacancy_int_id(vacancy.get('id'))
+            if key not in levels:
+                continue
+            increase = salary_increase(vacancy, levels[key] or None)
+            if increase:
+                # Запоминаем до отправки, чтобы параллельная проверка не повторила уведомление
+                levels[key] = increase.new_level
+                increases.append(increase)
+        if not increases:
+            return
+
+        for increase in increases[:3]:
+            old = f"{increase.old_level:,}".replace(',', ' ') + ' ₽' if increase.old_level else 'не указана'
+            text = (
+                f"📈 *Зарплата выросла:* {old} → {increase.new_level:,} ₽ на руки\n\n".replace(',', ' ')
+                + hh_client.format_vacancy_message(increase.vacancy)
+            )
+            try:
+                await self._send_message(chat_id=user.telegram_id, text=text, parse_mode='Markdown',
+                                         disable_web_page_preview=True)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка уведомления о росте зарплаты пользователю {user.id}: {e}")
+        logger.info(f"📈 Пользователю {user.id} отправлено уведомлений о росте зарплаты: {len(increases[:3])}")
 
     async def send_vacancy_notifications(self, chat_id: int, vacancies: List[Dict]):
         """Отправка уведомлений о новых вакансиях"""
@@ -151,7 +740,7 @@ class SchedulerService:
             return
 
         # Отправляем сообщение о начале поиска
-        await self.bot.send_message(
+        await self._send_message(
             chat_id=chat_id,
             text=f"🔔 *Найдено {len(vacancies)} новых вакансий!*\n\n"
                  f"Вот самые свежие из них:",
@@ -161,7 +750,8 @@ class SchedulerService:
         for i, vacancy in enumerate(vacancies[:3]):  # Ограничиваем 3 вакансиями за раз
             try:
                 # Форматируем сообщение
-                message = hh_client.format_vacancy_message(vacancy)
+                with tracer.span('render', 'render', vacancy_id=vacancy.get('id')):
+                    message = hh_client.format_vacancy_message(vacancy)
 
                 # Добавляем заголовок
                 notification_text = (
@@ -170,7 +760,7 @@ class SchedulerService:
                 )
 
                 # Отправляем сообщение
-                await self.bot.send_message(
+                await self._send_message(
                     chat_id=chat_id,
                     text=notification_text,
                     parse_mode='Markdown',
@@ -180,12 +770,14 @@ class SchedulerService:
                 # Задержка между сообщениями
                 await asyncio.sleep(0.5)
 
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 logger.error(f"Ошибка при отправке уведомления: {e}")
 
         # Если вакансий больше 3, предлагаем использовать ручной поиск
         if len(vacancies) > 3:
-            await self.bot.send_message(
+            await self._send_message(
                 chat_id=chat_id,
                 text=f"📊 *Всего найдено {len(vacancies)} новых вакансий.*\n"
                      f"Используйте кнопку *🔍 Поиск вакансий* в главном меню, "
@@ -193,15 +785,40 @@ class SchedulerService:
                 parse_mode='Markdown'
             )
 
+    async def _send_message(self, **kwargs):
+        """Отправка через предохранитель Telegram: сетевые сбои и флуд-контроль считаются отказами"""
+        telegram_breaker.check()
+        try:
+            with tracer.span('telegram.send_message', 'telegram', chat_id=kwargs.get('chat_id')):
+                message = await self.bot.send_message(**kwargs)
+        except (BadRequest, Forbidden):
+            # Ошибка конкретного сообщения или чата, сам Telegram доступен
+            telegram_breaker.record_success()
+            raise
+        except (NetworkError, RetryAfter):
+            telegram_breaker.record_failure()
+            raise
+        except BaseException:
+            telegram_breaker.release()
+            raise
+        telegram_breaker.record_success()
+        return message
+
+    def backlog(self) -> Dict[str, int]:
+        """Отложенная работа: проверки после правки фильтров, ждущие своей очереди"""
+        return {'pending_user_checks': sum(1 for task in self._user_checks.values() if not task.done())}
+
     async def clear_user_history(self, user_id: int):
         """Очистка истории отправленных вакансий для пользователя"""
         if user_id in self.processed_vacancies:
             self.processed_vacancies[user_id].clear()
+            self.notified_salaries.pop(user_id, None)
             logger.info(f"🧹 История вакансий очищена для пользователя {user_id}")
 
     async def get_scheduler_status(self) -> Dict:
         """Получение статуса планировщика"""
         jobs = self.scheduler.get_jobs()
+        auto_search = self.scheduler.get_job('auto_search')
 
         # Получаем статистику по пользователям
         async with AsyncSessionLocal() as session:
@@ -209,22 +826,21 @@ class SchedulerService:
             result = await session.execute(stmt)
             active_users = result.scalars().all()
 
-            # Получаем пользователей с настройками фильтров
-            users_with_filters = []
-            for user in active_users:
-                stmt = select(UserFilter).where(UserFilter.user_id == user.id)
-                filter_result = await session.execute(stmt)
-                if filter_result.scalars().first():
-                    users_with_filters.append(user.id)
+            # Пользователи с настроенными фильтрами (по профилям, одним запросом)
+            users_with_filters = await get_profile_repo(session).count_active_profiles()
 
         return {
             'running': self.scheduler.running,
             'job_count': len(jobs),
-            'next_run': jobs[0].next_run_time if jobs else None,
+            'next_run': auto_search.next_run_time if auto_search else None,
             'check_interval': self.check_interval,
+            'mode': self.mode,
             'users_tracked': len(self.processed_vacancies),
             'active_users': len(active_users),
-            'users_with_filters': len(users_with_filters)
+            'users_with_filters': users_with_filters,
+            'hh_transfer': hh_client.transfer_stats(),
+            'breakers': breaker_states(),
+            'snapshot_saved_at': self.snapshot_saved_at
         }
 
 
@@ -0,0 +1,95 @@
+"""
+Снимок состояния планировщика для быстрого старта после перезапуска.
+
+Без снимка первый проход после деплоя - самый дорогой: множества отправленных
+вакансий пусты (пользователям уходят повторы), кэш валидаторов HH пуст (полные
+ответы вместо 304), курсоры firehose сброшены на сутки назад.
+
+Формат файла: заголовок (сигнатура, версия формата, CRC32 и длина данных) и
+сжатые zlib данные - последовательность именованных разделов. Множества id
+хранятся сырыми массивами int64, остальное - JSON. Неизвестные разделы при
+чтении пропускаются; снимок другой версии или с неверной контрольной суммой
+отбрасывается целиком, и старт идет как без снимка.
+"""
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Tuple
+
+MAGIC = b'JBSS'
+SNAPSHOT_VERSION = 1
+# Сигнатура, версия, зарезервировано, CRC32 сжатых данных, их длина, время записи (unix)
+HEADER = struct.Struct('<4sHHIId')
+SECTION_HEADER = struct.Struct('<HI')  # длина имени, длина данных
+
+
+class SnapshotError(ValueError):
+    """Снимок поврежден или записан несовместимой версией"""
+
+
+def encode_snapshot(sections: Dict[str, bytes], created_at: float = None) -> bytes:
+    """Разделы в файл снимка"""
+    parts = []
+    for name, data in sections.items():
+        encoded_name = name.encode('utf-8')
+        parts.append(SECTION_HEADER.pack(len(encoded_name), len(data)))
+        parts.append(encoded_name)
+        parts.append(data)
+    payload = zlib.compress(b''.join(parts), 1)
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, 0, zlib.crc32(payload),
+                         len(payload), created_at or time.time())
+    return header + payload
+
+
+def decode_snapshot(data: bytes) -> Tuple[Dict[str, bytes], float]:
+    """Файл снимка в (разделы, время записи); SnapshotError, если файл не годится"""
+    if len(data) < HEADER.size:
+        raise SnapshotError("файл короче заголовка")
+    magic, version, _, crc, length, created_at = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("не файл снимка")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"версия формата {version}, ожидается {SNAPSHOT_VERSION}")
+    payload = data[HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise SnapshotError("не сходится контрольная сумма")
+
+    try:
+        raw = zlib.decompress(payload)
+    except zlib.error as e:
+        raise SnapshotError(f"не распаковывается: {e}")
+
+    sections = {}
+    position = 0
+    while position < len(raw):
+        if position + SECTION_HEADER.size > len(raw):
+            raise SnapshotError("обрезан заголовок раздела")
+        name_length, data_length = SECTION_HEADER.unpack_from(raw, position)
+        position += SECTION_HEADER.size
+        end = position + name_length + data_length
+        if end > len(raw):
+            raise SnapshotError("обрезан раздел")
+        name = raw[position:position + name_length].decode('utf-8')
+        sections[name] = raw[position + name_length:end]
+        position = end
+    return sections, created_at
+
+
+def write_snapshot(path: str, sections: Dict[str, bytes]) -> int:
+    """Атомарно записать снимок: при сбое посреди записи остается прежний файл. Возвращает размер"""
+    data = encode_snapshot(sections)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, bytes], float]:
+    """Прочитать снимок; FileNotFoundError, если его нет, SnapshotError, если он не годится"""
+    with open(path, 'rb') as f:
+        return decode_snapshot(f.read())
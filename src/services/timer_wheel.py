@@ -0,0 +1,58 @@
+"""
+Циклическое колесо таймеров для равномерного распределения проверок по интервалу
+"""
+import zlib
+from typing import Dict, List, Set
+
+
+def phase_offset(key: str, period_seconds: int) -> int:
+    """Стабильное смещение ключа внутри периода: не меняется между перезапусками"""
+    return zlib.crc32(key.encode('utf-8')) % max(1, period_seconds)
+
+
+class TimerWheel:
+    """Колесо из slots ячеек по slot_seconds секунд; каждый ключ срабатывает раз за оборот в своей ячейке.
+
+    Ячейки привязаны к абсолютному времени (номер ячейки - время / slot_seconds
+    по модулю числа ячеек), поэтому фаза ключа сохраняется между перезапусками.
+    """
+
+    def __init__(self, slots: int, slot_seconds: float, now: float):
+        self.slots: List[Set[str]] = [set() for _ in range(max(1, slots))]
+        self.slot_seconds = slot_seconds
+        self.slot_of: Dict[str, int] = {}
+        # Последняя обработанная ячейка: после старта срабатывают только будущие ячейки
+        self.position = int(now // slot_seconds)
+
+    @property
+    def period(self) -> float:
+        return len(self.slots) * self.slot_seconds
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.slot_of
+
+    def add(self, key: str, offset_seconds: float):
+        """Поместить ключ в ячейку, соответствующую смещению от начала оборота"""
+        self.remove(key)
+        slot = int(offset_seconds // self.slot_seconds) % len(self.slots)
+        self.slots[slot].add(key)
+        self.slot_of[key] = slot
+
+    def remove(self, key: str):
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            self.slots[slot].discard(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Ключи всех ячеек, пройденных с прошлого вызова (не больше одного оборота)"""
+        target = int(now // self.slot_seconds)
+        start = max(self.position + 1, target - len(self.slots) + 1)
+
+        due = []
+        for position in range(start, target + 1):
+            due.extend(sorted(self.slots[position % len(self.slots)]))
+        self.position = max(self.position, target)
+        return due
@@ -0,0 +1,176 @@
+"""
+Трассировка проходов планировщика.
+
+Спан - замер одного участка работы: проход, группа запроса, пользователь,
+запрос к HH, запрос к БД, форматирование и отправка сообщения. Текущий спан
+хранится в contextvars, поэтому вложенные спаны (в том числе в задачах,
+созданных внутри спана) получают trace id и родителя без явной передачи.
+
+События пишутся в Chrome Trace Event Format (JSON-массив, закрывающая скобка
+необязательна) и открываются офлайн в chrome://tracing или ui.perfetto.dev.
+Каждая трасса выводится отдельной дорожкой.
+"""
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, List, Optional
+from logger import get_logger
+from config import config
+
+logger = get_logger(__name__)
+
+# Сколько событий копить до записи в файл (трасса записывается и по завершении)
+FLUSH_EVENTS = 500
+
+
+@dataclass
+class Span:
+    name: str
+    cat: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    lane: int
+    started: float
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    """Спаны на contextvars с экспортом в файл трассировки"""
+
+    def __init__(self, enabled: bool = None, trace_dir: str = None):
+        self.enabled = config.TRACE_ENABLED if enabled is None else enabled
+        self.trace_dir = trace_dir or config.TRACE_DIR
+        self.path: Optional[str] = None
+        self.pid = os.getpid()
+        self._events: List[Dict] = []
+        self._next_lane = 1
+        # Перевод perf_counter во время эпохи (микросекунды) для меток событий
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def _ts(self, perf: float) -> int:
+        return int((perf + self._epoch_offset) * 1_000_000)
+
+    def _start(self, name: str, cat: str, args: Dict) -> Span:
+        parent = _current_span.get()
+        if parent is None:
+            lane = self._next_lane
+            self._next_lane += 1
+            trace_id = uuid.uuid4().hex[:16]
+            self._events.append({
+                'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': lane,
+                'args': {'name': f"{name} {trace_id}"},
+            })
+        else:
+            lane, trace_id = parent.lane, parent.trace_id
+        return Span(name, cat, trace_id, uuid.uuid4().hex[:8],
+                    parent.span_id if parent else None, lane, time.perf_counter(), args)
+
+    def _finish(self, span: Span, ended: float = None):
+        ended = time.perf_counter() if ended is None else ended
+        self._events.append({
+            'name': span.name, 'cat': span.cat, 'ph': 'X',
+            'ts': self._ts(span.started), 'dur': max(0, int((ended - span.started) * 1_000_000)),
+            'pid': self.pid, 'tid': span.lane,
+            'args': {'trace_id': span.trace_id, 'span_id': span.span_id,
+                     'parent_id': span.parent_id, **span.args},
+        })
+        if span.parent_id is None or len(self._events) >= FLUSH_EVENTS:
+            self.flush()
+
+    @contextmanager
+    def span(self, name: str, cat: str = 'app', **args):
+        """Замерить участок; атрибуты можно дополнять через span.args"""
+        if not self.enabled:
+            yield None
+            return
+
+        span = self._start(name, cat, args)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.args['error'] = repr(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def traced(self, name: str = None, cat: str = 'app'):
+        """Декоратор корутины: вызов целиком - один спан"""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                with self.span(span_name, cat):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name: str, cat: str, started: float, ended: float, **args):
+        """Спан по готовым замерам perf_counter (для синхронных колбэков вроде событий SQLAlchemy).
+
+        Записывается только внутри трассы: одиночные запросы вне проходов не интересны.
+        """
+        if not self.enabled or _current_span.get() is None:
+            return
+        span = self._start(name, cat, args)
+        span.started = started
+        self._finish(span, ended)
+
+    def flush(self):
+        """Дописать накопленные события в файл трассировки"""
+        if not self._events:
+            return
+        events, self._events = self._events, []
+        try:
+            if self.path is None:
+                os.makedirs(self.trace_dir, exist_ok=True)
+                self.path = os.path.join(
+                    self.trace_dir, f"trace-{datetime.now():%Y%m%d-%H%M%S}-{self.pid}.json"
+                )
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    f.write('[\n')
+                logger.info(f"🧵 Трассировка пишется в {self.path}")
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(event, ensure_ascii=False, default=str) + ',\n'
+                                for event in events))
+        except OSError as e:
+            logger.error(f"Не удалось записать трассировку: {e}")
+
+
+def instrument_engine(engine):
+    """Спаны для SQL-запросов движка SQLAlchemy"""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('trace_started', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['trace_started'].pop()
+        tracer.record('db', 'db', started, time.perf_counter(),
+                      statement=' '.join(statement.split())[:200])
+
+
+# Синглтон
+tracer = Tracer()
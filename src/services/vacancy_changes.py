@@ -0,0 +1,63 @@
+"""
+Определение изменений вакансий по хэшу содержимого.
+
+HH часто переопубликовывает вакансии и слегка их правит. Хэш считается только по
+полям, которые бот показывает и по которым сопоставляет фильтры; дата публикации
+в него не входит, поэтому переопубликованная без правок вакансия считается
+неизменной: запись в БД и повторное форматирование пропускаются.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional
+from src.services.salary import normalize_salary
+
+
+def content_fields(vacancy: Dict) -> list:
+    """Поля вакансии, изменение которых имеет значение для пользователя"""
+    salary = vacancy.get('salary') or {}
+    snippet = vacancy.get('snippet') or {}
+    area = vacancy.get('area') or {}
+    return [
+        vacancy.get('name'),
+        (vacancy.get('employer') or {}).get('name'),
+        [salary.get('from'), salary.get('to'), salary.get('currency'), salary.get('gross')],
+        [area.get('id'), area.get('name')],
+        (vacancy.get('experience') or {}).get('id'),
+        (vacancy.get('schedule') or {}).get('id'),
+        (vacancy.get('employment') or {}).get('id'),
+        sorted(skill.get('name', '') for skill in vacancy.get('key_skills') or []),
+        [snippet.get('requirement'), snippet.get('responsibility')],
+        vacancy.get('alternate_url'),
+    ]
+
+
+def content_hash(vacancy: Dict) -> str:
+    """Стабильный хэш содержимого вакансии (32 hex-символа)"""
+    payload = json.dumps(content_fields(vacancy), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def salary_level(salary_from_rub: Optional[int], salary_to_rub: Optional[int]) -> Optional[int]:
+    """Уровень зарплаты для сравнения: нижняя граница, а если ее нет - верхняя"""
+    return salary_from_rub or salary_to_rub
+
+
+@dataclass
+class SalaryIncrease:
+    vacancy: Dict
+    old_level: Optional[int]  # None - раньше зарплата не была указана
+    new_level: int
+
+
+def vacancy_salary_level(vacancy: Dict) -> Optional[int]:
+    """Уровень зарплаты вакансии в рублях на руки"""
+    return salary_level(*normalize_salary(vacancy))
+
+
+def salary_increase(vacancy: Dict, old_level: Optional[int]) -> Optional[SalaryIncrease]:
+    """Рост зарплаты (или ее появление) относительно уровня, который пользователь уже видел"""
+    new_level = vacancy_salary_level(vacancy)
+    if new_level and (old_level is None or new_level > old_level):
+        return SalaryIncrease(vacancy, old_level, new_level)
+    return None
@@ -11,7 +11,7 @@ Base = declarative_base()
 # Создаем асинхронный движок
 engine = create_async_engine(
     config.DATABASE_URL,
-    echo=True,
+    echo=config.DB_ECHO,
     future=True
 )
 
@@ -29,8 +29,137 @@ async def init_db():
     from src.storage import models  # noqa: F401
 
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("✅ База данных инициализирована")
+        created = await conn.run_sync(_ensure_schema)
+    if created:
+        logger.info("✅ База данных инициализирована")
+    else:
+        logger.debug("Схема базы данных актуальна, создание таблиц пропущено")
+
+
+def _ensure_schema(connection) -> bool:
+    """Создать таблицы и полнотекстовый индекс, если версия схемы в БД отличается от текущей"""
+    from sqlalchemy import inspect, select, delete
+    from src.storage.models import SCHEMA_VERSION, SchemaVersion
+
+    if inspect(connection).has_table(SchemaVersion.__tablename__):
+        version = connection.execute(select(SchemaVersion.version)).scalar()
+        if version == SCHEMA_VERSION:
+            return False
+
+    from src.storage.fulltext import setup_fulltext
+
+    Base.metadata.create_all(connection)
+    _add_missing_columns(connection)
+    _upgrade_integer_columns(connection)
+    _fill_salary_columns(connection)
+    setup_fulltext(connection)
+    connection.execute(delete(SchemaVersion))
+    connection.execute(SchemaVersion.__table__.insert().values(version=SCHEMA_VERSION))
+    return True
+
+
+def _add_missing_columns(connection) -> None:
+    """Добавить в существующие таблицы новые колонки моделей (create_all их не добавляет).
+
+    Подходит только для колонок, допускающих NULL; прочие изменения схемы - вручную.
+    """
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+            ))
+            logger.info(f"Добавлена колонка {table.name}.{column.name}")
+
+
+def _upgrade_integer_columns(connection) -> None:
+    """Перевести в целые колонки, которые в модели стали целыми, а в БД остались строковыми.
+
+    PostgreSQL меняет тип на месте (нечисловые значения становятся NULL). SQLite тип
+    колонки менять не умеет, поэтому таблица пересоздается с копированием строк;
+    id строк сохраняются, так что полнотекстовый индекс остается верным.
+    """
+    from sqlalchemy import Integer, String, inspect, text
+
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        reflected = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        stale = [
+            column for column in table.columns
+            if isinstance(column.type, Integer) and isinstance(reflected.get(column.name), String)
+        ]
+        if not stale:
+            continue
+
+        table_name = preparer.format_table(table)
+        if connection.dialect.name == 'postgresql':
+            for column in stale:
+                name = preparer.format_column(column)
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {table_name} ALTER COLUMN {name} TYPE {column_type} "
+                    f"USING CASE WHEN {name} ~ '^[0-9]+$' THEN {name}::{column_type} END"
+                ))
+        elif connection.dialect.name == 'sqlite':
+            old_name = f"{table.name}_before_upgrade"
+            connection.execute(text(f"ALTER TABLE {table_name} RENAME TO {preparer.quote(old_name)}"))
+            # Индексы переезжают вместе с таблицей: освобождаем их имена для новой
+            for index in inspector.get_indexes(old_name):
+                if index.get('name'):
+                    connection.execute(text(f"DROP INDEX {preparer.quote(index['name'])}"))
+            table.create(connection)
+            columns = [column for column in table.columns if column.name in reflected]
+            targets = ', '.join(preparer.format_column(column) for column in columns)
+            sources = ', '.join(
+                f"CAST({preparer.format_column(column)} AS INTEGER)" if column in stale
+                else preparer.format_column(column)
+                for column in columns
+            )
+            connection.execute(text(
+                f"INSERT INTO {table_name} ({targets}) SELECT {sources} FROM {preparer.quote(old_name)}"
+            ))
+            connection.execute(text(f"DROP TABLE {preparer.quote(old_name)}"))
+        else:
+            logger.warning(f"Колонки {table.name}: {', '.join(c.name for c in stale)} нужно перевести в целые вручную")
+            continue
+        logger.info(f"Колонки {table.name}: {', '.join(c.name for c in stale)} переведены в целые")
+
+
+def _fill_salary_columns(connection) -> None:
+    """Посчитать зарплату в рублях на руки для вакансий, сохраненных до появления этих колонок.
+
+    Без нее локальный поиск и фильтр по минимальной зарплате отбрасывали бы такие вакансии.
+    """
+    from sqlalchemy import bindparam, select, update
+    from src.storage.models import Vacancy
+    from src.services.salary import normalize_salary
+
+    stmt = select(Vacancy.id, Vacancy.raw_data).where(
+        Vacancy.salary.isnot(None), Vacancy.salary_from_rub.is_(None), Vacancy.salary_to_rub.is_(None)
+    )
+    rows = []
+    for row_id, raw_data in connection.execute(stmt):
+        salary_from, salary_to = normalize_salary(raw_data or {})
+        if salary_from or salary_to:
+            rows.append({'row_id': row_id, 'from_rub': salary_from, 'to_rub': salary_to})
+    if not rows:
+        return
+
+    connection.execute(
+        update(Vacancy.__table__)
+        .where(Vacancy.__table__.c.id == bindparam('row_id'))
+        .values(salary_from_rub=bindparam('from_rub'), salary_to_rub=bindparam('to_rub')),
+        rows
+    )
+    logger.info(f"Зарплата в рублях посчитана для {len(rows)} сохраненных вакансий")
 
 
 async def get_session() -> AsyncSession:
@@ -0,0 +1,82 @@
+"""
+Полнотекстовый индекс вакансий: FTS5 в SQLite, GIN по tsvector в PostgreSQL
+"""
+from typing import Iterable
+from sqlalchemy import text
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5(
+        title, employer_name, skills,
+        content='vacancies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_ai AFTER INSERT ON vacancies BEGIN
+        INSERT INTO vacancies_fts(rowid, title, employer_name, skills)
+        VALUES (new.id, new.title, new.employer_name, new.skills);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_ad AFTER DELETE ON vacancies BEGIN
+        INSERT INTO vacancies_fts(vacancies_fts, rowid, title, employer_name, skills)
+        VALUES ('delete', old.id, old.title, old.employer_name, old.skills);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS vacancies_fts_au AFTER UPDATE OF title, employer_name, skills ON vacancies BEGIN
+        INSERT INTO vacancies_fts(vacancies_fts, rowid, title, employer_name, skills)
+        VALUES ('delete', old.id, old.title, old.employer_name, old.skills);
+        INSERT INTO vacancies_fts(rowid, title, employer_name, skills)
+        VALUES (new.id, new.title, new.employer_name, new.skills);
+    END
+    """,
+]
+
+# Выражение индекса и запроса должно совпадать, иначе PostgreSQL не использует GIN
+POSTGRES_VECTOR = (
+    "to_tsvector('russian', coalesce(title, '') || ' ' || "
+    "coalesce(employer_name, '') || ' ' || coalesce(skills, ''))"
+)
+# Поиск только по названию (search_field=name), как столбец title в FTS5
+POSTGRES_TITLE_VECTOR = "to_tsvector('russian', coalesce(title, ''))"
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_vacancies_search ON vacancies USING GIN ({POSTGRES_VECTOR})",
+    f"CREATE INDEX IF NOT EXISTS ix_vacancies_search_title ON vacancies USING GIN ({POSTGRES_TITLE_VECTOR})",
+]
+
+
+def setup_fulltext(connection) -> None:
+    """Создать полнотекстовый индекс для текущей СУБД (вызывается из init_db через run_sync)"""
+    dialect = connection.dialect.name
+    statements = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(dialect)
+    if not statements:
+        logger.warning(f"Полнотекстовый поиск не поддерживается для {dialect}")
+        return
+
+    try:
+        for statement in statements:
+            connection.execute(text(statement))
+    except Exception as e:
+        logger.warning(f"Не удалось создать полнотекстовый индекс: {e}")
+
+
+def sqlite_match_expression(tokens: Iterable[str], title_only: bool) -> str:
+    """Выражение MATCH для FTS5: все токены по префиксу"""
+    terms = ' AND '.join(f'"{token}"*' for token in tokens)
+    return f"title : ({terms})" if title_only else terms
+
+
+def postgres_vector(title_only: bool) -> str:
+    """Выражение tsvector, совпадающее с одним из индексов"""
+    return POSTGRES_TITLE_VECTOR if title_only else POSTGRES_VECTOR
+
+
+def postgres_tsquery(tokens: Iterable[str]) -> str:
+    """Запрос to_tsquery: все токены по префиксу"""
+    return ' & '.join(f"{token}:*" for token in tokens)
@@ -1,8 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, Text, JSON, ForeignKey, Float, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from src.storage.database import Base
 
+# Увеличивать при изменении моделей: init_db пересоздает недостающие таблицы и индексы
+# только при несовпадении версии, иначе запуск обходится без create_all
+SCHEMA_VERSION = 11
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
 
 class User(Base):
     __tablename__ = "users"
@@ -13,6 +22,8 @@ class User(Base):
     username = Column(String(100))
     created_at = Column(DateTime, server_default=func.now())
     is_active = Column(Boolean, default=True)
+    # Уведомления о росте зарплаты в уже отправленных вакансиях; не фильтр поиска
+    salary_alerts = Column(Boolean, default=False)
 
     filters = relationship("UserFilter", back_populates="user", cascade="all, delete-orphan")
 
@@ -30,14 +41,28 @@ class UserFilter(Base):
     user = relationship("User", back_populates="filters")
 
 
+class UserProfile(Base):
+    """Компактный профиль фильтров: одна строка на пользователя с готовыми параметрами HH"""
+    __tablename__ = "user_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, unique=True, nullable=False, index=True)  # telegram_id, как и в user_filters
+    filters = Column(JSON, nullable=False, default=dict)
+    hh_params = Column(JSON, nullable=False, default=dict)
+    query_hash = Column(String(64), nullable=False, index=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 class Vacancy(Base):
     __tablename__ = "vacancies"
 
     id = Column(Integer, primary_key=True, index=True)
-    vacancy_id = Column(String(100), unique=True, index=True)
+    vacancy_id = Column(BigInteger, unique=True, index=True)  # числовой id HH
     title = Column(String(500))
     employer_name = Column(String(200))
     salary = Column(String(100))
+    salary_from_rub = Column(Integer, index=True)  # рубли в месяц на руки
+    salary_to_rub = Column(Integer, index=True)
     area = Column(String(100))
     experience = Column(String(100))
     schedule = Column(String(100))
@@ -47,4 +72,41 @@ class Vacancy(Base):
     url = Column(String(500))
     published_at = Column(DateTime)
     raw_data = Column(JSON)
+    content_hash = Column(String(32))  # хэш полей, которые показываются и сопоставляются
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class SchedulerPass(Base):
+    """Проход планировщика с контрольной точкой для продолжения после сбоя"""
+    __tablename__ = "scheduler_passes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    mode = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="running", index=True)  # running | completed
+    cursor = Column(String(64))  # последний полностью обработанный хэш запроса
+    batch = Column(JSON)  # firehose: id вакансий выборки прохода, которую нужно разослать при продолжении
+    started_at = Column(DateTime, nullable=False)  # UTC
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class QueryPollStats(Base):
+    """История опроса канонического запроса для адаптивного планировщика"""
+    __tablename__ = "query_poll_stats"
+
+    query_hash = Column(String(64), primary_key=True)
+    rate = Column(Float)  # новых вакансий в час (экспоненциальное среднее), NULL - истории еще нет
+    last_polled_at = Column(DateTime)  # UTC
+    seen_ids = Column(JSON, nullable=False, default=list)  # id из последних выдач для подсчета новых
+
+
+class VacancyAction(Base):
+    """Действия пользователя с вакансией: сохранить или скрыть"""
+    __tablename__ = "vacancy_actions"
+    __table_args__ = (UniqueConstraint("user_id", "vacancy_id", "action", name="uq_vacancy_action"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)  # telegram_id
+    vacancy_id = Column(BigInteger, nullable=False)
+    action = Column(String(10), nullable=False)  # save | hide
     created_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,55 @@
+from typing import Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from src.storage.models import VacancyAction
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ActionRepository:
+    """Репозиторий действий пользователей с вакансиями"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_action(self, user_id: int, vacancy_id: int, action: str) -> bool:
+        """Сохранить действие; False, если оно уже было"""
+        stmt = select(VacancyAction.id).where(
+            VacancyAction.user_id == user_id,
+            VacancyAction.vacancy_id == vacancy_id,
+            VacancyAction.action == action
+        )
+        if (await self.session.execute(stmt)).first():
+            return False
+
+        self.session.add(VacancyAction(user_id=user_id, vacancy_id=vacancy_id, action=action))
+        await self.session.commit()
+        logger.debug(f"Пользователь {user_id}: {action} вакансии {vacancy_id}")
+        return True
+
+    async def get_vacancy_ids(self, user_id: int, action: str) -> List[int]:
+        """Id вакансий с данным действием пользователя"""
+        stmt = select(VacancyAction.vacancy_id).where(
+            VacancyAction.user_id == user_id,
+            VacancyAction.action == action
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_vacancy_ids_for_users(self, user_ids: List[int], action: str) -> Dict[int, List[int]]:
+        """Id вакансий с данным действием для группы пользователей одним запросом"""
+        stmt = select(VacancyAction.user_id, VacancyAction.vacancy_id).where(
+            VacancyAction.user_id.in_(user_ids),
+            VacancyAction.action == action
+        )
+        result = await self.session.execute(stmt)
+        ids: Dict[int, List[int]] = {user_id: [] for user_id in user_ids}
+        for user_id, vacancy_id in result.all():
+            ids[user_id].append(vacancy_id)
+        return ids
+
+
+def get_action_repo(session: AsyncSession) -> ActionRepository:
+    """Фабрика для получения репозитория действий с вакансиями"""
+    return ActionRepository(session)
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from src.storage.models import SchedulerPass
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PassRepository:
+    """Репозиторий проходов планировщика и их контрольных точек"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_last_pass(self) -> Optional[SchedulerPass]:
+        """Последний начатый проход"""
+        stmt = select(SchedulerPass).order_by(SchedulerPass.id.desc()).limit(1)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def start_pass(self, mode: str) -> SchedulerPass:
+        """Начать новый проход"""
+        scheduler_pass = SchedulerPass(mode=mode, status='running', started_at=datetime.utcnow())
+        self.session.add(scheduler_pass)
+        await self.session.commit()
+        logger.debug(f"Начат проход планировщика #{scheduler_pass.id} ({mode})")
+        return scheduler_pass
+
+    async def save_cursor(self, pass_id: int, cursor: str) -> None:
+        """Сохранить контрольную точку прохода"""
+        stmt = update(SchedulerPass).where(SchedulerPass.id == pass_id).values(cursor=cursor)
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def save_batch(self, pass_id: int, vacancy_ids: List[int]) -> None:
+        """Запомнить выборку firehose, чтобы продолжение прохода разослало и ее"""
+        stmt = update(SchedulerPass).where(SchedulerPass.id == pass_id).values(batch=vacancy_ids)
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def complete_pass(self, pass_id: int) -> None:
+        """Отметить проход завершенным"""
+        stmt = (
+            update(SchedulerPass)
+            .where(SchedulerPass.id == pass_id)
+            .values(status='completed', finished_at=datetime.utcnow())
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+
+def get_pass_repo(session: AsyncSession) -> PassRepository:
+    """Фабрика для получения репозитория проходов планировщика"""
+    return PassRepository(session)
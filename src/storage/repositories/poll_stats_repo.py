@@ -0,0 +1,47 @@
+from typing import Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from src.storage.models import QueryPollStats
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PollStatsRepository:
+    """Репозиторий статистики опроса запросов"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all(self) -> List[QueryPollStats]:
+        """Статистика всех запросов"""
+        result = await self.session.execute(select(QueryPollStats))
+        return list(result.scalars().all())
+
+    async def save_many(self, stats: List[Dict]) -> None:
+        """Создать или обновить статистику запросов"""
+        if not stats:
+            return
+
+        hashes = [item['query_hash'] for item in stats]
+        result = await self.session.execute(
+            select(QueryPollStats).where(QueryPollStats.query_hash.in_(hashes))
+        )
+        existing = {row.query_hash: row for row in result.scalars().all()}
+
+        for item in stats:
+            row = existing.get(item['query_hash'])
+            if row:
+                row.rate = item['rate']
+                row.last_polled_at = item['last_polled_at']
+                row.seen_ids = item['seen_ids']
+            else:
+                self.session.add(QueryPollStats(**item))
+
+        await self.session.commit()
+        logger.debug(f"Сохранена статистика опроса {len(stats)} запросов")
+
+
+def get_poll_stats_repo(session: AsyncSession) -> PollStatsRepository:
+    """Фабрика для получения репозитория статистики опроса"""
+    return PollStatsRepository(session)
@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from src.storage.models import User, UserFilter, UserProfile
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProfileRepository:
+    """Репозиторий компактных профилей фильтров (user_profiles)"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_profile(self, user_id: int) -> Optional[UserProfile]:
+        """Получить профиль пользователя по telegram_id"""
+        stmt = select(UserProfile).where(UserProfile.user_id == user_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def upsert_profile(self, user_id: int, filters: Dict, hh_params: Dict,
+                             query_hash: str) -> UserProfile:
+        """Создать или обновить профиль пользователя"""
+        profile = await self.get_profile(user_id)
+
+        if profile:
+            profile.filters = filters
+            profile.hh_params = hh_params
+            profile.query_hash = query_hash
+        else:
+            profile = UserProfile(
+                user_id=user_id,
+                filters=filters,
+                hh_params=hh_params,
+                query_hash=query_hash
+            )
+            self.session.add(profile)
+
+        await self.session.commit()
+        logger.debug(f"Профиль пользователя {user_id} обновлен (hash: {query_hash[:12]})")
+        return profile
+
+    async def delete_profile(self, user_id: int) -> None:
+        """Удалить профиль пользователя"""
+        stmt = delete(UserProfile).where(UserProfile.user_id == user_id)
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def get_all_profiles(self) -> List[UserProfile]:
+        """Все профили"""
+        result = await self.session.execute(select(UserProfile))
+        return list(result.scalars().all())
+
+    async def get_active_profiles(self) -> List[Tuple[User, UserProfile]]:
+        """Получить активных пользователей вместе с их профилями одним запросом"""
+        stmt = (
+            select(User, UserProfile)
+            .join(UserProfile, UserProfile.user_id == User.telegram_id)
+            .where(User.is_active == True)
+            .order_by(User.id)
+        )
+        result = await self.session.execute(stmt)
+        return [(user, profile) for user, profile in result.all()]
+
+    async def count_active_profiles(self) -> int:
+        """Количество активных пользователей с настроенными фильтрами"""
+        stmt = (
+            select(func.count(UserProfile.id))
+            .join(User, UserProfile.user_id == User.telegram_id)
+            .where(User.is_active == True)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar() or 0
+
+    async def get_users_without_profile(self) -> List[int]:
+        """Пользователи, у которых есть фильтры в user_filters, но нет профиля"""
+        stmt = (
+            select(UserFilter.user_id)
+            .outerjoin(UserProfile, UserProfile.user_id == UserFilter.user_id)
+            .where(UserProfile.id.is_(None))
+            .distinct()
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+def get_profile_repo(session: AsyncSession) -> ProfileRepository:
+    """Фабрика для получения репозитория профилей"""
+    return ProfileRepository(session)
@@ -0,0 +1,219 @@
+import json
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text, literal_column
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.storage.models import Vacancy
+from src.storage.fulltext import postgres_tsquery, postgres_vector, sqlite_match_expression
+from src.services.salary import normalize_salary
+from src.services.id_sets import vacancy_int_id
+from src.services.vacancy_changes import content_hash
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Строк в одной пачке загрузки (COPY или executemany)
+INGEST_BATCH_SIZE = 5000
+STAGING_TABLE = 'vacancies_staging'
+# Колонки, которые пишет загрузка; id и created_at заполняет база
+INGEST_COLUMNS = [
+    'vacancy_id', 'title', 'employer_name', 'skills', 'salary', 'salary_from_rub', 'salary_to_rub',
+    'area', 'experience', 'schedule', 'employment', 'url', 'published_at', 'raw_data', 'content_hash',
+]
+
+
+def parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """Разбор даты публикации HH ("2024-01-23T14:30:00+0300") в naive UTC"""
+    if not value:
+        return None
+    try:
+        published_at = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
+    return published_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def vacancy_row(vacancy: Dict) -> Dict:
+    """Плоская строка таблицы vacancies из ответа HH API"""
+    salary = vacancy.get('salary') or {}
+    salary_text = None
+    if salary:
+        salary_text = f"{salary.get('from') or ''}-{salary.get('to') or ''} {salary.get('currency') or ''}".strip()
+
+    salary_from_rub, salary_to_rub = normalize_salary(vacancy)
+
+    return {
+        'vacancy_id': vacancy_int_id(vacancy['id']),
+        'title': (vacancy.get('name') or '')[:500],
+        'employer_name': ((vacancy.get('employer') or {}).get('name') or '')[:200],
+        'skills': ', '.join(skill['name'] for skill in vacancy.get('key_skills') or []) or None,
+        'salary': salary_text,
+        'salary_from_rub': salary_from_rub,
+        'salary_to_rub': salary_to_rub,
+        'area': (vacancy.get('area') or {}).get('id'),
+        'experience': (vacancy.get('experience') or {}).get('id'),
+        'schedule': (vacancy.get('schedule') or {}).get('id'),
+        'employment': (vacancy.get('employment') or {}).get('id'),
+        'url': vacancy.get('alternate_url'),
+        'published_at': parse_published_at(vacancy.get('published_at')),
+        'raw_data': vacancy,
+        'content_hash': content_hash(vacancy),
+    }
+
+
+@dataclass
+class IngestResult:
+    """Итог загрузки: новые и изменившиеся вакансии"""
+    new: List[Dict] = field(default_factory=list)
+    changed: List[Dict] = field(default_factory=list)
+    unchanged: int = 0
+
+
+class VacancyRepository:
+    """Репозиторий локального хранилища вакансий"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def upsert_many(self, vacancies: Iterable[Dict]) -> List[Dict]:
+        """Сохранить вакансии, вернуть те, которых раньше не было"""
+        return (await self.ingest(vacancies)).new
+
+    async def ingest(self, vacancies: Iterable[Dict]) -> IngestResult:
+        """Сохранить вакансии пачками, пропуская те, чье содержимое не изменилось.
+
+        PostgreSQL: COPY во временную таблицу и одно INSERT ... ON CONFLICT на пачку.
+        SQLite: INSERT ... ON CONFLICT через executemany.
+        """
+        rows = {}
+        for vacancy in vacancies:
+            if vacancy_int_id(vacancy.get('id')) is not None:
+                row = vacancy_row(vacancy)
+                rows[row['vacancy_id']] = row
+
+        result = IngestResult()
+        if not rows:
+            return result
+
+        rows = list(rows.values())
+        write = self._copy_upsert if self.session.bind.dialect.name == 'postgresql' else self._executemany_upsert
+        for start in range(0, len(rows), INGEST_BATCH_SIZE):
+            batch = rows[start:start + INGEST_BATCH_SIZE]
+            stored = await self._stored_versions([row['vacancy_id'] for row in batch])
+
+            changed_rows = []
+            for row in batch:
+                previous = stored.get(row['vacancy_id'])
+                if previous is None:
+                    result.new.append(row['raw_data'])
+                elif previous.content_hash == row['content_hash']:
+                    result.unchanged += 1
+                    continue
+                else:
+                    result.changed.append(row['raw_data'])
+                changed_rows.append(row)
+
+            if changed_rows:
+                await write(changed_rows)
+        await self.session.commit()
+
+        logger.debug(f"Вакансий: {len(rows)}, новых: {len(result.new)}, изменилось: {len(result.changed)}, "
+                     f"без изменений: {result.unchanged}")
+        return result
+
+    async def _stored_versions(self, ids: List[int]) -> Dict[int, Any]:
+        """Хэш содержимого сохраненных версий вакансий"""
+        stmt = select(Vacancy.vacancy_id, Vacancy.content_hash).where(Vacancy.vacancy_id.in_(ids))
+        return {row.vacancy_id: row for row in (await self.session.execute(stmt)).all()}
+
+    async def _copy_upsert(self, rows: List[Dict]):
+        """Пачка через COPY в staging-таблицу и слияние в vacancies"""
+        connection = await self.session.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+
+        columns = ', '.join(INGEST_COLUMNS)
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in INGEST_COLUMNS if column != 'vacancy_id')
+        records = [
+            tuple(json.dumps(row[column], ensure_ascii=False) if column == 'raw_data' else row[column]
+                  for column in INGEST_COLUMNS)
+            for row in rows
+        ]
+
+        # Своя транзакция (или точка сохранения внутри транзакции сессии):
+        # при ошибке staging-таблица исчезает вместе с ней
+        async with raw.transaction():
+            # Только колонки, без ограничений и значений по умолчанию
+            await raw.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} AS "
+                f"SELECT {columns} FROM {Vacancy.__tablename__} WITH NO DATA"
+            )
+            await raw.copy_records_to_table(STAGING_TABLE, columns=INGEST_COLUMNS, records=records)
+            # Условие повторяет проверку хэша на случай параллельной записи той же вакансии
+            await raw.execute(
+                f"INSERT INTO {Vacancy.__tablename__} ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+                f"ON CONFLICT (vacancy_id) DO UPDATE SET {updates} "
+                f"WHERE {Vacancy.__tablename__}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+            )
+            await raw.execute(f"DROP TABLE {STAGING_TABLE}")
+
+    async def _executemany_upsert(self, rows: List[Dict]):
+        """Пачка через INSERT ... ON CONFLICT (executemany)"""
+        stmt = sqlite_insert(Vacancy)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Vacancy.vacancy_id],
+            set_={column: stmt.excluded[column] for column in INGEST_COLUMNS if column != 'vacancy_id'},
+        )
+        await self.session.execute(stmt, rows)
+
+    async def get_many(self, vacancy_ids: Iterable[int]) -> List[Dict]:
+        """Сохраненные вакансии (ответы HH) по числовым id"""
+        ids = list(vacancy_ids)
+        result = []
+        for start in range(0, len(ids), INGEST_BATCH_SIZE):
+            stmt = select(Vacancy.raw_data).where(Vacancy.vacancy_id.in_(ids[start:start + INGEST_BATCH_SIZE]))
+            result.extend((await self.session.execute(stmt)).scalars().all())
+        return result
+
+    async def search(self, tokens: Set[str], title_only: bool = True, fields: Dict = None,
+                     min_salary: Optional[int] = None, published_since: Optional[datetime] = None,
+                     limit: int = 20) -> List[Dict]:
+        """Поиск по локальному хранилищу: полнотекстовый индекс + фильтры по колонкам"""
+        stmt = select(Vacancy.raw_data)
+
+        if tokens:
+            if self.session.bind.dialect.name == 'postgresql':
+                stmt = stmt.where(
+                    text(f"{postgres_vector(title_only)} @@ to_tsquery('russian', :tsquery)")
+                    .bindparams(tsquery=postgres_tsquery(tokens))
+                )
+            else:
+                fts_ids = (
+                    select(literal_column('rowid'))
+                    .select_from(text('vacancies_fts'))
+                    .where(text('vacancies_fts MATCH :match')
+                           .bindparams(match=sqlite_match_expression(tokens, title_only)))
+                )
+                stmt = stmt.where(Vacancy.id.in_(fts_ids))
+
+        for name, value in (fields or {}).items():
+            if isinstance(value, (set, list, tuple)):
+                stmt = stmt.where(getattr(Vacancy, name).in_([str(v) for v in value]))
+            else:
+                stmt = stmt.where(getattr(Vacancy, name) == str(value))
+
+        if min_salary:
+            stmt = stmt.where(func.coalesce(Vacancy.salary_to_rub, Vacancy.salary_from_rub) >= min_salary)
+
+        if published_since:
+            stmt = stmt.where(Vacancy.published_at >= published_since)
+
+        stmt = stmt.order_by(Vacancy.published_at.desc()).limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+def get_vacancy_repo(session: AsyncSession) -> VacancyRepository:
+    """Фабрика для получения репозитория вакансий"""
+    return VacancyRepository(session)
@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class StartupProfiler:
+    """Замер времени фаз запуска бота (импорты, БД, настройка бота, первый опрос)"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Замерить фазу запуска"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def report(self) -> str:
+        """Отчет по фазам в лог"""
+        lines = [f"  {name:<12} {elapsed * 1000:8.1f} мс" for name, elapsed in self.phases]
+        lines.append(f"  {'итого':<12} {self.total * 1000:8.1f} мс")
+        text = "⏱ Время запуска:\n" + "\n".join(lines)
+        logger.info(text)
+        return text
+
+
+# Создается при первом импорте, то есть как можно раньше в main.py
+startup_profiler = StartupProfiler()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Конфигурация читается при импорте: тестам достаточно любого токена и временной базы
+os.environ.setdefault("BOT_TOKEN", "test")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("STATE_SNAPSHOT_PATH", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+import src.services.scheduler_service as scheduler_module
+from src.services.adaptive_polling import AdaptivePoller
+
+QUERY_HASH = 'a' * 64
+
+
+class FakeProfileRepo:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_active_profiles(self):
+        return self.rows
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    user = SimpleNamespace(id=1, telegram_id=100)
+    profile = SimpleNamespace(query_hash=QUERY_HASH, hh_params={'text': 'python'}, updated_at=None)
+    monkeypatch.setattr(scheduler_module, 'get_profile_repo', lambda session: FakeProfileRepo([(user, profile)]))
+    monkeypatch.setattr(scheduler_module.asyncio, 'sleep', _no_sleep)
+
+    service = scheduler_module.SchedulerService(bot=None)
+    service.mode = 'adaptive'
+    service.poller = AdaptivePoller(base_interval_minutes=60, min_interval_minutes=10,
+                                    max_interval_minutes=1440, budget_per_hour=100)
+
+    async def no_save(query_hashes):
+        pass
+    service.poller.save = no_save
+    dispatched = []
+
+    async def dispatch(user, vacancies):
+        dispatched.append(vacancies)
+    service._dispatch_new_vacancies = dispatch
+    service.dispatched = dispatched
+    return service
+
+
+async def _no_sleep(*args):
+    return None
+
+
+def test_failed_poll_is_deferred_not_recorded(scheduler, monkeypatch):
+    # Сбой на уровне запроса к HH должен дойти через источник и агрегатор до планировщика
+    async def failing_fetch(path, params=None, **kwargs):
+        raise aiohttp.ClientConnectionError('HH недоступен')
+    monkeypatch.setattr(scheduler_module.hh_client, '_fetch', failing_fetch)
+
+    # Прошлый опрос уже был: иначе первый опрос не влияет на оценку отдачи
+    scheduler.poller.sync({QUERY_HASH: [100]})
+    state = scheduler.poller.states[QUERY_HASH]
+    state.rate, state.last_polled = 6.0, time.time() - 3600
+
+    started = time.time()
+    asyncio.run(scheduler._check_adaptive())
+
+    assert state.rate == 6.0, "сбой HH не должен учитываться как пустая выдача"
+    assert started + scheduler.poller.min_interval <= state.next_due <= time.time() + scheduler.poller.min_interval
+    assert scheduler.query_timings[QUERY_HASH].vacancies is None
+    assert scheduler.dispatched == []
+
+
+def test_empty_poll_is_recorded_as_zero_yield(scheduler, monkeypatch):
+    async def empty_fetch(path, params=None, **kwargs):
+        return 200, {'items': [], 'found': 0, 'pages': 0}, {}
+    monkeypatch.setattr(scheduler_module.hh_client, '_fetch', empty_fetch)
+
+    scheduler.poller.sync({QUERY_HASH: [100]})
+    state = scheduler.poller.states[QUERY_HASH]
+    state.rate, state.last_polled = 6.0, time.time() - 3600
+
+    asyncio.run(scheduler._check_adaptive())
+
+    assert state.rate < 6.0
+    assert state.next_due > time.time() + scheduler.poller.min_interval
+    assert scheduler.query_timings[QUERY_HASH].vacancies == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from src.services.areas import AreaIndex, edit_distance, normalize_name
+
+ROWS = [
+    ('113', None, 'Россия'),
+    ('1', '113', 'Москва'),
+    ('2', '113', 'Санкт-Петербург'),
+    ('4', '113', 'Новосибирск'),
+    ('66', '113', 'Нижний Новгород'),
+    ('55', '113', 'Красноярск'),
+    ('1620', '113', 'Республика Марий Эл'),
+    ('1621', '1620', 'Йошкар-Ола'),
+    ('2019', '113', 'Московская область'),
+    ('2034', '2019', 'Королёв'),
+    ('2050', '2019', 'Щёлково'),
+    ('3001', '2019', 'Заречный'),
+    ('16', None, 'Беларусь'),
+    ('1002', '16', 'Минск'),
+    # Одноименный город за пределами России уступает российскому
+    ('1003', '16', 'Заречный'),
+]
+
+
+@pytest.fixture(scope='module')
+def areas(tmp_path_factory):
+    index = AreaIndex(snapshot_path=str(tmp_path_factory.mktemp('areas') / 'areas.json.gz'))
+    index._build(ROWS)
+    return index
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Регистр, пробелы, ё/е, дефисы
+    ('Москва', '1'), ('  МОСКВА ', '1'),
+    ('Королев', '2034'), ('королёв', '2034'), ('Щелково', '2050'),
+    ('Санкт Петербург', '2'), ('санкт-петербург', '2'), ('Йошкар Ола', '1621'), ('йошкар—ола', '1621'),
+    # Префиксы "г." и "пос."
+    ('г. Москва', '1'), ('г Москва', '1'), ('город Москва', '1'),
+    ('пос. Заречный', '3001'), ('поселок Заречный', '3001'),
+    # Совпадение по началу названия
+    ('Санкт', '2'), ('Новосиб', '4'), ('Нижн', '66'), ('Моск', '1'),
+    # Одна опечатка: замена, перестановка, пропуск, лишняя буква
+    ('Масква', '1'), ('Новосибриск', '4'), ('Красноярк', '55'), ('Минскк', '1002'),
+    # Неизвестный или неоднозначный ввод
+    ('Атлантида', None), ('', None), (None, None), ('но', None), ('г.', None),
+])
+def test_resolve(areas, text, expected):
+    assert areas.resolve(text) == expected
+
+
+def test_region_expands_to_children(areas):
+    assert areas.expand('2019') == {'2019', '2034', '2050', '3001'}
+    assert areas.expand('1620') == {'1620', '1621'}
+    assert areas.expand('1') == {'1'}
+    assert areas.expand('113') >= {'1', '2', '1621', '2034'}
+    assert '1002' not in areas.expand('113')
+
+
+def test_ancestors(areas):
+    assert areas.ancestors('2034') == ['2034', '2019', '113']
+    assert areas.ancestors(None) == []
+
+
+@pytest.mark.parametrize('a, b, limit, expected', [
+    ('москва', 'москва', 2, 0),
+    ('масква', 'москва', 2, 1),
+    ('моксва', 'москва', 2, 1),  # перестановка соседних букв
+    ('мсква', 'москва', 2, 1),
+    ('питер', 'москва', 2, 3),  # больше limit - ранний выход с limit + 1
+    ('а', 'москва', 2, 3),
+])
+def test_edit_distance(a, b, limit, expected):
+    assert edit_distance(a, b, limit) == expected
+
+
+def test_normalize_name():
+    assert normalize_name('  г. Ростов-на-Дону ') == 'ростов на дону'
+    assert normalize_name('Орёл') == 'орел'
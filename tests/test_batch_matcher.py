@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from src.services.areas import area_index
+from src.services.batch_matcher import BatchMatcher
+from src.services.matching import profile_matches
+
+EXPERIENCE = ['noExperience', 'between1And3', 'between3And6']
+SCHEDULE = ['fullDay', 'remote', 'flexible']
+EMPLOYMENT = ['full', 'part']
+WORDS = ['python', 'java', 'backend', 'разработчик', 'senior', 'аналитик', 'data', 'инженер']
+
+
+@pytest.fixture
+def deep_areas():
+    """Дерево регионов глубже четырех уровней: 1 <- 10 <- 100 <- ... <- 1000000"""
+    saved = dict(area_index.__dict__)
+    rows = [('1', None, 'Страна')]
+    parent = '1'
+    for level in range(1, 7):
+        area_id = '1' + '0' * level
+        rows.append((area_id, parent, f"Регион {level}"))
+        rows.append((f"{area_id}1", parent, f"Соседний регион {level}"))
+        parent = area_id
+    area_index._build(rows)
+    yield [row[0] for row in rows]
+    area_index.__dict__.clear()
+    area_index.__dict__.update(saved)
+
+
+def make_profiles(rng, areas, count):
+    profiles = []
+    for user_key in range(count):
+        params = {
+            'text': ' '.join(rng.sample(WORDS, rng.randint(1, 2))) if rng.random() < 0.7 else None,
+            'area': rng.choice(areas) if rng.random() < 0.8 else None,
+            'experience': rng.choice(EXPERIENCE) if rng.random() < 0.5 else None,
+            'schedule': rng.choice(SCHEDULE) if rng.random() < 0.3 else None,
+            'employment': rng.choice(EMPLOYMENT) if rng.random() < 0.3 else None,
+            'salary_min': rng.randrange(50_000, 300_000, 10_000) if rng.random() < 0.4 else None,
+        }
+        profiles.append((user_key, {k: v for k, v in params.items() if v is not None}))
+    return profiles
+
+
+def make_vacancies(rng, areas, count):
+    return [{
+        'id': str(vacancy_id),
+        'name': ' '.join(rng.sample(WORDS, rng.randint(1, 4))),
+        'area': {'id': rng.choice(areas)},
+        'experience': {'id': rng.choice(EXPERIENCE)},
+        'schedule': {'id': rng.choice(SCHEDULE)},
+        'employment': {'id': rng.choice(EMPLOYMENT)},
+        'salary': {'from': rng.randrange(30_000, 400_000, 5_000), 'to': None, 'currency': 'RUR', 'gross': False}
+        if rng.random() < 0.6 else None,
+    } for vacancy_id in range(count)]
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_match_matrix_agrees_with_profile_matches(deep_areas, seed):
+    rng = random.Random(seed)
+    profiles = make_profiles(rng, deep_areas, 300)
+    vacancies = make_vacancies(rng, deep_areas, 150)
+    matcher = BatchMatcher.build(profiles)
+
+    matrix = matcher.match_matrix(vacancies)
+    assert matrix.shape == (len(vacancies), len(profiles))
+    for row, vacancy in enumerate(vacancies):
+        for col, (_, hh_params) in enumerate(profiles):
+            expected = profile_matches(hh_params, vacancy)
+            if hh_params.get('text'):
+                # Маска токенов допускает ложные совпадения, но не пропуски
+                assert matrix[row, col] or not expected
+            else:
+                assert matrix[row, col] == expected
+
+    expected_per_user = {}
+    for user_key, hh_params in profiles:
+        matched = [v['id'] for v in vacancies if profile_matches(hh_params, v)]
+        if matched:
+            expected_per_user[user_key] = matched
+    per_user = {key: [v['id'] for v in found] for key, found in matcher.match_all(vacancies).items()}
+    assert per_user == expected_per_user
+
+
+def test_deep_area_chain_matches_root_profile(deep_areas):
+    matcher = BatchMatcher.build([(1, {'area': '1'}), (2, {'area': '10'}), (3, {'area': '101'})])
+    deepest = {'id': '7', 'name': 'python', 'area': {'id': '1000000'}}
+    assert matcher.match_matrix([deepest]).tolist() == [[True, True, False]]
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from multidict import CIMultiDict
+
+import src.services.hh_client as hh_client_module
+from src.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.services.hh_client import HHAPIClient
+from src.services.hh_transport import CassetteMissError, TransportResponse
+
+
+class FakeTransport:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def get(self, path, params, headers, timeout):
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker('HH API', failure_rate=0.5, open_seconds=60)
+    breaker._state, breaker.opened_at = OPEN, 0.0  # пауза давно истекла
+    monkeypatch.setattr(hh_client_module, 'hh_breaker', breaker)
+    assert breaker.state == HALF_OPEN
+    return breaker
+
+
+def fetch(outcome):
+    client = HHAPIClient()
+    client._transport = FakeTransport(outcome)
+    return asyncio.run(client._fetch('/vacancies', {'text': 'python'}, conditional=False))
+
+
+@pytest.mark.parametrize('error', [CassetteMissError('нет записи'), asyncio.CancelledError()])
+def test_trial_is_released_on_unrelated_error(breaker, error):
+    with pytest.raises(type(error)):
+        fetch(error)
+
+    # Пробный запрос завершился без исхода: следующий снова пропускается
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_unparseable_response_reopens(breaker):
+    with pytest.raises(ValueError):
+        fetch(TransportResponse(200, CIMultiDict(), b'{not json'))
+
+    assert breaker.state == OPEN
+
+
+def test_successful_trial_closes(breaker):
+    status, data, _ = fetch(TransportResponse(200, CIMultiDict(), b'{"items": []}'))
+
+    assert status == 200 and data == {'items': []}
+    assert breaker.state == CLOSED
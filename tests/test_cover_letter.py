@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import src.services.deepseek as deepseek_module
+from src.services.cover_letter import CoverLetterBusy, CoverLetterService
+from src.services.deepseek import DeepSeekClient
+
+CHUNKS = ['Здравствуйте', '! Готов ', 'приступить. ']
+FILTERS = {'profession': 'Python-разработчик'}
+
+
+def vacancy(vacancy_id):
+    return {'id': vacancy_id, 'name': f'Вакансия {vacancy_id}', 'employer': {'name': 'Альфа'}}
+
+
+class FakeLLM:
+    """Заглушка OpenAI-совместимого API: отдает письмо потоком server-sent events"""
+
+    def __init__(self):
+        self.requests = []
+        self.received = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def chat(self, request):
+        self.requests.append(await request.json())
+        self.received.set()
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await self.release.wait()
+        for chunk in CHUNKS:
+            data = json.dumps({'choices': [{'delta': {'content': chunk}}]}, ensure_ascii=False)
+            await response.write(f"data: {data}\n\n".encode('utf-8'))
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+
+def run_with_llm(scenario, **service_kwargs):
+    """Запуск сценария с сервисом писем, обращающимся к локальной заглушке через DEEPSEEK_API_URL"""
+    async def main():
+        llm = FakeLLM()
+        app = web.Application()
+        app.router.add_post('/chat/completions', llm.chat)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            deepseek_module.config.DEEPSEEK_API_URL = str(server.make_url(''))
+            client = DeepSeekClient(api_key='test')
+            return await scenario(CoverLetterService(client=client, **service_kwargs), llm)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def restore_api_url(monkeypatch):
+    monkeypatch.setattr(deepseek_module.config, 'DEEPSEEK_API_URL', deepseek_module.config.DEEPSEEK_API_URL)
+
+
+async def collect(service, item):
+    return [text async for text in service.stream(item, FILTERS)]
+
+
+def test_stream_and_cache_hit():
+    async def scenario(service, llm):
+        first = await collect(service, vacancy('1'))
+        second = await collect(service, vacancy('1'))
+        return first, second, llm.requests
+
+    first, second, requests = run_with_llm(scenario)
+    assert first == ['Здравствуйте', 'Здравствуйте! Готов ', 'Здравствуйте! Готов приступить. ']
+    # Из кэша - сразу письмо целиком, без обращения к LLM
+    assert second == ['Здравствуйте! Готов приступить.']
+    assert len(requests) == 1
+    assert requests[0]['stream'] is True
+    assert 'Вакансия 1' in requests[0]['messages'][1]['content']
+
+
+def test_concurrent_requests_share_one_generation():
+    async def scenario(service, llm):
+        llm.release.clear()
+        first = asyncio.create_task(collect(service, vacancy('2')))
+        await llm.received.wait()
+        second = asyncio.create_task(collect(service, vacancy('2')))
+        await asyncio.sleep(0)
+        assert service.backlog() == {'queued': 0, 'in_flight': 1}
+        llm.release.set()
+        return await first, await second, llm.requests, service.backlog()
+
+    first, second, requests, backlog = run_with_llm(scenario)
+    assert first[-1].strip() == second[-1] == 'Здравствуйте! Готов приступить.'
+    assert len(second) == 1
+    assert len(requests) == 1
+    assert backlog == {'queued': 0, 'in_flight': 0}
+
+
+def test_full_queue_raises_busy():
+    async def scenario(service, llm):
+        llm.release.clear()
+        generating = asyncio.create_task(collect(service, vacancy('3')))
+        await llm.received.wait()
+        queued = asyncio.create_task(collect(service, vacancy('4')))
+        await asyncio.sleep(0)
+        assert service.backlog() == {'queued': 1, 'in_flight': 1}
+
+        with pytest.raises(CoverLetterBusy):
+            await collect(service, vacancy('5'))
+
+        llm.release.set()
+        await generating
+        await queued
+        return llm.requests, service.backlog()
+
+    requests, backlog = run_with_llm(scenario, concurrency=1, queue_size=1)
+    # Отклоненный запрос до LLM не дошел, ожидавший в очереди - дошел
+    assert len(requests) == 2
+    assert backlog == {'queued': 0, 'in_flight': 0}
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict
+
+import src.services.hh_client as hh_client_module
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.dictionaries import BUNDLED_SNAPSHOT_PATH, HHDictionaries
+from src.services.hh_client import HHAPIClient
+from src.services.hh_transport import TransportResponse
+
+with open(BUNDLED_SNAPSHOT_PATH, encoding='utf-8') as f:
+    BUNDLED = json.load(f)['dictionaries']
+
+UPDATED = {**BUNDLED, 'experience': BUNDLED['experience'] + [{'id': 'moreThan10', 'name': 'Более 10 лет'}]}
+
+
+class DictionariesTransport:
+    """/dictionaries с ETag; offline - нет сети"""
+
+    def __init__(self, data=UPDATED, etag='"d2"', offline=False):
+        self.data = data
+        self.etag = etag
+        self.offline = offline
+        self.requests = []
+
+    async def get(self, path, params, headers, timeout):
+        self.requests.append(dict(headers))
+        if self.offline:
+            raise aiohttp.ClientConnectionError('нет сети')
+        if headers.get('If-None-Match') == self.etag:
+            return TransportResponse(304, CIMultiDict({'ETag': self.etag}), b'')
+        body = json.dumps(self.data, ensure_ascii=False).encode('utf-8')
+        return TransportResponse(200, CIMultiDict({'ETag': self.etag}), body)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = DictionariesTransport()
+    monkeypatch.setattr(hh_client_module, 'hh_client', HHAPIClient(transport=transport))
+    monkeypatch.setattr(hh_client_module, 'hh_breaker', CircuitBreaker('HH API', failure_rate=0.5, open_seconds=60))
+    return transport
+
+
+def cached(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_changed_dictionaries_replace_snapshot_and_persist(tmp_path, transport):
+    path = str(tmp_path / 'dictionaries.json')
+    dictionaries = HHDictionaries(cache_path=path)
+    updates = []
+    dictionaries.on_update(lambda: updates.append(True))
+
+    assert not dictionaries.is_valid('experience', 'moreThan10')  # из поставляемого снимка
+    assert asyncio.run(dictionaries.refresh()) is True
+
+    assert dictionaries.is_valid('experience', 'moreThan10')
+    assert dictionaries.etag == '"d2"' and updates == [True]
+    assert cached(path)['etag'] == '"d2"'
+    assert cached(path)['dictionaries']['experience'] == UPDATED['experience']
+
+    # После перезапуска справочники и ETag берутся из кэша, а не из снимка
+    restarted = HHDictionaries(cache_path=path)
+    assert restarted.is_valid('experience', 'moreThan10') and restarted.etag == '"d2"'
+
+
+def test_not_modified_keeps_snapshot(tmp_path, transport):
+    path = str(tmp_path / 'dictionaries.json')
+    dictionaries = HHDictionaries(cache_path=path)
+    asyncio.run(dictionaries.refresh())
+    saved = cached(path)
+    fetched_at = dictionaries.fetched_at
+
+    assert asyncio.run(dictionaries.refresh()) is False
+    assert transport.requests[-1]['If-None-Match'] == '"d2"'
+    assert dictionaries.is_valid('experience', 'moreThan10')
+    assert dictionaries.fetched_at >= fetched_at
+    assert cached(path) == saved
+
+
+def test_unchanged_content_with_new_etag_is_not_an_update(tmp_path, transport):
+    transport.data = BUNDLED
+    dictionaries = HHDictionaries(cache_path=str(tmp_path / 'dictionaries.json'))
+    updates = []
+    dictionaries.on_update(lambda: updates.append(True))
+
+    assert asyncio.run(dictionaries.refresh()) is False
+    assert updates == [] and dictionaries.etag == '"d2"'
+
+
+def test_offline_falls_back_to_bundled_snapshot(tmp_path, transport):
+    transport.offline = True
+    path = tmp_path / 'dictionaries.json'
+    dictionaries = HHDictionaries(cache_path=str(path))
+
+    assert asyncio.run(dictionaries.refresh()) is False
+    assert dictionaries.items('experience') == BUNDLED['experience']
+    assert dictionaries.is_valid('experience', 'between1And3')
+    assert not path.exists()
+
+    # Поврежденный кэш тоже не мешает работать по снимку
+    path.write_text('{не json', encoding='utf-8')
+    assert HHDictionaries(cache_path=str(path)).items('experience') == BUNDLED['experience']
@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+import src.services.scheduler_service as scheduler_module
+
+
+def test_concurrent_checks_send_each_vacancy_once(monkeypatch):
+    async def nothing_hidden(user_id, vacancies):
+        return vacancies
+    monkeypatch.setattr(scheduler_module.exclusion_service, 'exclude', nothing_hidden)
+
+    service = scheduler_module.SchedulerService(bot=None)
+    sent = []
+
+    async def slow_send(chat_id, vacancies):
+        await asyncio.sleep(0.01)
+        sent.extend(vacancy['id'] for vacancy in vacancies)
+    service.send_vacancy_notifications = slow_send
+
+    user = SimpleNamespace(id=1, telegram_id=100, salary_alerts=False)
+    vacancies = [{'id': '101'}, {'id': '102'}]
+
+    async def run():
+        # Проверка после правки фильтров совпала с плановым проходом
+        await asyncio.gather(
+            service._dispatch_new_vacancies(user, vacancies),
+            service._dispatch_new_vacancies(user, vacancies),
+        )
+    asyncio.run(run())
+
+    assert sorted(sent) == ['101', '102']
@@ -0,0 +1,126 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import src.bot.handlers.vacancies as vacancies_module
+import src.services.exclusions as exclusions_module
+import src.services.scheduler_service as scheduler_module
+from src.services.exclusions import BloomFilter, ExclusionService, build_exclusion_set
+from src.services.id_sets import IdSet
+from src.storage.database import init_db
+
+
+def run(coroutine):
+    async def with_db():
+        await init_db()
+        return await coroutine
+    return asyncio.run(with_db())
+
+
+def test_bloom_filter_membership_and_false_positives():
+    rng = random.Random(7)
+    members = rng.sample(range(10 ** 9), 20000)
+    bloom = BloomFilter(len(members))
+    for value in members:
+        bloom.add(value)
+
+    assert all(value in bloom for value in members)
+    assert None not in bloom
+    member_set = set(members)
+    others = [value for value in rng.sample(range(10 ** 9, 2 * 10 ** 9), 100000) if value not in member_set]
+    false_positives = sum(value in bloom for value in others)
+    assert false_positives / len(others) < 0.002
+
+
+def test_build_exclusion_set_switches_to_bloom(monkeypatch):
+    monkeypatch.setattr(exclusions_module, 'BLOOM_THRESHOLD', 10)
+    assert isinstance(build_exclusion_set(range(9)), IdSet)
+    bloom = build_exclusion_set(range(10))
+    assert isinstance(bloom, BloomFilter) and bloom.capacity == 20
+
+
+def test_hide_and_save_persist():
+    user_id = 910001
+    service = ExclusionService()
+
+    async def scenario():
+        assert await service.hide(user_id, '501')
+        assert not await service.hide(user_id, '501')  # повтор не записывается
+        assert not await service.hide(user_id, 'не-id')
+        assert await service.save(user_id, 502)
+        # Новый экземпляр (как после перезапуска) читает скрытые из БД
+        fresh = ExclusionService()
+        return await fresh.hidden_for(user_id), await fresh.saved_ids(user_id)
+
+    hidden, saved = run(scenario())
+    assert '501' in hidden and 502 not in hidden
+    assert saved == [502]
+
+
+def test_overfull_bloom_filter_is_rebuilt(monkeypatch):
+    monkeypatch.setattr(exclusions_module, 'BLOOM_THRESHOLD', 10)
+    user_id = 910002
+    service = ExclusionService()
+
+    async def scenario():
+        for vacancy_id in range(1, 11):
+            await service.hide(user_id, vacancy_id)
+        await service.preload([user_id])
+        first = service._hidden[user_id]
+        for vacancy_id in range(11, 22):
+            await service.hide(user_id, vacancy_id)
+        rebuilt = await service.hidden_for(user_id)
+        return first, rebuilt
+
+    first, rebuilt = run(scenario())
+    assert isinstance(first, BloomFilter) and first.capacity == 20
+    assert rebuilt is not first and rebuilt.capacity == 42
+    assert all(vacancy_id in rebuilt for vacancy_id in range(1, 22))
+
+
+def test_hidden_vacancies_are_not_notified(monkeypatch):
+    user = SimpleNamespace(id=1, telegram_id=910003, salary_alerts=False)
+    service = scheduler_module.SchedulerService(bot=None)
+    sent = []
+
+    async def send(chat_id, vacancies):
+        sent.extend(vacancy['id'] for vacancy in vacancies)
+    service.send_vacancy_notifications = send
+
+    async def scenario():
+        await scheduler_module.exclusion_service.hide(user.telegram_id, '601')
+        await service._dispatch_new_vacancies(user, [{'id': '601'}, {'id': '602'}])
+
+    run(scenario())
+    assert sent == ['602']
+
+
+def test_hidden_vacancies_are_dropped_from_search(monkeypatch):
+    user_id = 910004
+
+    async def get_profile(telegram_id):
+        return SimpleNamespace(hh_params={'text': 'python'})
+
+    async def search(params):
+        return [{'id': '701'}, {'id': '702'}]
+
+    monkeypatch.setattr(vacancies_module.filter_service, 'get_profile', get_profile)
+    monkeypatch.setattr(vacancies_module.local_search_service, 'search', search)
+    handler = vacancies_module.VacancyHandler()
+
+    async def send_vacancy(update, context, telegram_id, index):
+        pass
+    handler.send_vacancy = send_vacancy
+
+    async def reply_text(*args, **kwargs):
+        pass
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=user_id), message=SimpleNamespace(reply_text=reply_text))
+
+    async def scenario():
+        await vacancies_module.exclusion_service.hide(user_id, '701')
+        await handler.search_vacancies(update, None)
+
+    run(scenario())
+    assert [vacancy['id'] for vacancy in handler.user_searches[user_id]['vacancies']] == ['702']
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from src.services.filter_service import FilterService, compile_filters, make_query_hash
+from src.storage.database import AsyncSessionLocal, init_db
+from src.storage.repositories.profile_repo import get_profile_repo
+
+FILTERS = {'profession': 'Python', 'experience': 'between1And3', 'salary_min': '150000',
+           'schedule': 'remote', 'employment': 'fullDay', 'area': '1'}
+
+
+def query_hash(filters):
+    return make_query_hash(compile_filters(filters))
+
+
+@pytest.mark.parametrize('equivalent', [
+    dict(reversed(list(FILTERS.items()))),
+    {**FILTERS, 'salary_min': 150000},
+    {**FILTERS, 'profession': '  Python '},
+    {**FILTERS, 'comment': None},
+])
+def test_equivalent_filters_hash_identically(equivalent):
+    assert query_hash(equivalent) == query_hash(FILTERS)
+
+
+@pytest.mark.parametrize('empty', [None, '', '   '])
+def test_empty_values_are_ignored(empty):
+    base = {'profession': 'Python'}
+    with_empty = {key: empty for key in ('experience', 'salary_min', 'schedule', 'employment', 'area')}
+    assert compile_filters({**base, **with_empty}) == compile_filters(base)
+    assert query_hash({**base, **with_empty}) == query_hash(base)
+
+
+def test_different_filters_hash_differently():
+    assert query_hash({**FILTERS, 'salary_min': '200000'}) != query_hash(FILTERS)
+    assert query_hash({**FILTERS, 'area': '2'}) != query_hash(FILTERS)
+
+
+def test_query_hash_is_stable():
+    params = compile_filters(FILTERS)
+    assert params == {'text': 'Python', 'search_field': 'name', 'experience': 'between1And3',
+                      'salary_min': 150000, 'schedule': 'remote', 'employment': 'full', 'area': '1'}
+    assert make_query_hash(params) == make_query_hash(dict(reversed(list(params.items()))))
+    assert len(make_query_hash(params)) == 64
+
+
+def test_save_filter_refreshes_profile():
+    user_id = 920001
+    service = FilterService()
+    changed = []
+    service.on_change(changed.append)
+
+    async def profile():
+        async with AsyncSessionLocal() as session:
+            return await get_profile_repo(session).get_profile(user_id)
+
+    async def scenario():
+        await init_db()
+        await service.save_filter(user_id, 'profession', 'Python')
+        first = await profile()
+        await service.save_filter(user_id, 'salary_min', '150000')
+        second = await profile()
+        # Повторное сохранение того же значения не меняет хэш
+        await service.save_filter(user_id, 'salary_min', '150000')
+        third = await profile()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first.filters == {'profession': 'Python'}
+    assert first.query_hash == query_hash({'profession': 'Python'})
+    assert second.filters == {'profession': 'Python', 'salary_min': '150000'}
+    assert second.hh_params['salary_min'] == 150000
+    assert second.query_hash == query_hash({'profession': 'Python', 'salary_min': '150000'}) != first.query_hash
+    assert third.query_hash == second.query_hash
+    assert changed == [user_id] * 3
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import src.services.firehose as firehose_module
+from src.services.firehose import CURSOR_OVERLAP, FirehoseService
+
+
+class FakeHH:
+    """Выдача HH от новых к старым по date_from/date_to с постраничным разбиением"""
+
+    def __init__(self, vacancies):
+        self.vacancies = sorted(vacancies, key=lambda v: v['published_at'], reverse=True)
+        self.fail = False
+        self.calls = 0
+
+    async def fetch_vacancies(self, **params):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError('HH недоступен')
+        date_from = datetime.fromisoformat(params['date_from'])
+        date_to = datetime.fromisoformat(params['date_to']) if 'date_to' in params else None
+        matched = [v for v in self.vacancies
+                   if datetime.fromisoformat(v['published_at']) >= date_from
+                   and (date_to is None or datetime.fromisoformat(v['published_at']) <= date_to)]
+        start = params['page'] * params['per_page']
+        return matched[start:start + params['per_page']]
+
+
+def make_vacancies(now, count, step=timedelta(minutes=1)):
+    return [{'id': str(i), 'published_at': (now - step * (i + 1)).isoformat(timespec='seconds')}
+            for i in range(count)]
+
+
+@pytest.fixture
+def hh(monkeypatch):
+    now = datetime.now().astimezone()
+    fake = FakeHH(make_vacancies(now, 25))
+    monkeypatch.setattr(firehose_module, 'hh_client', fake)
+    return fake
+
+
+def test_failed_fetch_keeps_cursor(hh):
+    service = FirehoseService(pages=5, per_page=10)
+    cursor = datetime.now().astimezone() - timedelta(hours=1)
+    service.cursors['1'] = cursor
+    hh.fail = True
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(service.fetch_bucket('1'))
+    assert service.cursors['1'] == cursor
+    assert asyncio.run(service.collect(['1'])) == []
+    assert service.cursors['1'] == cursor
+
+
+def test_truncated_window_is_backfilled(hh):
+    service = FirehoseService(pages=2, per_page=10)
+    service.cursors['1'] = datetime.now().astimezone() - timedelta(hours=1) + CURSOR_OVERLAP
+
+    seen = set()
+    for _ in range(3):
+        seen.update(v['id'] for v in asyncio.run(service.fetch_bucket('1')))
+    # Бюджет - две страницы за проход: первый проход упирается в него, остаток окна дочитывается потом
+    assert seen == {str(i) for i in range(25)}
+    assert '1' not in service.backfill
+
+
+def test_novelty_does_not_depend_on_store(hh, monkeypatch):
+    service = FirehoseService(pages=5, per_page=10)
+    stored = []
+
+    async def ingest(vacancies):
+        stored.extend(vacancies)
+    monkeypatch.setattr(service, 'ingest', ingest)
+
+    # Вакансии, уже сохраненные другими путями (поиск, автопоиск), все равно попадают в выборку
+    first = asyncio.run(service.collect(['1']))
+    service.cursors.clear()
+    second = asyncio.run(service.collect(['1']))
+    assert len(first) == len(second) == 25
+
+
+async def _value(value):
+    return value
+
+
+def test_resumed_pass_delivers_new_batch_to_all_users(monkeypatch):
+    import src.services.scheduler_service as scheduler_module
+    from src.services.circuit_breaker import CircuitBreaker
+    from src.storage.database import init_db
+
+    users = [SimpleNamespace(id=i, telegram_id=100 + i, salary_alerts=False) for i in (1, 2, 3)]
+    rows = [(user, SimpleNamespace(hh_params={}, query_hash=str(user.id))) for user in users]
+    monkeypatch.setattr(scheduler_module, 'get_profile_repo', lambda session: SimpleNamespace(
+        get_active_profiles=lambda: _value(rows)))
+
+    async def nothing_hidden(user_id, vacancies):
+        return vacancies
+    monkeypatch.setattr(scheduler_module.exclusion_service, 'exclude', nothing_hidden)
+
+    # Каждый проход firehose получает новое окно
+    batches = [[{'id': '9001', 'name': 'Первая'}], [{'id': '9002', 'name': 'Вторая'}]]
+
+    async def collect(areas):
+        fresh = batches.pop(0)
+        await scheduler_module.firehose_service.ingest(fresh)
+        return fresh
+    monkeypatch.setattr(scheduler_module.firehose_service, 'collect', collect)
+
+    telegram = CircuitBreaker('Telegram')
+    monkeypatch.setattr(scheduler_module, 'blocking_breaker', lambda: telegram if telegram.is_open else None)
+
+    service = scheduler_module.SchedulerService(bot=None)
+    service.mode = 'firehose'
+    received = {user.telegram_id: [] for user in users}
+
+    async def send(chat_id, vacancies):
+        received[chat_id].extend(vacancy['id'] for vacancy in vacancies)
+        if chat_id == users[0].telegram_id and not telegram.is_open and batches:
+            telegram._open()  # Telegram отказал посреди прохода
+    service.send_vacancy_notifications = send
+
+    async def run():
+        await init_db()
+        await service.check_new_vacancies_for_all_users()
+        assert received == {101: ['9001'], 102: [], 103: []}
+        telegram._state = 'closed'
+        await service.check_new_vacancies_for_all_users()
+
+    asyncio.run(run())
+    # Выборка прерванного прохода доходит до всех, кому ее не успели отправить
+    assert {chat_id: sorted(ids) for chat_id, ids in received.items()} == {
+        101: ['9001', '9002'], 102: ['9001', '9002'], 103: ['9001', '9002']
+    }
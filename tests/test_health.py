@@ -0,0 +1,140 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import src.services.health as health_module
+import src.services.scheduler_service as scheduler_module
+from src.services.health import HealthServer
+from src.storage.database import init_db
+
+
+def telegram(running=True):
+    return SimpleNamespace(running=running, updater=SimpleNamespace(running=running))
+
+
+def fake_scheduler(last_pass_age=10.0):
+    now = time.time()
+    return SimpleNamespace(
+        scheduler=SimpleNamespace(running=True), mode='firehose', check_interval=1,
+        started_at=now - 3600, last_pass_at=now - last_pass_age, pass_started_at=now - 2,
+        backlog=lambda: {'pending_user_checks': 3},
+    )
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    state = {'scheduler': None}
+    monkeypatch.setattr(scheduler_module, 'get_scheduler', lambda: state['scheduler'])
+    monkeypatch.setattr(health_module, 'blocking_breaker', lambda: None)
+    return state
+
+
+def request(server: HealthServer, *paths):
+    """Ответы эндпоинтов (статус, JSON) через тестовый HTTP-сервер"""
+    async def scenario():
+        await init_db()
+        async with TestClient(TestServer(server.make_app())) as client:
+            responses = []
+            for path in paths:
+                response = await client.get(path)
+                responses.append((response.status, await response.json()))
+            return responses
+    return asyncio.run(scenario())
+
+
+def database(ok):
+    async def check():
+        return ok
+    return check
+
+
+def test_ready_when_database_and_telegram_are_up(scheduler):
+    scheduler['scheduler'] = fake_scheduler()
+    # Настоящая проверка базы - тестовая SQLite
+    [(status, body)] = request(HealthServer(telegram()), '/health/ready')
+    assert status == 200
+    assert body == {'ready': True, 'database': True, 'telegram': True, 'scheduler': True}
+
+
+@pytest.mark.parametrize('database_ok, application', [
+    (False, telegram()),
+    (True, telegram(running=False)),
+    (True, None),
+    (False, None),
+])
+def test_not_ready_without_database_or_telegram(scheduler, database_ok, application):
+    server = HealthServer(application)
+    server._database_ok = database(database_ok)
+    [(status, body)] = request(server, '/health/ready')
+    assert status == 503
+    assert body['ready'] is False
+    assert body['database'] is database_ok
+    assert body['telegram'] is (application is not None and application.running)
+
+
+def test_stale_scheduler_is_not_ready_unless_breaker_is_open(scheduler, monkeypatch):
+    scheduler['scheduler'] = fake_scheduler(last_pass_age=3 * 60)  # больше двух интервалов по минуте
+    server = HealthServer(telegram())
+    server._database_ok = database(True)
+    [(status, body)] = request(server, '/health/ready')
+    assert status == 503 and body['scheduler'] is False
+
+    # Пока HH недоступен, отставание планировщика - не повод перезапускать процесс
+    monkeypatch.setattr(health_module, 'blocking_breaker', lambda: SimpleNamespace(name='HH API'))
+    [(status, body)] = request(server, '/health/ready')
+    assert status == 200 and body['scheduler'] is True
+
+
+def test_details_report_loop_lag_and_backlog(scheduler):
+    scheduler['scheduler'] = fake_scheduler()
+    server = HealthServer(telegram())
+    server._database_ok = database(True)
+    server.probe.lag = 0.25
+    server.probe._recent.append((time.monotonic(), 0.75))
+    server.memory = {'process_rss_bytes': 1024}
+
+    [(status, body)] = request(server, '/health')
+    assert status == 200 and body['ready'] is True and body['live'] is True
+    assert body['loop_lag'] == {'last': 0.25, 'max_recent': 0.75}
+    assert body['scheduler']['backlog'] == {'pending_user_checks': 3}
+    assert body['scheduler']['mode'] == 'firehose' and body['scheduler']['stale'] is False
+    assert body['scheduler']['pass_running_for'] >= 2
+    assert body['cover_letters'] == {'queued': 0, 'in_flight': 0}
+    assert body['memory'] == {'process_rss_bytes': 1024}
+    assert set(body['breakers']) == {'HH API', 'Telegram'}
+
+
+def test_details_without_scheduler_and_not_ready(scheduler):
+    server = HealthServer(None)
+    server._database_ok = database(True)
+    [(status, body)] = request(server, '/health')
+    assert status == 503
+    assert body['scheduler'] is None and body['checks'] == {'database': True, 'telegram': False}
+
+
+def test_live_depends_on_loop_lag(scheduler, monkeypatch):
+    monkeypatch.setattr(health_module.config, 'HEALTH_MAX_LOOP_LAG', 1.0)
+    server = HealthServer(telegram())
+    server.probe.lag = 0.5
+    [(status, body)] = request(server, '/health/live')
+    assert status == 200 and body == {'live': True, 'loop_lag': 0.5}
+
+    server.probe.lag = 1.5
+    [(status, body)] = request(server, '/health/live')
+    assert status == 503 and body['live'] is False
+
+
+def test_probe_measures_blocked_loop():
+    async def scenario():
+        probe = health_module.LoopLagProbe(interval=0.01)
+        probe.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.2)  # блокирующий участок в цикле событий
+        await asyncio.sleep(0.05)
+        probe.stop()
+        return probe.max_lag
+
+    assert asyncio.run(scenario()) >= 0.1
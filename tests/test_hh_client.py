@@ -0,0 +1,105 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from multidict import CIMultiDict
+
+import src.services.hh_client as hh_client_module
+from src.services.hh_client import HHAPIClient
+from src.services.hh_transport import TransportResponse
+
+DATA = {'items': [{'id': '1'}], 'found': 1}
+
+
+class ConditionalTransport:
+    """HH с валидаторами: на совпадающий If-None-Match / If-Modified-Since отвечает 304"""
+
+    def __init__(self, etag='"v1"', last_modified='Mon, 19 Oct 2026 10:00:00 GMT'):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = gzip.compress(json.dumps(DATA).encode('utf-8'))
+        self.requests = []
+
+    async def get(self, path, params, headers, timeout):
+        self.requests.append(dict(headers))
+        validators = {}
+        if self.etag:
+            validators['ETag'] = self.etag
+        if self.last_modified:
+            validators['Last-Modified'] = self.last_modified
+        if (self.etag and headers.get('If-None-Match') == self.etag) or \
+                (self.last_modified and headers.get('If-Modified-Since') == self.last_modified):
+            return TransportResponse(304, CIMultiDict(validators), b'')
+        return TransportResponse(200, CIMultiDict({'Content-Encoding': 'gzip', **validators}), self.body)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Счетчик разборов JSON в клиенте"""
+    calls = []
+    loads = json.loads
+
+    def counting_loads(raw, *args, **kwargs):
+        calls.append(raw)
+        return loads(raw, *args, **kwargs)
+    monkeypatch.setattr(hh_client_module.json, 'loads', counting_loads)
+    return calls
+
+
+def fetch_twice(transport, conditional=True):
+    client = HHAPIClient(transport=transport)
+
+    async def scenario():
+        first = await client._fetch('/vacancies', {'text': 'python'}, conditional=conditional)
+        second = await client._fetch('/vacancies', {'text': 'python'}, conditional=conditional)
+        return first, second
+    return client, *asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('etag, last_modified, header', [
+    ('"v1"', 'Mon, 19 Oct 2026 10:00:00 GMT', 'If-None-Match'),
+    ('"v1"', None, 'If-None-Match'),
+    (None, 'Mon, 19 Oct 2026 10:00:00 GMT', 'If-Modified-Since'),
+])
+def test_not_modified_returns_cached_object(parses, etag, last_modified, header):
+    transport = ConditionalTransport(etag, last_modified)
+    client, first, second = fetch_twice(transport)
+
+    # Валидаторы уходят только со вторым запросом
+    assert header not in transport.requests[0]
+    assert transport.requests[1][header] == (etag or last_modified)
+
+    assert first[0] == second[0] == 200
+    assert first[1] == DATA
+    assert second[1] is first[1]  # тот же разобранный объект
+    assert len(parses) == 1       # 304 не разбирается повторно
+
+    raw_size, compressed = len(json.dumps(DATA)), len(transport.body)
+    assert client.transfer_stats() == {
+        'requests': 2,
+        'not_modified': 1,
+        'bytes_received': compressed,
+        'bytes_decoded': raw_size,
+        # Сжатие первого ответа плюс тело, которое не пришлось скачивать второй раз
+        'bytes_saved': (raw_size - compressed) + compressed,
+    }
+
+
+def test_unconditional_request_sends_no_validators(parses):
+    transport = ConditionalTransport()
+    client, first, second = fetch_twice(transport, conditional=False)
+
+    assert all('If-None-Match' not in headers for headers in transport.requests)
+    assert second[1] == first[1] and second[1] is not first[1]
+    assert len(parses) == 2
+    assert client.transfer_stats()['not_modified'] == 0
+
+
+def test_response_without_validators_is_not_cached(parses):
+    transport = ConditionalTransport(etag=None, last_modified=None)
+    client, _, _ = fetch_twice(transport)
+
+    assert 'If-None-Match' not in transport.requests[1] and 'If-Modified-Since' not in transport.requests[1]
+    assert len(parses) == 2
+    assert client.export_validators() == []
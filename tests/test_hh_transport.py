@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.services.hh_client import HHAPIClient
+from src.services.hh_transport import CassetteMissError, LiveTransport, RecordingTransport, ReplayTransport
+
+SEARCH = {'items': [{'id': '1', 'name': 'Python-разработчик'}], 'found': 1, 'pages': 1}
+DETAILS = {'id': '1', 'name': 'Python-разработчик', 'description': '<p>Описание</p>'}
+
+
+def hh_app():
+    """Заглушка HH: выдача сжата и отдается с ETag, детали вакансии - без сжатия"""
+    async def search(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        body = gzip.compress(json.dumps(SEARCH, ensure_ascii=False).encode('utf-8'))
+        return web.Response(body=body, headers={'Content-Encoding': 'gzip', 'ETag': '"v1"',
+                                                'Content-Type': 'application/json'})
+
+    async def details(request):
+        return web.json_response(DETAILS)
+
+    app = web.Application()
+    app.router.add_get('/vacancies', search)
+    app.router.add_get('/vacancies/{vacancy_id}', details)
+    return app
+
+
+async def traffic(client, date_from):
+    """Смесь запросов: поиск, повторный поиск (304) и детали вакансии"""
+    return [
+        await client.fetch_vacancies(text='python', date_from=date_from),
+        await client.fetch_vacancies(text='python', date_from=date_from),
+        await client.get_vacancy_details('1'),
+    ]
+
+
+def test_recorded_traffic_replays_identically(tmp_path):
+    cassette = str(tmp_path / 'hh.jsonl.gz')
+
+    async def record():
+        server = TestServer(hh_app())
+        await server.start_server()
+        client = HHAPIClient()
+        client._transport = RecordingTransport(
+            LiveTransport(str(server.make_url('')).rstrip('/'), client._get_session), cassette)
+        try:
+            return await traffic(client, '2026-10-18'), client.transfer_stats(), client._transport.recorded
+        finally:
+            await client.close()
+            await server.close()
+
+    async def replay():
+        transport = ReplayTransport(cassette, speed=0)
+        client = HHAPIClient(transport=transport)
+        # Даты в запросе другие: при сопоставлении с кассетой они не учитываются
+        results = await traffic(client, '2026-10-19')
+        with pytest.raises(CassetteMissError):
+            await client.fetch_vacancies(text='java')
+        await client.close()
+        return results, client.transfer_stats(), transport
+
+    recorded, recorded_stats, recorded_count = asyncio.run(record())
+    replayed, replayed_stats, transport = asyncio.run(replay())
+
+    assert recorded == [SEARCH['items'], SEARCH['items'], DETAILS]
+    assert replayed == recorded
+    assert recorded_count == 3 and recorded_stats['not_modified'] == 1
+
+    # Статистика трафика совпадает: тела воспроизводятся байт в байт, включая сжатие и 304
+    replayed_stats['requests'] -= 1  # запрос без записи
+    assert replayed_stats == recorded_stats
+    assert [record['status'] for record in transport.records] == [200, 304, 200]
+    assert transport.served == 3 and transport.misses == 1
+    assert transport.requests()[0] == ('/vacancies', {'text': 'python', 'date_from': '2026-10-18'})
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from src.services.id_sets import MERGE_THRESHOLD, IdSet, vacancy_int_id
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('123', 123), (123, 123), ('  42 ', 42), ('0', 0),
+    ('abc', None), ('12a', None), ('', None), (None, None), ([], None),
+])
+def test_vacancy_int_id(value, expected):
+    assert vacancy_int_id(value) == expected
+
+
+def test_pending_buffer_merges_into_sorted_array():
+    ids = IdSet([5, 1, 3, 3])
+    assert ids._sorted.tolist() == [1, 3, 5]
+
+    ids.add(4)
+    ids.add(3)  # уже есть - в буфер не попадает
+    assert ids._pending == {4} and len(ids) == 4
+
+    rng = random.Random(1)
+    values = rng.sample(range(10, 10 ** 9), MERGE_THRESHOLD * 3)
+    for value in values:
+        ids.add(value)
+    # Буфер не растет дальше порога: вставки сливаются в массив
+    assert len(ids._pending) < MERGE_THRESHOLD
+    assert list(ids) == sorted({1, 3, 4, 5, *values})
+    assert not ids._pending
+    assert len(ids) == len(values) + 4
+
+
+def test_update_skips_known_ids():
+    ids = IdSet([1, 2])
+    ids.update(['2', '3', 3, 4])
+    assert sorted(ids) == [1, 2, 3, 4]
+    assert len(ids) == 4
+
+
+def test_contains_accepts_str_int_and_rejects_invalid():
+    ids = IdSet([10, 2 ** 40])
+    ids.add(7)  # в буфере
+    assert 10 in ids and '10' in ids
+    assert 7 in ids and '7' in ids
+    assert str(2 ** 40) in ids
+    assert 11 not in ids and '11' not in ids
+    assert 'abc' not in ids and None not in ids and '' not in ids
+
+
+@pytest.mark.parametrize('values', [[], [1], [3, 1, 2], [2 ** 62, -5, 0]])
+def test_bytes_round_trip(values):
+    ids = IdSet(values[:1])
+    ids.update(values[1:])  # часть id еще в буфере вставок
+    data = ids.to_bytes()
+
+    assert len(data) == 8 * len(set(values))
+    restored = IdSet.from_bytes(data)
+    assert list(restored) == sorted(set(values))
+    restored.add(999)
+    assert 999 in restored and len(restored) == len(set(values)) + 1
+
+
+def test_clear():
+    ids = IdSet([1, 2])
+    ids.add(3)
+    ids.clear()
+    assert len(ids) == 0 and 1 not in ids and 3 not in ids
@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.bot.handlers.base as base_module
+from src.services.id_sets import IdSet
+from src.services.memory_stats import MemoryStats, deep_sizeof
+
+
+@pytest.fixture
+def stats():
+    stats = MemoryStats()
+    searches = {1: {'vacancies': [{'id': str(i), 'name': 'x' * 100} for i in range(50)]}}
+    stats.register('searches', lambda: searches)
+    stats.register('processed', lambda: {1: IdSet(range(1000))},
+                   entries=lambda store: sum(len(ids) for ids in store.values()))
+    stats.searches = searches
+    return stats
+
+
+def test_gauges_report_entries_and_size(stats):
+    searches, processed = stats.gauges()
+    assert (searches.name, searches.entries, searches.exact) == ('searches', 1, True)
+    assert (processed.name, processed.entries) == ('processed', 1000)
+    # id хранятся массивом из 8 байт, а не объектами int
+    assert 8000 <= processed.bytes < 8000 + 2000
+
+    before = searches.bytes
+    stats.searches[2] = {'vacancies': [{'id': 'y', 'name': 'y' * 1000}]}
+    grown = stats.gauge('searches')
+    assert grown.entries == 2 and grown.bytes > before + 1000
+
+
+def test_failing_store_is_skipped(stats):
+    stats.register('broken', lambda: 1 / 0)
+    assert stats.gauge('broken') is None
+    assert [gauge.name for gauge in stats.gauges()] == ['searches', 'processed']
+    assert stats.store_names == ['searches', 'processed', 'broken']
+
+
+def test_walk_limit_gives_lower_bound():
+    big = [[i] for i in range(1000)]
+    partial, exact = deep_sizeof(big, limit=100)
+    full, full_exact = deep_sizeof(big)
+    assert not exact and full_exact
+    assert partial < full
+
+
+def test_shared_objects_counted_once():
+    shared = 'x' * 10000
+    once, _ = deep_sizeof([shared])
+    twice, _ = deep_sizeof([shared, shared])
+    assert twice - once < 100
+
+
+def test_metrics_export(stats):
+    metrics = stats.metrics()
+    assert metrics['store_entries{store="processed"}'] == 1000
+    assert metrics['store_bytes{store="searches"}'] > 0
+    assert metrics['process_rss_bytes'] > 0
+    # Уже снятые замеры не снимаются повторно
+    assert set(stats.metrics(gauges=[])) == {'process_rss_bytes'}
+
+
+def memory_command(user_id):
+    replies = []
+
+    async def reply_text(text, **kwargs):
+        replies.append(text)
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=user_id),
+                             message=SimpleNamespace(reply_text=reply_text))
+    asyncio.run(base_module.memory_command(update, SimpleNamespace(args=[])))
+    return replies
+
+
+def test_memory_command_refuses_non_admin(stats, monkeypatch):
+    monkeypatch.setattr(base_module.config, 'ADMIN_IDS', frozenset({1}))
+    monkeypatch.setattr(base_module, 'memory_stats', stats)
+
+    [refusal] = memory_command(2)
+    assert 'администратор' in refusal
+
+    [report] = memory_command(1)
+    assert 'searches: 1 записей' in report and 'processed: 1000 записей' in report
@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.bot.handlers.vacancies as vacancies_module
+import src.services.providers.aggregator as aggregator_module
+from src.services.providers import ProviderAggregator, VacancyProvider, dedupe_key
+
+
+class FakeProvider(VacancyProvider):
+    def __init__(self, name, vacancies=(), details=None, delay=0.0, timeout=1.0):
+        super().__init__(rate=1000, timeout=timeout)
+        self.name = name
+        self.vacancies = vacancies
+        self.details = details or {}
+        self.delay = delay
+
+    async def search(self, params):
+        await asyncio.sleep(self.delay)
+        if isinstance(self.vacancies, Exception):
+            raise self.vacancies
+        return list(self.vacancies)
+
+    async def get_vacancy(self, vacancy_id):
+        await asyncio.sleep(self.delay)
+        if isinstance(self.details, Exception):
+            raise self.details
+        return self.details.get(vacancy_id)
+
+
+def vacancy(vacancy_id, name='Python-разработчик', employer='Альфа', city='Москва'):
+    return {'id': vacancy_id, 'name': name, 'employer': {'name': employer}, 'area': {'name': city}}
+
+
+def aggregator(*providers):
+    result = ProviderAggregator()
+    for provider in providers:
+        result.register(provider)
+    return result
+
+
+@pytest.mark.parametrize('a, b', [
+    (vacancy('1'), vacancy('2', name='  python   РАЗРАБОТЧИК ')),
+    (vacancy('1', employer='ООО «Альфа»'), vacancy('2', employer='Альфа, LLC')),
+    (vacancy('1'), vacancy('2', name='Python – разработчик!')),
+    (vacancy('1', city='Орёл'), vacancy('2', city='орел')),
+])
+def test_dedupe_key_matches_same_vacancy(a, b):
+    assert dedupe_key(a) == dedupe_key(b)
+
+
+@pytest.mark.parametrize('other', [
+    vacancy('2', name='Java-разработчик'),
+    vacancy('2', employer='Бета'),
+    vacancy('2', city='Казань'),
+])
+def test_dedupe_key_distinguishes_vacancies(other):
+    assert dedupe_key(vacancy('1')) != dedupe_key(other)
+
+
+def test_dedupe_key_resolves_area_id(monkeypatch):
+    monkeypatch.setattr(aggregator_module.area_index, 'name', lambda area_id: {'1': 'Москва'}[area_id])
+    by_id = {'id': 'x', 'name': 'Python-разработчик', 'employer': {'name': 'Альфа'}, 'area': {'id': '1'}}
+    assert dedupe_key(by_id) == dedupe_key(vacancy('1'))
+    assert dedupe_key({'id': 'y'}) == ('', '', '')
+
+
+def test_cross_source_duplicates_are_merged():
+    hh = FakeProvider('hh', [vacancy('1'), vacancy('2', name='Аналитик')])
+    # Та же вакансия на другой площадке и две одинаковые вакансии сетевого работодателя
+    other = FakeProvider('other', [vacancy('a1', employer='ООО Альфа'), vacancy('a2', name='Курьер'),
+                                   vacancy('a3', name='Курьер')], delay=0.01)
+
+    merged = asyncio.run(aggregator(hh, other).search({}))
+    # Приоритет у источника, зарегистрированного раньше, даже если он ответил позже
+    assert [item['id'] for item in merged] == ['1', '2', 'a2', 'a3']
+    merged = asyncio.run(aggregator(other, FakeProvider('hh', [vacancy('1')])).search({}))
+    assert [item['id'] for item in merged] == ['a1', 'a2', 'a3']
+
+
+def test_single_source_is_not_deduplicated():
+    provider = FakeProvider('hh', [vacancy('1'), vacancy('2')])
+    assert [item['id'] for item in asyncio.run(aggregator(provider).search({}))] == ['1', '2']
+
+
+def test_failed_source_does_not_break_others():
+    slow = FakeProvider('slow', [vacancy('s1')], delay=1, timeout=0.01)
+    broken = FakeProvider('broken', RuntimeError('нет связи'))
+    ok = FakeProvider('ok', [vacancy('1')])
+    assert [item['id'] for item in asyncio.run(aggregator(slow, broken, ok).search({}))] == ['1']
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(aggregator(broken, FakeProvider('other', RuntimeError('тоже нет'))).search({}))
+
+
+def test_get_vacancy_asks_sources_in_order():
+    broken = FakeProvider('broken', details=RuntimeError('нет связи'))
+    slow = FakeProvider('slow', details={'1': vacancy('1', name='Медленная')}, delay=1, timeout=0.01)
+    hh = FakeProvider('hh', details={'1': vacancy('1')})
+    providers = aggregator(broken, slow, hh)
+
+    assert asyncio.run(providers.get_vacancy('1'))['name'] == 'Python-разработчик'
+    assert asyncio.run(providers.get_vacancy('404')) is None
+
+
+def test_cover_letter_loads_vacancy_through_providers(monkeypatch):
+    details = {'100': vacancy('100', name='Полное описание')}
+    monkeypatch.setattr(vacancies_module, 'vacancy_providers', aggregator(FakeProvider('hh', details=details)))
+    streamed = []
+
+    async def stream(item, filters):
+        streamed.append(item)
+        yield 'Письмо'
+
+    async def get_profile(user_id):
+        return None
+    monkeypatch.setattr(vacancies_module, 'cover_letter_service',
+                        SimpleNamespace(client=SimpleNamespace(is_configured=True), stream=stream))
+    monkeypatch.setattr(vacancies_module.filter_service, 'get_profile', get_profile)
+
+    edits = []
+
+    async def edit_text(text):
+        edits.append(text)
+
+    async def send_message(chat_id, text):
+        return SimpleNamespace(edit_text=edit_text)
+    context = SimpleNamespace(bot=SimpleNamespace(send_message=send_message))
+
+    handler = vacancies_module.VacancyHandler()
+    asyncio.run(handler.send_cover_letter(context, 1, '100'))
+    assert streamed == [details['100']]
+    assert 'Полное описание' in edits[-1]
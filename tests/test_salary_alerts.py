@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.services.scheduler_service as scheduler_module
+
+
+def vacancy(salary_from):
+    return {
+        'id': '101',
+        'name': 'Python-разработчик',
+        'salary': {'from': salary_from, 'to': None, 'currency': 'RUR', 'gross': False},
+        'alternate_url': 'https://hh.ru/vacancy/101',
+    }
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    async def nothing_hidden(user_id, vacancies):
+        return vacancies
+    monkeypatch.setattr(scheduler_module.exclusion_service, 'exclude', nothing_hidden)
+
+    service = scheduler_module.SchedulerService(bot=None)
+    service.sent = []
+
+    async def send_vacancies(chat_id, vacancies):
+        service.sent.append(('vacancies', [v['id'] for v in vacancies]))
+
+    async def send_message(**kwargs):
+        service.sent.append(('message', kwargs['text']))
+    service.send_vacancy_notifications = send_vacancies
+    service._send_message = send_message
+    return service
+
+
+def test_salary_increase_is_compared_with_what_user_saw(scheduler):
+    user = SimpleNamespace(id=1, telegram_id=100, salary_alerts=True)
+
+    asyncio.run(scheduler._dispatch_new_vacancies(user, [vacancy(100000)]))
+    assert scheduler.sent == [('vacancies', ['101'])]
+
+    # Хранилище могло уже получить новую зарплату от интерактивного поиска:
+    # уведомление все равно уходит, потому что пользователь видел старую
+    asyncio.run(scheduler._dispatch_new_vacancies(user, [vacancy(150000)]))
+    assert len(scheduler.sent) == 2
+    assert scheduler.sent[1][0] == 'message' and '150 000' in scheduler.sent[1][1]
+
+    # Та же зарплата повторно не сообщается
+    asyncio.run(scheduler._dispatch_new_vacancies(user, [vacancy(150000)]))
+    assert len(scheduler.sent) == 2
+
+
+def test_no_salary_alerts_when_disabled(scheduler):
+    user = SimpleNamespace(id=1, telegram_id=100, salary_alerts=False)
+
+    asyncio.run(scheduler._dispatch_new_vacancies(user, [vacancy(100000)]))
+    asyncio.run(scheduler._dispatch_new_vacancies(user, [vacancy(150000)]))
+
+    assert scheduler.sent == [('vacancies', ['101'])]
+    assert scheduler.notified_salaries == {}
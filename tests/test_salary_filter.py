@@ -0,0 +1,43 @@
+import asyncio
+
+from src.services.filter_service import compile_filters
+from src.services.matching import filter_by_salary, profile_matches
+from src.services.providers.hh import HHProvider
+
+
+class FakeClient:
+    def __init__(self):
+        self.params = None
+
+    async def fetch_vacancies(self, **params):
+        self.params = params
+        return []
+
+
+def vacancy(vacancy_id, salary):
+    return {'id': vacancy_id, 'name': 'Python-разработчик', 'salary': salary}
+
+
+def test_salary_is_not_sent_to_hh():
+    hh_params = compile_filters({'profession': 'Python', 'salary_min': '150000'})
+    client = FakeClient()
+
+    asyncio.run(HHProvider(client=client, rate=1000).search(hh_params))
+
+    assert hh_params['salary_min'] == 150000
+    assert 'salary' not in client.params and 'only_with_salary' not in client.params
+    assert 'salary_min' not in client.params
+
+
+def test_salary_is_filtered_by_net_rub_range():
+    hh_params = compile_filters({'salary_min': '150000'})
+    vacancies = [
+        vacancy('1', {'from': 200000, 'to': None, 'currency': 'RUR', 'gross': False}),
+        # До вычета налога проходит, на руки - нет
+        vacancy('2', {'from': 100000, 'to': 160000, 'currency': 'RUR', 'gross': True}),
+        vacancy('3', None),
+    ]
+
+    assert [v['id'] for v in filter_by_salary(hh_params, vacancies)] == ['1']
+    assert [profile_matches(hh_params, v) for v in vacancies] == [True, False, False]
+    assert filter_by_salary(compile_filters({}), vacancies) == vacancies
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select, update
+
+import src.storage.database as database_module
+from src.storage.models import SCHEMA_VERSION, SchemaVersion
+
+
+@pytest.fixture
+def migrations(monkeypatch):
+    """Вызовы create_all и миграций при проверке схемы"""
+    calls = []
+    create_all = database_module.Base.metadata.create_all
+
+    def spy(name, function):
+        def wrapper(*args, **kwargs):
+            calls.append(name)
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(database_module.Base.metadata, 'create_all', spy('create_all', create_all))
+    for name in ('_add_missing_columns', '_upgrade_integer_columns', '_fill_salary_columns'):
+        monkeypatch.setattr(database_module, name, spy(name, getattr(database_module, name)))
+    return calls
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def ensure_schema(engine) -> bool:
+    with engine.begin() as connection:
+        return database_module._ensure_schema(connection)
+
+
+def stored_version(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(SchemaVersion.version)).scalar()
+
+
+def test_new_database_is_created(engine, migrations):
+    assert ensure_schema(engine) is True
+    assert migrations == ['create_all', '_add_missing_columns', '_upgrade_integer_columns', '_fill_salary_columns']
+    assert stored_version(engine) == SCHEMA_VERSION
+    assert inspect(engine).has_table('vacancies')
+
+
+def test_matching_version_skips_create_all_and_migrations(engine, migrations):
+    ensure_schema(engine)
+    migrations.clear()
+
+    assert ensure_schema(engine) is False
+    assert migrations == []
+
+
+def test_version_mismatch_runs_migrations(engine, migrations):
+    ensure_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(update(SchemaVersion).values(version=SCHEMA_VERSION - 1))
+    migrations.clear()
+
+    assert ensure_schema(engine) is True
+    assert migrations == ['create_all', '_add_missing_columns', '_upgrade_integer_columns', '_fill_salary_columns']
+    assert stored_version(engine) == SCHEMA_VERSION
+    with engine.connect() as connection:
+        assert len(connection.execute(select(SchemaVersion)).all()) == 1
+
+    migrations.clear()
+    assert ensure_schema(engine) is False and migrations == []
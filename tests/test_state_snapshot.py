@@ -0,0 +1,112 @@
+import asyncio
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.services.scheduler_service as scheduler_module
+import src.services.state_snapshot as state_snapshot
+from src.services.adaptive_polling import AdaptivePoller
+from src.services.firehose import FirehoseService
+from src.services.hh_client import HHAPIClient
+from src.services.id_sets import IdSet
+
+
+def make_service():
+    service = scheduler_module.SchedulerService(bot=None)
+    service.poller = AdaptivePoller(base_interval_minutes=60, min_interval_minutes=10,
+                                    max_interval_minutes=1440, budget_per_hour=100)
+    return service
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'state.bin')
+    monkeypatch.setattr(scheduler_module.config, 'STATE_SNAPSHOT_PATH', path)
+    # Свои экземпляры вместо синглтонов, чтобы тесты не влияли друг на друга
+    monkeypatch.setattr(scheduler_module, 'firehose_service', FirehoseService(pages=1, per_page=10))
+    monkeypatch.setattr(scheduler_module, 'hh_client', HHAPIClient())
+    return path
+
+
+def test_round_trip(snapshot_path):
+    now = datetime.now().astimezone().replace(microsecond=0)
+    service = make_service()
+    service.processed_vacancies = {1: IdSet([3, 1, 2]), 2: IdSet(), 3: IdSet([2 ** 40])}
+    service.processed_vacancies[1].add(100)  # еще в буфере вставок
+    scheduler_module.firehose_service.cursors = {None: now, '1': now - timedelta(minutes=5)}
+    scheduler_module.firehose_service.backfill = {'2': (now - timedelta(hours=2), now - timedelta(hours=1))}
+    service.poller.last_active = {100: 1700000000.5}
+    service.query_timings = {'a' * 64: scheduler_module.QueryTiming(1700000000.0, 1.5, None)}
+    service.notified_salaries = {1: {3: 150000}}
+    asyncio.run(service.save_snapshot())
+
+    saved = scheduler_module.firehose_service
+    restored_firehose = FirehoseService(pages=1, per_page=10)
+    scheduler_module.firehose_service = restored_firehose
+    try:
+        restored = make_service()
+        asyncio.run(restored.restore_snapshot())
+    finally:
+        scheduler_module.firehose_service = saved
+
+    assert {user_id: list(ids) for user_id, ids in restored.processed_vacancies.items()} == {
+        1: [1, 2, 3, 100], 2: [], 3: [2 ** 40]
+    }
+    assert restored_firehose.cursors == {None: now, '1': now - timedelta(minutes=5)}
+    assert restored_firehose.backfill == {'2': (now - timedelta(hours=2), now - timedelta(hours=1))}
+    assert restored.poller.last_active == {100: 1700000000.5}
+    assert restored.query_timings == service.query_timings
+    assert restored.notified_salaries == {1: {3: 150000}}
+
+
+def corrupt_crc(data: bytes) -> bytes:
+    return data[:-1] + bytes([data[-1] ^ 0xFF])
+
+
+def other_version(data: bytes) -> bytes:
+    magic, _, reserved, crc, length, created_at = state_snapshot.HEADER.unpack_from(data)
+    header = state_snapshot.HEADER.pack(magic, state_snapshot.SNAPSHOT_VERSION + 1, reserved, crc, length, created_at)
+    return header + data[state_snapshot.HEADER.size:]
+
+
+def truncated(data: bytes) -> bytes:
+    return data[:len(data) // 2]
+
+
+def truncated_section(data: bytes) -> bytes:
+    # Контрольная сумма верна, но раздел внутри обрезан
+    payload = zlib.compress(state_snapshot.SECTION_HEADER.pack(9, 100) + b'processed' + b'\0' * 10)
+    header = state_snapshot.HEADER.pack(state_snapshot.MAGIC, state_snapshot.SNAPSHOT_VERSION, 0,
+                                        zlib.crc32(payload), len(payload), 0.0)
+    return header + payload
+
+
+@pytest.mark.parametrize('damage', [corrupt_crc, other_version, truncated, truncated_section, lambda data: b''])
+def test_broken_snapshot_is_a_cold_start(snapshot_path, damage):
+    service = make_service()
+    service.processed_vacancies = {1: IdSet([1, 2, 3])}
+    asyncio.run(service.save_snapshot())
+    with open(snapshot_path, 'rb') as f:
+        data = f.read()
+    with open(snapshot_path, 'wb') as f:
+        f.write(damage(data))
+
+    restored = make_service()
+    asyncio.run(restored.restore_snapshot())
+
+    assert restored.processed_vacancies == {}
+    assert scheduler_module.firehose_service.cursors == {}
+
+
+def test_missing_snapshot_is_a_cold_start(snapshot_path):
+    restored = make_service()
+    asyncio.run(restored.restore_snapshot())
+    assert restored.processed_vacancies == {}
+
+
+def test_decode_rejects_bad_header():
+    data = state_snapshot.encode_snapshot({'a': b'1'})
+    with pytest.raises(state_snapshot.SnapshotError):
+        state_snapshot.decode_snapshot(b'XXXX' + data[4:])
+    assert state_snapshot.decode_snapshot(data)[0] == {'a': b'1'}
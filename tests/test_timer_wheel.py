@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import src.services.scheduler_service as scheduler_module
+from src.services.timer_wheel import TimerWheel, phase_offset
+
+QUERY_HASH = 'b' * 64
+
+
+def test_keys_fire_once_per_revolution_in_their_slot():
+    wheel = TimerWheel(slots=4, slot_seconds=60, now=0)
+    wheel.add('a', 0)
+    wheel.add('b', 90)
+    wheel.add('c', 239)
+    assert wheel.slot_of == {'a': 0, 'b': 1, 'c': 3}
+    assert wheel.period == 240 and len(wheel) == 3
+
+    assert wheel.advance(59) == []  # ячейка 0 уже обработана при создании
+    assert wheel.advance(60) == ['b']
+    assert wheel.advance(61) == []  # повторно в той же ячейке не срабатывает
+    assert wheel.advance(200) == ['c']
+    assert wheel.advance(240) == ['a']
+
+
+def test_advance_covers_missed_slots_at_most_one_revolution():
+    wheel = TimerWheel(slots=4, slot_seconds=60, now=0)
+    for key, offset in [('a', 0), ('b', 60), ('c', 120)]:
+        wheel.add(key, offset)
+    # Пропущено несколько оборотов - каждый ключ срабатывает только раз
+    assert sorted(wheel.advance(60 * 10)) == ['a', 'b', 'c']
+    assert wheel.advance(60 * 10) == []
+    # Время назад не откатывает позицию
+    assert wheel.advance(0) == []
+
+
+def test_re_adding_moves_key_and_remove_drops_it():
+    wheel = TimerWheel(slots=4, slot_seconds=60, now=0)
+    wheel.add('a', 60)
+    wheel.add('a', 120)
+    assert wheel.slot_of == {'a': 2} and wheel.slots[1] == set()
+    wheel.remove('a')
+    wheel.remove('a')
+    assert 'a' not in wheel and wheel.advance(180) == []
+
+
+def test_phase_offset_is_stable_and_even():
+    period = 60 * 60
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(6000)]
+    offsets = [phase_offset(query_hash, period) for query_hash in hashes]
+    assert offsets == [phase_offset(query_hash, period) for query_hash in hashes]
+    assert all(0 <= offset < period for offset in offsets)
+
+    # По 100 запросов на ячейку в среднем: ни одна ячейка не перегружена
+    per_slot = Counter(offset // 60 for offset in offsets)
+    assert len(per_slot) == 60
+    assert max(per_slot.values()) < 150 and min(per_slot.values()) > 50
+    assert phase_offset('x', 0) == 0
+
+
+def test_staggered_group_skipped_by_breaker_runs_next_tick(monkeypatch):
+    user = SimpleNamespace(id=1, telegram_id=100, salary_alerts=False)
+    profile = SimpleNamespace(query_hash=QUERY_HASH, hh_params={'text': 'python'})
+
+    class FakeProfileRepo:
+        def __init__(self, session):
+            pass
+
+        async def get_active_profiles(self):
+            return [(user, profile)]
+
+    async def no_sleep(*args):
+        return None
+
+    breaker_open = [True]
+    monkeypatch.setattr(scheduler_module, 'get_profile_repo', FakeProfileRepo)
+    monkeypatch.setattr(scheduler_module, 'blocking_breaker',
+                        lambda: SimpleNamespace(name='hh') if breaker_open[0] else None)
+    monkeypatch.setattr(scheduler_module.asyncio, 'sleep', no_sleep)
+
+    service = scheduler_module.SchedulerService(bot=None)
+    now = time.time()
+    service.wheel = TimerWheel(service.check_interval, 60, now - 60)
+    # Группа попадает в текущую ячейку колеса
+    service.wheel.add(QUERY_HASH, (int(now // 60) % service.check_interval) * 60)
+    checked = []
+
+    async def check_timed(query_hash, hh_params, users):
+        checked.append(query_hash)
+    service._check_timed = check_timed
+
+    asyncio.run(service._check_staggered())
+    assert checked == [] and service.overdue_queries == [QUERY_HASH]
+
+    # На следующем тике колесо ее уже не вернет, но отложенная группа проверяется сразу
+    breaker_open[0] = False
+    asyncio.run(service._check_staggered())
+    assert checked == [QUERY_HASH] and service.overdue_queries == []
+
+    asyncio.run(service._check_staggered())
+    assert checked == [QUERY_HASH]
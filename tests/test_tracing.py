@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import src.services.tracing as tracing_module
+from src.services.tracing import Tracer, instrument_engine
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    tracer = Tracer(enabled=True, trace_dir=str(tmp_path))
+    monkeypatch.setattr(tracing_module, 'tracer', tracer)
+    return tracer
+
+
+def load_trace(path):
+    """Файл в Chrome Trace Event Format: массив без закрывающей скобки допустим"""
+    with open(path, encoding='utf-8') as f:
+        data = f.read()
+    assert data.startswith('[\n')
+    return json.loads(data.rstrip().rstrip(',') + ']')
+
+
+def test_traced_pass_writes_nested_spans(tracer):
+    engine = create_engine('sqlite://')
+    instrument_engine(engine)
+
+    async def check_user(user_id):
+        with tracer.span('user', 'user', user_id=user_id):
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+
+    @tracer.traced('pass', 'scheduler')
+    async def scheduler_pass():
+        with tracer.span('group', 'group') as span:
+            span.args['users'] = 2
+            # Задачи, созданные внутри спана, наследуют трассу через contextvars
+            await asyncio.gather(check_user(1), check_user(2))
+
+    asyncio.run(scheduler_pass())
+    asyncio.run(scheduler_pass())
+    events = load_trace(tracer.path)
+
+    spans = [event for event in events if event['ph'] == 'X']
+    lanes = [event for event in events if event['ph'] == 'M']
+    assert all({'name', 'cat', 'ts', 'dur', 'pid', 'tid', 'args'} <= set(event) for event in spans)
+    assert len(lanes) == 2 and len(spans) == 2 * 6
+
+    traces = {}
+    for event in spans:
+        traces.setdefault(event['args']['trace_id'], []).append(event)
+    assert len(traces) == 2  # у каждого прохода своя трасса и своя дорожка
+
+    for trace in traces.values():
+        by_name = {}
+        for event in trace:
+            by_name.setdefault(event['name'], []).append(event)
+        assert sorted(by_name) == ['db', 'group', 'pass', 'user']
+        assert len({event['tid'] for event in trace}) == 1
+
+        [root], [group] = by_name['pass'], by_name['group']
+        assert root['args']['parent_id'] is None
+        assert group['args']['parent_id'] == root['args']['span_id'] and group['args']['users'] == 2
+        users = by_name['user']
+        assert sorted(event['args']['user_id'] for event in users) == [1, 2]
+        assert all(event['args']['parent_id'] == group['args']['span_id'] for event in users)
+        assert {event['args']['parent_id'] for event in by_name['db']} == {event['args']['span_id'] for event in users}
+        assert by_name['db'][0]['args']['statement'] == 'SELECT 1'
+
+        # Дочерние спаны лежат внутри родителя по времени
+        for event in trace:
+            assert root['ts'] <= event['ts'] and event['ts'] + event['dur'] <= root['ts'] + root['dur'] + 1
+
+
+def test_error_is_recorded_on_span(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span('pass'):
+            raise ValueError('сбой')
+    [span] = [event for event in load_trace(tracer.path) if event['ph'] == 'X']
+    assert 'сбой' in span['args']['error']
+
+
+def test_disabled_tracer_writes_nothing(tmp_path):
+    tracer = Tracer(enabled=False, trace_dir=str(tmp_path))
+    with tracer.span('pass') as span:
+        assert span is None
+    tracer.record('db', 'db', 0.0, 1.0)
+    tracer.flush()
+    assert tracer.path is None and not list(tmp_path.iterdir())
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+import src.storage.repositories.vacancy_repo as vacancy_repo_module
+from src.storage.database import AsyncSessionLocal, init_db
+from src.storage.models import Vacancy
+from src.storage.repositories.vacancy_repo import VacancyRepository, get_vacancy_repo
+
+
+def vacancy(vacancy_id, name='Оператор загрузки', salary_from=100000):
+    return {'id': str(vacancy_id), 'name': name, 'employer': {'name': 'Альфа'},
+            'salary': {'from': salary_from, 'to': None, 'currency': 'RUR', 'gross': False},
+            'area': {'id': '1'}, 'alternate_url': f'https://hh.ru/vacancy/{vacancy_id}',
+            'published_at': '2026-10-19T10:00:00+0300'}
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Строки, переданные в executemany"""
+    batches = []
+    upsert = VacancyRepository._executemany_upsert
+
+    async def spy(self, rows):
+        batches.append([row['vacancy_id'] for row in rows])
+        await upsert(self, rows)
+    monkeypatch.setattr(VacancyRepository, '_executemany_upsert', spy)
+    return batches
+
+
+def ingest(*batches):
+    async def scenario():
+        await init_db()
+        results = []
+        for batch in batches:
+            async with AsyncSessionLocal() as session:
+                results.append(await get_vacancy_repo(session).ingest(batch))
+        return results
+    return asyncio.run(scenario())
+
+
+def stored(ids):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(select(Vacancy).where(Vacancy.vacancy_id.in_(ids)))).scalars().all()
+            return {row.vacancy_id: row for row in rows}
+    return asyncio.run(scenario())
+
+
+def test_new_changed_and_unchanged(writes):
+    first, second = ingest(
+        [vacancy(940001), vacancy(940002), vacancy(940003)],
+        [vacancy(940001), vacancy(940002, salary_from=150000), vacancy(940004),
+         vacancy(940003, name='Старший оператор загрузки')],
+    )
+
+    assert [item['id'] for item in first.new] == ['940001', '940002', '940003']
+    assert first.changed == [] and first.unchanged == 0
+
+    assert [item['id'] for item in second.new] == ['940004']
+    assert [item['id'] for item in second.changed] == ['940002', '940003']
+    assert second.unchanged == 1
+    # Неизменившаяся по хэшу вакансия в executemany не попадает
+    assert writes == [[940001, 940002, 940003], [940002, 940004, 940003]]
+
+    rows = stored([940001, 940002, 940003, 940004])
+    assert rows[940002].salary_from_rub == 150000 and rows[940002].raw_data['salary']['from'] == 150000
+    assert rows[940003].title == 'Старший оператор загрузки'
+    assert rows[940004].url == 'https://hh.ru/vacancy/940004'
+    assert rows[940002].content_hash != rows[940001].content_hash
+    assert rows[940002].id < rows[940004].id  # обновление не пересоздает строку
+
+
+def test_reingest_writes_nothing(writes):
+    ingest([vacancy(940101), vacancy(940102)])
+    writes.clear()
+    [result] = ingest([vacancy(940102), vacancy(940101)])
+    assert result.unchanged == 2 and not result.new and not result.changed
+    assert writes == []
+
+
+def test_duplicates_and_invalid_ids(writes):
+    [result] = ingest([vacancy(940201), vacancy(940201, name='Последняя версия'), {'id': 'не-id', 'name': 'x'}])
+    assert [item['name'] for item in result.new] == ['Последняя версия']
+    assert writes == [[940201]]
+    assert ingest([]) == [vacancy_repo_module.IngestResult()]
+
+
+def test_large_input_is_split_into_batches(writes, monkeypatch):
+    monkeypatch.setattr(vacancy_repo_module, 'INGEST_BATCH_SIZE', 2)
+    ids = list(range(940301, 940306))
+    [result] = ingest([vacancy(vacancy_id) for vacancy_id in ids])
+    assert len(result.new) == 5
+    assert writes == [ids[0:2], ids[2:4], ids[4:5]]
+    assert sorted(stored(ids)) == ids
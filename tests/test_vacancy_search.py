@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.storage.database import AsyncSessionLocal, init_db
+from src.storage.repositories.vacancy_repo import get_vacancy_repo
+
+VACANCIES = [
+    {'id': '1', 'name': 'Python-разработчик', 'employer': {'name': 'Альфа'},
+     'published_at': '2026-10-19T10:00:00+0300'},
+    # Python только в навыках: подходит для поиска по всем полям, но не по названию
+    {'id': '2', 'name': 'Инженер данных', 'employer': {'name': 'Бета'},
+     'key_skills': [{'name': 'Python'}], 'published_at': '2026-10-19T09:00:00+0300'},
+]
+
+
+class CapturingSession:
+    """Сессия PostgreSQL без сервера: запоминает запрос вместо выполнения"""
+
+    def __init__(self):
+        self.bind = SimpleNamespace(dialect=postgresql.dialect())
+        self.statement = None
+
+    async def execute(self, statement):
+        self.statement = statement
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+
+@pytest.mark.parametrize('title_only, expected', [(True, ['1']), (False, ['1', '2'])])
+def test_sqlite_title_only(title_only, expected):
+    async def run():
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            repo = get_vacancy_repo(session)
+            await repo.ingest(VACANCIES)
+            return await repo.search({'python'}, title_only=title_only)
+
+    assert [vacancy['id'] for vacancy in asyncio.run(run())] == expected
+
+
+@pytest.mark.parametrize('title_only', [True, False])
+def test_postgres_title_only(title_only):
+    session = CapturingSession()
+    asyncio.run(get_vacancy_repo(session).search({'python'}, title_only=title_only))
+
+    sql = str(session.statement.compile(dialect=postgresql.dialect()))
+    assert "to_tsvector('russian'," in sql
+    assert ('employer_name' in sql) is not title_only
+    assert ('skills' in sql) is not title_only